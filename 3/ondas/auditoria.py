@@ -0,0 +1,141 @@
+"""
+Auditoría de mobjects invisibles que siguen en escena
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Un mobject con opacidad 0 (o sin trazo ni relleno) que sigue en
+self.mobjects no se ve, pero en cada fotograma se recorre su familia, se
+actualiza, se proyecta y se manda a Cairo. En escenas largas como
+DielectricoEspacio se van juntando etiquetas y avisos así, y los últimos
+fotogramas salen más lentos sin ninguna razón visible.
+
+AuditorMobjects revisa la escena en cada fotograma y registra qué mobjects
+están en escena siendo invisibles (por nombre de variable en construct
+cuando se puede). Con la poda activada, Escena3D además los quita de la
+escena al terminar cada play; si una animación posterior los vuelve a
+usar, manim los agrega de nuevo. Los que tienen updaters no se tocan.
+
+Se activa en las escenas que heredan de Escena3D con variables de entorno:
+  ONDAS_AUDITAR=1 manim -ql dialectrico_sinperdida_manim.py DielectricoEspacio
+  ONDAS_AUDITAR=1 ONDAS_PODAR=1 manim -ql dialectrico_sinperdida_manim.py DielectricoEspacio
+"""
+
+import os
+import sys
+
+from manim import *
+import numpy as np
+
+VARIABLE_AUDITAR = "ONDAS_AUDITAR"
+VARIABLE_PODAR = "ONDAS_PODAR"
+
+
+def auditoria_activada():
+    return os.environ.get(VARIABLE_AUDITAR, "") not in ("", "0")
+
+
+def poda_activada():
+    return os.environ.get(VARIABLE_PODAR, "") not in ("", "0")
+
+
+def _dibujables(mob):
+    return [m for m in mob.get_family()
+            if isinstance(m, (VMobject, PMobject, AbstractImageMobject)) and m.has_points()]
+
+
+def es_invisible(mob):
+    """True si mob tiene algo que dibujar pero nada de su familia deja pixeles.
+
+    Los mobjects que nunca se dibujan (ValueTracker, grupos vacíos) no
+    cuentan como invisibles.
+    """
+    dibujables = _dibujables(mob)
+    if not dibujables:
+        return False
+    for m in dibujables:
+        if isinstance(m, AbstractImageMobject):
+            return False
+        if isinstance(m, PMobject):
+            if np.any(m.rgbas[:, 3] > 0):
+                return False
+            continue
+        if np.any(m.get_fill_opacities() > 0):
+            return False
+        for fondo in (False, True):
+            if m.get_stroke_width(background=fondo) > 0 and np.any(
+                    m.get_stroke_opacities(background=fondo) > 0):
+                return False
+    return True
+
+
+def tiene_updaters(mob):
+    return any(m.updaters for m in mob.get_family())
+
+
+def nombres_en_construct(escena):
+    """{id(mobject): nombre de variable} del construct() en ejecución, si lo hay."""
+    marco = sys._getframe(1)
+    while marco is not None:
+        if marco.f_code.co_name == "construct" and marco.f_locals.get("self") is escena:
+            return {id(v): k for k, v in marco.f_locals.items() if isinstance(v, Mobject)}
+        marco = marco.f_back
+    return {}
+
+
+# ─── Auditor ───
+class AuditorMobjects:
+    """Registro por fotograma de los mobjects invisibles que siguen en escena."""
+
+    def __init__(self):
+        self.fotograma = 0
+        self.registros = {}  # id -> dict(nombre, desde, fotogramas, puntos, podado)
+        self._actuales = set()
+        self._nombres = {}
+
+    def nombre(self, escena, mob):
+        if id(mob) not in self._nombres:
+            self._nombres.update(nombres_en_construct(escena))
+        return self._nombres.get(id(mob), f"{type(mob).__name__}@{id(mob):x}")
+
+    def revisar(self, escena):
+        """Revisa los mobjects de la escena en este fotograma; devuelve los invisibles."""
+        self.fotograma += 1
+        invisibles = [m for m in escena.mobjects if es_invisible(m)]
+        actuales = set(map(id, invisibles))
+        for mob in invisibles:
+            registro = self.registros.get(id(mob))
+            if registro is None:
+                registro = self.registros[id(mob)] = {
+                    "nombre": self.nombre(escena, mob),
+                    "desde": self.fotograma,
+                    "fotogramas": 0,
+                    "puntos": sum(len(m.points) for m in _dibujables(mob)),
+                    "podado": False,
+                }
+            registro["fotogramas"] += 1
+        if actuales != self._actuales:
+            nombres = ", ".join(self.registros[i]["nombre"] for i in actuales) or "ninguno"
+            logger.info(f"Fotograma {self.fotograma}: {len(actuales)} invisibles en escena: {nombres}")
+            self._actuales = actuales
+        return invisibles
+
+    def podado(self, mob):
+        if id(mob) in self.registros:
+            self.registros[id(mob)]["podado"] = True
+
+    def resumen(self):
+        """Registros ordenados por fotogramas desperdiciados (puntos × fotogramas)."""
+        return sorted(self.registros.values(),
+                      key=lambda r: r["puntos"] * r["fotogramas"], reverse=True)
+
+    def reportar(self):
+        registros = self.resumen()
+        if not registros:
+            logger.info("Auditoría: ningún mobject invisible quedó en escena")
+            return
+        lineas = [f"Auditoría: {len(registros)} mobjects invisibles en escena "
+                  f"({self.fotograma} fotogramas revisados)"]
+        for r in registros:
+            lineas.append(f"  {r['nombre']:24} desde el fotograma {r['desde']:5}, "
+                          f"{r['fotogramas']:5} fotogramas, {r['puntos']:6} puntos"
+                          + (", podado" if r["podado"] else ""))
+        logger.info("\n".join(lineas))
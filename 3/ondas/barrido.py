@@ -0,0 +1,243 @@
+"""
+Barrido de parámetros de OndaEMPlana
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Renderiza variantes de la onda plana con distintos k, amplitud, número de
+fotogramas de la propagación y colores de E y B (los atributos de clase de
+OndaEMPlana). La rejilla se expande en todas sus combinaciones y las que
+tienen los mismos parámetros canónicos (colores en hex, números
+normalizados) se renderizan una sola vez; un video que ya existe con la
+misma clave (escena, parámetros, calidad y versión de manim) no se vuelve
+a renderizar.
+
+Antes de renderizar se precalientan en paralelo los textos de todas las
+variantes. Cada proceso del pool carga la escena una vez y construye los
+ejes, etiquetas y ecuaciones una sola vez (objetos.plantilla): las
+siguientes variantes del mismo proceso usan copias.
+
+Los videos y manifiesto.json quedan en media/barrido/<calidad>/.
+
+Para ejecutar:
+  python barrido.py --k 1 1.5 2 --amplitud 1 1.5
+  python barrido.py --fotogramas 40 80 --color-E BLUE TEAL -q m -j 4
+"""
+
+import argparse
+import ast
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from escenas import DIRECTORIO, cargar_clase, elegir, modulos_locales
+from perfil import CALIDADES
+from precalentar import precalentar, resumir
+
+ESCENA = "onda_plana_manim.OndaEMPlana"
+SALIDA = os.path.join(DIRECTORIO, "media", "barrido")
+# Opción de la línea de comandos -> atributo de OndaEMPlana
+PARAMETROS = {
+    "k": "k",
+    "amplitud": "amplitude",
+    "fotogramas": "n_frames",
+    "color_E": "color_E",
+    "color_B": "color_B",
+}
+
+# Estado de cada proceso del pool
+_clase = [None]
+
+
+def expandir(rejilla):
+    """Todas las combinaciones de {atributo: [valores]} como lista de dicts."""
+    nombres = list(rejilla)
+    return [dict(zip(nombres, valores))
+            for valores in itertools.product(*(rejilla[n] for n in nombres))]
+
+
+def predeterminados(escena):
+    """Valores de los atributos de PARAMETROS en el código de la clase."""
+    valores = {}
+    for nodo in escena.nodo.body:
+        if (isinstance(nodo, ast.Assign) and len(nodo.targets) == 1
+                and isinstance(nodo.targets[0], ast.Name)
+                and nodo.targets[0].id in PARAMETROS.values()):
+            try:
+                valores[nodo.targets[0].id] = ast.literal_eval(nodo.value)
+            except ValueError:
+                valores[nodo.targets[0].id] = ast.unparse(nodo.value)  # BLUE, RED...
+    return valores
+
+
+def canonico(parametros):
+    """Parámetros normalizados: dos variantes iguales dan el mismo dict."""
+    import manim
+    from manim import ManimColor
+
+    resultado = {}
+    for nombre, valor in sorted(parametros.items()):
+        if nombre.startswith("color"):
+            # Acepta nombres de manim (BLUE, TEAL_C) o cualquier cosa que entienda ManimColor
+            color = getattr(manim, valor, valor) if isinstance(valor, str) else valor
+            resultado[nombre] = ManimColor(color).to_hex().lower()
+        elif nombre == "n_frames":
+            resultado[nombre] = int(valor)
+        else:
+            resultado[nombre] = float(repr(float(valor)))
+    return resultado
+
+
+def clave_variante(escena, canonicos, calidad):
+    """Hash de la escena (y de los módulos locales que usa), parámetros y calidad."""
+    from manim import __version__
+
+    datos = json.dumps(canonicos, sort_keys=True)
+    h = hashlib.sha1(f"{escena.huella}|{calidad}|{__version__}|{datos}".encode())
+    for ruta in modulos_locales(escena.archivo):
+        with open(ruta, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def _iniciar():
+    """Prepara un proceso del pool: directorio de trabajo y clase de la escena."""
+    # Mismo media/ (cachés de textos y fotogramas) que precalentar
+    os.chdir(DIRECTORIO)
+    _clase[0] = cargar_clase(elegir(ESCENA))
+
+
+def renderizar_variante(parametros, calidad, destino):
+    """Renderiza una variante en este proceso y copia el video a destino."""
+    from manim import tempconfig
+
+    clase = _clase[0]
+    variante = type(clase.__name__, (clase,), dict(parametros))
+    inicio = time.perf_counter()
+    # Todas las variantes se llaman igual: cada una con sus propios parciales
+    # y sin caché, para que los procesos del pool no se pisen
+    nombre = os.path.basename(destino)
+    with tempconfig({"quality": CALIDADES[calidad], "preview": False,
+                     "disable_caching": True,
+                     "output_file": nombre,
+                     "partial_movie_dir": "{video_dir}/partial_movie_files/" + nombre,
+                     "progress_bar": "none", "verbosity": "WARNING"}):
+        instancia = variante()
+        instancia.render()
+        video = instancia.renderer.file_writer.movie_file_path
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    destino = destino + os.path.splitext(str(video))[1]
+    shutil.copyfile(video, destino)
+    return destino, time.perf_counter() - inicio
+
+
+def barrer(rejilla, calidad="l", procesos=None, salida=SALIDA, precalentar_textos=True):
+    """Renderiza todas las variantes de la rejilla; devuelve el manifiesto."""
+    from manim import __version__
+
+    escena = elegir(ESCENA)
+    base = predeterminados(escena)
+    directorio = os.path.join(salida, CALIDADES[calidad])
+    variantes = []
+    unicas = {}
+    for parametros in expandir(rejilla):
+        # Con los valores por omisión: k=1.5 explícito es la misma variante que sin k
+        canonicos = canonico({**base, **parametros})
+        clave = clave_variante(escena, canonicos, calidad)
+        destino = os.path.join(directorio, f"{escena.clase}_{clave}")
+        existente = next((destino + ext for ext in (".mp4", ".mov", ".webm")
+                          if os.path.exists(destino + ext)), None)
+        if clave in unicas:
+            estado = "duplicada"
+        elif existente:
+            estado = "existente"
+        else:
+            estado = "pendiente"
+            unicas[clave] = canonicos
+        variantes.append({"parametros": parametros, "canonicos": canonicos, "clave": clave,
+                          "estado": estado, "video": existente, "segundos": 0.0})
+
+    if unicas and precalentar_textos:
+        atributos = [{n: repr(v) for n, v in c.items() if n.startswith("color")}
+                     for c in unicas.values()]
+        conteo = resumir(precalentar([escena.archivo], procesos, atributos))
+        print(f"Textos precalentados: {conteo['acierto']} aciertos, {conteo['fallo']} fallos")
+
+    resultados = {}
+    if unicas:
+        procesos = max(1, min(procesos or os.cpu_count(), len(unicas)))
+        print(f"Renderizando {len(unicas)} variantes con {procesos} procesos...")
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar) as pool:
+            tareas = {
+                pool.submit(renderizar_variante, canonicos, calidad,
+                            os.path.join(directorio, f"{escena.clase}_{clave}")): clave
+                for clave, canonicos in unicas.items()
+            }
+            for tarea in as_completed(tareas):
+                clave = tareas[tarea]
+                try:
+                    video, segundos = tarea.result()
+                    resultados[clave] = (video, segundos, "renderizada")
+                    print(f"  {clave} {segundos:7.1f} s")
+                except Exception as error:
+                    resultados[clave] = (None, 0.0, f"error: {error}")
+                    print(f"  {clave} ERROR: {error}")
+
+    videos = {}
+    for variante in variantes:
+        clave = variante["clave"]
+        if variante["estado"] == "pendiente":
+            variante["video"], variante["segundos"], variante["estado"] = resultados[clave]
+        if variante["estado"] != "duplicada":
+            videos[clave] = variante["video"] and os.path.relpath(variante["video"], directorio)
+        variante["video"] = videos[clave]
+
+    manifiesto = {
+        "escena": escena.nombre,
+        "huella": escena.huella,
+        "calidad": CALIDADES[calidad],
+        "manim": __version__,
+        "variantes": variantes,
+    }
+    os.makedirs(directorio, exist_ok=True)
+    with open(os.path.join(directorio, "manifiesto.json"), "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, indent=2, ensure_ascii=False)
+    return manifiesto
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--k", nargs="+", type=float, help="número de onda (visual)")
+    parser.add_argument("--amplitud", nargs="+", type=float)
+    parser.add_argument("--fotogramas", nargs="+", type=int,
+                        help="fotogramas clave de la propagación (duración = n·0.08 s)")
+    parser.add_argument("--color-E", nargs="+", dest="color_E", help="BLUE, TEAL, #ff8800...")
+    parser.add_argument("--color-B", nargs="+", dest="color_B")
+    parser.add_argument("-q", "--calidad", choices=CALIDADES, default="l")
+    parser.add_argument("-j", "--procesos", type=int, default=os.cpu_count())
+    parser.add_argument("-o", "--salida", default=SALIDA)
+    parser.add_argument("--sin-precalentar", action="store_true",
+                        help="no construir antes los Text/MathTex en paralelo")
+    args = parser.parse_args()
+
+    rejilla = {atributo: getattr(args, opcion) for opcion, atributo in PARAMETROS.items()
+               if getattr(args, opcion)}
+    if not rejilla:
+        parser.error("indica al menos un parámetro a barrer")
+
+    inicio = time.perf_counter()
+    manifiesto = barrer(rejilla, args.calidad, args.procesos, args.salida,
+                        not args.sin_precalentar)
+    estados = [v["estado"] for v in manifiesto["variantes"]]
+    errores = sum(e.startswith("error") for e in estados)
+    print(f"{len(estados)} variantes: {estados.count('renderizada')} renderizadas, "
+          f"{estados.count('existente')} ya existían, {estados.count('duplicada')} duplicadas, "
+          f"{errores} errores en {time.perf_counter() - inicio:.1f} s")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
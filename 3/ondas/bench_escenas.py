@@ -0,0 +1,191 @@
+"""
+Benchmark de render para todas las escenas de 3/ondas
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Renderiza cada escena sin caché, a una resolución baja fija, cada una en
+su propio proceso (así el pico de memoria es sólo de esa escena), y guarda
+por escena: tiempo total, tiempo y fotogramas de cada play/wait, pico de
+RSS, tamaño del video y el reparto construct / rasterizado / codificación
+(medidos con perfil.Perfilador). Compara contra una línea base guardada y
+marca como regresión lo que empeore más que el umbral.
+
+Para ejecutar:
+  python bench_escenas.py                       # todas las escenas
+  python bench_escenas.py OndaEMPlana           # sólo las que se llamen así
+  python bench_escenas.py --guardar-base        # fija la línea base
+  python bench_escenas.py --umbral 0.05 --repeticiones 3
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from escenas import DIRECTORIO, Escena, cargar_clase, descubrir_escenas, filtrar
+
+RESULTADOS = os.path.join(DIRECTORIO, "media", "bench", "resultados.json")
+BASE = os.path.join(DIRECTORIO, "bench_base.json")
+# Métricas comparadas contra la línea base (más alto = peor)
+METRICAS = ("segundos", "rss_mb")
+
+
+# ── Medición dentro del proceso hijo ──
+def medir(escena, ancho, alto, fps):
+    """Renderiza la escena en este proceso y devuelve sus métricas."""
+    import manim
+    from manim import tempconfig
+
+    from perfil import Perfilador
+
+    clase = cargar_clase(escena)
+    perfil = Perfilador()
+
+    media = tempfile.mkdtemp(prefix="bench_")
+    ajustes = {
+        "disable_caching": True,
+        "pixel_width": ancho,
+        "pixel_height": alto,
+        "frame_rate": fps,
+        "media_dir": media,
+        "write_to_movie": True,
+        "preview": False,
+        "progress_bar": "none",
+        "verbosity": "WARNING",
+    }
+    try:
+        with tempconfig(ajustes), perfil.instalar(clase):
+            inicio = time.perf_counter()
+            instancia = clase()
+            instancia.render()
+            segundos = time.perf_counter() - inicio
+            video = instancia.renderer.file_writer.movie_file_path
+            tamano = os.path.getsize(video) if video and os.path.exists(video) else 0
+    finally:
+        shutil.rmtree(media, ignore_errors=True)
+
+    # En Linux ru_maxrss viene en KiB
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "escena": escena.nombre,
+        "segundos": segundos,
+        "fotogramas": perfil.fotogramas,
+        "rss_mb": rss / 1024,
+        "video_bytes": tamano,
+        "llamadas": perfil.llamadas,
+        "fases": perfil.resumen(),
+        "manim": manim.__version__,
+    }
+
+
+def medir_en_proceso(escena, ancho, alto, fps):
+    """Lanza un proceso nuevo que mide una sola escena."""
+    orden = [
+        sys.executable, os.path.abspath(__file__),
+        "--medir", escena.archivo, escena.clase,
+        "--ancho", str(ancho), "--alto", str(alto), "--fps", str(fps),
+    ]
+    proceso = subprocess.run(orden, cwd=DIRECTORIO, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        return {"escena": escena.nombre, "error": proceso.stderr.strip().splitlines()[-1:]}
+    # La última línea de stdout es el JSON; lo anterior es salida de manim
+    return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+
+# ── Comparación con la línea base ──
+def comparar(resultados, base, umbral):
+    """Lista de (escena, métrica, base, actual, cambio, es_regresion)."""
+    filas = []
+    previos = {r["escena"]: r for r in base.get("escenas", [])}
+    for r in resultados:
+        anterior = previos.get(r["escena"])
+        if anterior is None or "error" in r or "error" in anterior:
+            continue
+        for metrica in METRICAS:
+            antes, ahora = anterior[metrica], r[metrica]
+            cambio = (ahora - antes) / antes if antes else 0.0
+            filas.append((r["escena"], metrica, antes, ahora, cambio, cambio > umbral))
+    return filas
+
+
+def imprimir(resultados, filas):
+    print(f"{'escena':45} {'s':>8} {'fotog.':>7} {'RSS MB':>8} {'video KB':>9}")
+    for r in resultados:
+        if "error" in r:
+            print(f"{r['escena']:45} ERROR {' '.join(r['error'])}")
+            continue
+        print(f"{r['escena']:45} {r['segundos']:8.2f} {r['fotogramas']:7d} "
+              f"{r['rss_mb']:8.1f} {r['video_bytes'] / 1024:9.1f}")
+    if filas:
+        print()
+        for escena, metrica, antes, ahora, cambio, regresion in filas:
+            marca = "REGRESIÓN" if regresion else ""
+            print(f"{escena:45} {metrica:8} {antes:9.2f} -> {ahora:9.2f} "
+                  f"({cambio:+.1%}) {marca}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("escenas", nargs="*", help="clases o archivo.Clase a medir")
+    parser.add_argument("--ancho", type=int, default=480)
+    parser.add_argument("--alto", type=int, default=270)
+    parser.add_argument("--fps", type=int, default=15)
+    parser.add_argument("--repeticiones", type=int, default=1,
+                        help="se queda con la corrida más rápida de cada escena")
+    parser.add_argument("--salida", default=RESULTADOS)
+    parser.add_argument("--base", default=BASE)
+    parser.add_argument("--guardar-base", action="store_true")
+    parser.add_argument("--umbral", type=float, default=0.10,
+                        help="empeoramiento relativo que cuenta como regresión")
+    parser.add_argument("--medir", nargs=2, metavar=("ARCHIVO", "CLASE"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        escena = Escena(*args.medir)
+        print(json.dumps(medir(escena, args.ancho, args.alto, args.fps)))
+        return 0
+
+    escenas = filtrar(descubrir_escenas(), args.escenas)
+    resultados = []
+    for escena in escenas:
+        corridas = [medir_en_proceso(escena, args.ancho, args.alto, args.fps)
+                    for _ in range(args.repeticiones)]
+        validas = [c for c in corridas if "error" not in c]
+        resultados.append(min(validas, key=lambda c: c["segundos"]) if validas else corridas[0])
+
+    informe = {
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resolucion": [args.ancho, args.alto, args.fps],
+        "escenas": resultados,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+    with open(args.salida, "w") as f:
+        json.dump(informe, f, indent=2)
+
+    filas = []
+    if args.guardar_base:
+        with open(args.base, "w") as f:
+            json.dump(informe, f, indent=2)
+    elif os.path.exists(args.base):
+        with open(args.base) as f:
+            base = json.load(f)
+        if base.get("resolucion") != informe["resolucion"]:
+            print("Aviso: la línea base se midió con otra resolución/fps")
+        filas = comparar(resultados, base, args.umbral)
+
+    imprimir(resultados, filas)
+    errores = any("error" in r for r in resultados)
+    regresiones = any(f[-1] for f in filas)
+    return 1 if errores or regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
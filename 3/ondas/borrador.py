@@ -0,0 +1,147 @@
+"""
+Vista previa en borrador (sin Cairo) de las escenas de 3/ondas
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Ejecuta la escena tal cual (mismo construct, updaters, cámara y ángulos)
+pero reemplaza el rasterizado de Cairo por uno de NumPy: cada curva se
+muestrea en unos pocos puntos por segmento Bézier, se proyecta con la
+misma cámara de la escena y se pinta como puntos sueltos; los rellenos
+(esferas, textos) se aproximan con anillos de puntos hacia el centro.
+Sin antialiasing, grosor de trazo ni sombreado: sirve para revisar
+amplitudes, colores y tiempos, no para entregar.
+
+El reemplazo vive sólo dentro de este proceso; `manim render` sigue
+igual. Los videos quedan en media/borrador/<archivo>/.
+
+Para ejecutar:
+  python borrador.py DielectricoEspacio                 # 320x180 a 10 fps, mp4
+  python borrador.py OndaEMPlana --gif --fps 8
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from escenas import cargar_clase, elegir
+
+MUESTRAS_POR_CURVA = 6
+ANILLOS_RELLENO = (0.2, 0.45, 0.7)
+
+
+def _bernstein(n):
+    t = np.linspace(0, 1, n)[:, None]
+    return np.hstack([(1 - t) ** 3, 3 * t * (1 - t) ** 2, 3 * t ** 2 * (1 - t), t ** 3])
+
+
+BERNSTEIN = _bernstein(MUESTRAS_POR_CURVA)
+
+
+def muestras(mob):
+    """(puntos, colores RGBA 0..1) que representan al mobject en el borrador."""
+    from manim import PMobject
+
+    if isinstance(mob, PMobject):
+        return mob.points, mob.rgbas
+    n = len(mob.points) // 4 * 4
+    if n == 0:
+        return None
+    curvas = mob.points[:n].reshape(-1, 4, 3)
+    contorno = np.einsum("sk,ckd->csd", BERNSTEIN, curvas).reshape(-1, 3)
+    partes, colores = [], []
+    trazo = mob.get_stroke_rgbas()[0]
+    if trazo[3] > 0 and mob.get_stroke_width() > 0:
+        partes.append(contorno)
+        colores.append(np.broadcast_to(trazo, (len(contorno), 4)))
+    relleno = mob.get_fill_rgbas()[0]
+    if relleno[3] > 0:
+        centro = contorno.mean(axis=0)
+        for s in ANILLOS_RELLENO:
+            partes.append(centro + (contorno - centro) * s)
+            colores.append(np.broadcast_to(relleno, (len(contorno), 4)))
+    if not partes:
+        return None
+    return np.concatenate(partes), np.concatenate(colores)
+
+
+def capturar_borrador(camara, mobjects, **kwargs):
+    """Reemplazo de Camera.capture_mobjects: proyección + puntos en NumPy."""
+    puntos, colores = [], []
+    # get_mobjects_to_display ya da el orden de pintado (profundidad en 3D)
+    for mob in camara.get_mobjects_to_display(mobjects, **kwargs):
+        if len(mob.points) == 0:
+            continue
+        resultado = muestras(mob)
+        if resultado is None:
+            continue
+        p, c = resultado
+        puntos.append(camara.transform_points_pre_display(mob, p))
+        colores.append(c)
+    if not puntos:
+        return
+    puntos = np.concatenate(puntos) - camara.frame_center
+    colores = np.concatenate(colores)
+
+    ancho, alto = camara.pixel_width, camara.pixel_height
+    x = (puntos[:, 0] * (ancho / camara.frame_width) + ancho / 2).astype(np.int64)
+    y = (-puntos[:, 1] * (alto / camara.frame_height) + alto / 2).astype(np.int64)
+    visibles = (x >= 0) & (x < ancho) & (y >= 0) & (y < alto) & (colores[:, 3] > 0)
+    x, y, colores = x[visibles], y[visibles], colores[visibles]
+
+    lienzo = camara.pixel_array
+    alfa = colores[:, 3:4]
+    fondo = lienzo[y, x, :3].astype(float)
+    lienzo[y, x, :3] = (fondo * (1 - alfa) + colores[:, :3] * 255 * alfa).astype(np.uint8)
+    lienzo[y, x, 3] = 255
+
+
+def renderizar_borrador(escena, ancho=320, alto=180, fps=10, gif=False):
+    """Renderiza la escena con el rasterizador de borrador; devuelve la ruta."""
+    from manim import tempconfig
+    from manim.camera.camera import Camera
+
+    ajustes = {
+        "pixel_width": ancho,
+        "pixel_height": alto,
+        "frame_rate": fps,
+        "disable_caching": True,
+        "video_dir": "{media_dir}/borrador/{module_name}",
+        "format": "gif" if gif else "mp4",
+        "preview": False,
+        "progress_bar": "none",
+        "verbosity": "WARNING",
+    }
+    original = Camera.capture_mobjects
+    Camera.capture_mobjects = capturar_borrador
+    try:
+        with tempconfig(ajustes):
+            instancia = cargar_clase(escena)()
+            instancia.render()
+    finally:
+        Camera.capture_mobjects = original
+    file_writer = instancia.renderer.file_writer
+    return file_writer.gif_file_path if gif else file_writer.movie_file_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("escena", help="Clase o archivo.Clase")
+    parser.add_argument("--ancho", type=int, default=320)
+    parser.add_argument("--alto", type=int, default=180)
+    parser.add_argument("--fps", type=int, default=10)
+    parser.add_argument("--gif", action="store_true", help="GIF en vez de mp4")
+    args = parser.parse_args()
+    try:
+        escena = elegir(args.escena)
+    except ValueError as error:
+        parser.error(str(error))
+
+    inicio = time.perf_counter()
+    ruta = renderizar_borrador(escena, args.ancho, args.alto, args.fps, args.gif)
+    print(f"Borrador en {time.perf_counter() - inicio:.1f} s -> {ruta}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Cámara 3D para las escenas de ondas
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Misma imagen que ThreeDCamera, con menos trabajo por fotograma:
+
+- HUD en caché: los títulos, ecuaciones y avisos (add_fixed_in_frame_mobjects)
+  casi nunca cambian mientras la cámara gira. Se rasterizan una sola vez en
+  una capa transparente y sólo se vuelven a dibujar cuando cambia algo de
+  ellos; en los demás fotogramas la capa se compone encima de la imagen 3D.
+- Orden por profundidad en lote: los centros de todas las caras (esferas,
+  superficies) salen de un solo arreglo con reduceat, en vez de llamar a
+  get_center() cara por cara.
+- Sombreado en caché: la luz está fija en la escena, así que el color
+  sombreado de una cara sólo depende de sus puntos y colores; mientras
+  sólo se mueve la cámara se reutiliza.
+
+Uso: heredar de Escena3D en lugar de ThreeDScene. Con ONDAS_CONTINUO=1,
+Escena3D además escribe el video en un solo stream (ver escritor.py); con
+ONDAS_AUDITAR=1 / ONDAS_PODAR=1 registra o quita los mobjects invisibles
+que siguen en escena (ver auditoria.py).
+"""
+
+from collections import OrderedDict
+
+from manim import *
+import numpy as np
+
+from auditoria import AuditorMobjects, auditoria_activada, es_invisible, poda_activada, tiene_updaters
+from escritor import EscritorContinuo, continuo_activado
+
+
+def huella_vmobject(vmobject):
+    """Todo lo que cambia el dibujo de un VMobject fijo en pantalla."""
+    return (
+        id(vmobject),
+        hash(vmobject.points.tobytes()),
+        hash(np.asarray(vmobject.get_fill_rgbas()).tobytes()),
+        hash(np.asarray(vmobject.get_stroke_rgbas()).tobytes()),
+        hash(np.asarray(vmobject.get_stroke_rgbas(background=True)).tobytes()),
+        vmobject.get_stroke_width(),
+        vmobject.get_stroke_width(background=True),
+    )
+
+
+def profundidades(lista_puntos, matriz_rotacion):
+    """Profundidad de cámara del centro de cada VMobject sin submobjects.
+
+    El centro es el de la caja de sus anclas, igual que get_center(); todos
+    se calculan juntos con un solo minimum/maximum.reduceat.
+    """
+    puntos = np.concatenate(lista_puntos)
+    anclas = puntos.reshape(-1, 4, 3)[:, [0, 3]].reshape(-1, 3)
+    tamanos = np.fromiter((len(p) // 2 for p in lista_puntos), dtype=int, count=len(lista_puntos))
+    inicios = np.concatenate([[0], np.cumsum(tamanos)[:-1]])
+    centros = (np.minimum.reduceat(anclas, inicios) + np.maximum.reduceat(anclas, inicios)) / 2
+    return centros @ matriz_rotacion[2]
+
+
+# ─── Cámara 3D ───
+class Camara3D(ThreeDCamera):
+    """ThreeDCamera con HUD, orden por profundidad y sombreado en caché."""
+
+    MAX_SOMBREADOS = 20_000  # mobjects con sombreado guardado
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._capa_hud = None
+        self._huella_hud = None
+        self._caja_hud = None
+        self._sombreados = OrderedDict()
+        self.rasterizados_hud = 0
+        self.composiciones_hud = 0
+        self.sombreados_calculados = 0
+
+    # ── Orden por profundidad ──
+    def get_mobjects_to_display(self, *args, **kwargs):
+        mobjects = Camera.get_mobjects_to_display(self, *args, **kwargs)
+        rotacion = self.get_rotation_matrix()
+        z = np.full(len(mobjects), np.inf)
+        lote, en_lote = [], []
+        for i, mob in enumerate(mobjects):
+            if not getattr(mob, "shade_in_3d", False):
+                continue
+            n = len(mob.points)
+            if (isinstance(mob, VMobject) and not mob.submobjects and n and n % 4 == 0
+                    and getattr(mob, "z_index_group", mob) is mob):
+                lote.append(mob.points)
+                en_lote.append(i)
+            else:
+                z[i] = np.dot(mob.get_z_index_reference_point(), rotacion.T)[2]
+        if lote:
+            z[en_lote] = profundidades(lote, rotacion)
+        # Estable, como sorted(): los que no son 3D (z = inf) quedan al final en su orden
+        return [mobjects[i] for i in np.argsort(z, kind="stable")]
+
+    # ── Sombreado ──
+    def modified_rgbas(self, vmobject, rgbas):
+        if not (self.should_apply_shading and vmobject.shade_in_3d
+                and vmobject.get_num_points() > 0):
+            return rgbas
+        rgbas = np.asarray(rgbas)
+        # Una entrada por mobject (LRU); se invalida si cambian sus puntos o la luz
+        puntos = (vmobject.points.shape, hash(vmobject.points.tobytes()),
+                  hash(self.light_source.points[0].tobytes()))
+        entrada = self._sombreados.get(id(vmobject))
+        if entrada is None or entrada[0] is not vmobject or entrada[1] != puntos:
+            entrada = self._sombreados[id(vmobject)] = (vmobject, puntos, {})
+        self._sombreados.move_to_end(id(vmobject))
+        if len(self._sombreados) > self.MAX_SOMBREADOS:
+            self._sombreados.popitem(last=False)
+        # Relleno, trazo y trazo de fondo llegan con rgbas distintos
+        clave = (rgbas.shape, hash(rgbas.tobytes()))
+        sombreado = entrada[2].get(clave)
+        if sombreado is None:
+            sombreado = entrada[2][clave] = super().modified_rgbas(vmobject, rgbas)
+            self.sombreados_calculados += 1
+        return sombreado
+
+    # ── HUD ──
+    def display_multiple_vectorized_mobjects(self, vmobjects, pixel_array):
+        # Los fijos en pantalla comparten z = inf con todo lo que no es
+        # shade_in_3d (ejes, curvas...) y quedan en orden de inserción: sólo
+        # se componen aparte cuando son justo el final del orden de pintado
+        n_hud = 0
+        while n_hud < len(vmobjects) and vmobjects[-1 - n_hud] in self.fixed_in_frame_mobjects:
+            n_hud += 1
+        if (n_hud == 0 or pixel_array is not self.pixel_array
+                or any(m in self.fixed_in_frame_mobjects for m in vmobjects[:-n_hud])):
+            return super().display_multiple_vectorized_mobjects(vmobjects, pixel_array)
+        super().display_multiple_vectorized_mobjects(vmobjects[:-n_hud], pixel_array)
+        self.componer_hud(vmobjects[-n_hud:])
+
+    def componer_hud(self, hud):
+        huella = tuple(huella_vmobject(m) for m in hud)
+        if huella != self._huella_hud or self._capa_hud.shape != self.pixel_array.shape:
+            self._rasterizar_hud(hud)
+            self._huella_hud = huella
+        if self._caja_hud is None:
+            return
+        # Cairo deja la capa con alfa premultiplicado: fondo·(1 - α) + capa
+        y0, y1, x0, x1 = self._caja_hud
+        capa = self._capa_hud[y0:y1, x0:x1].astype(np.uint16)
+        fondo = self.pixel_array[y0:y1, x0:x1]
+        transparencia = 255 - capa[..., 3:4]
+        fondo[:] = capa + (fondo * transparencia + 127) // 255
+        self.composiciones_hud += 1
+
+    def _rasterizar_hud(self, hud):
+        if self._capa_hud is None or self._capa_hud.shape != self.pixel_array.shape:
+            if self._capa_hud is not None:
+                # El contexto de Cairo se guarda por id del arreglo
+                self.pixel_array_to_cairo_context.pop(id(self._capa_hud), None)
+            self._capa_hud = np.zeros_like(self.pixel_array)
+        else:
+            self._capa_hud.fill(0)
+        super().display_multiple_vectorized_mobjects(hud, self._capa_hud)
+        filas = np.flatnonzero(self._capa_hud[..., 3].any(axis=1))
+        columnas = np.flatnonzero(self._capa_hud[..., 3].any(axis=0))
+        if len(filas) == 0:
+            self._caja_hud = None
+        else:
+            self._caja_hud = (filas[0], filas[-1] + 1, columnas[0], columnas[-1] + 1)
+        self.rasterizados_hud += 1
+
+
+# ─── Escena base ───
+class Escena3D(ThreeDScene):
+    """ThreeDScene que usa Camara3D (y EscritorContinuo, auditoría y poda si
+    están activados)."""
+
+    def __init__(self, camera_class=Camara3D, renderer=None, **kwargs):
+        if renderer is None and continuo_activado() and config.renderer == RendererType.CAIRO:
+            renderer = CairoRenderer(
+                file_writer_class=EscritorContinuo,
+                camera_class=camera_class,
+                skip_animations=kwargs.get("skip_animations", False),
+            )
+        super().__init__(camera_class=camera_class, renderer=renderer, **kwargs)
+        self.podar = poda_activada()
+        self.auditor = AuditorMobjects() if auditoria_activada() or self.podar else None
+
+    # ── Mobjects invisibles ──
+    def update_to_time(self, t):
+        super().update_to_time(t)
+        if self.auditor is not None:
+            self.auditor.revisar(self)
+
+    def play(self, *args, **kwargs):
+        super().play(*args, **kwargs)
+        if self.podar:
+            self.podar_invisibles()
+
+    def podar_invisibles(self):
+        """Quita de la escena los mobjects invisibles sin updaters; devuelve cuántos."""
+        podados = [m for m in self.mobjects if es_invisible(m) and not tiene_updaters(m)]
+        if podados:
+            # Siguen marcados como fijos en pantalla: si una animación los
+            # vuelve a agregar, aparecen donde estaban
+            self.remove(*podados)
+            for mob in podados:
+                self.auditor.podado(mob)
+        return len(podados)
+
+    def tear_down(self):
+        super().tear_down()
+        if self.auditor is not None:
+            self.auditor.reportar()
@@ -0,0 +1,95 @@
+"""
+Muestreo vectorizado de campos para las animaciones de ondas
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Evalúa amplitud*sin(k*x - t) sobre todo el arreglo de x a la vez y lo
+lleva a coordenadas de escena con la transformación de los ejes en un solo
+lote de NumPy, en lugar de llamar a axes.c2p punto por punto.
+
+Uso típico dentro de construct():
+  muestreo_E = MuestreadorCampo(x_vals, amplitude, k, eje=1, axes=axes)
+  puntos = muestreo_E.puntos(t)            # (n_puntos, 3)
+  lote = muestreo_E.puntos([t0, t1, t2])   # (3, n_puntos, 3)
+"""
+
+import numpy as np
+
+
+def transformacion_ejes(axes=None):
+    """Descompone los ejes como transformación afín.
+
+    Devuelve (origen, base) tal que axes.c2p(x, y, z) == origen + [x, y, z] @ base.
+    Sin ejes se usa la identidad (coordenadas de escena directas).
+    """
+    if axes is None:
+        return np.zeros(3), np.eye(3)
+    origen = np.asarray(axes.c2p(0, 0, 0), dtype=float)
+    base = np.array([axes.c2p(*e) for e in np.eye(3)], dtype=float) - origen
+    return origen, base
+
+
+class MuestreadorCampo:
+    """Campo armónico amplitud*sin(k*x - t) muestreado sobre x_vals.
+
+    eje: componente de los ejes en la que oscila el campo (0=x, 1=y, 2=z).
+    t puede ser un escalar o un arreglo de desfases; el resultado agrega
+    las dimensiones de t al frente.
+    """
+
+    def __init__(self, x_vals, amplitud, k, eje, axes=None):
+        self.x_vals = np.asarray(x_vals, dtype=float)
+        self.amplitud = amplitud
+        self.k = k
+        self.eje = eje
+
+        origen, base = transformacion_ejes(axes)
+        # Puntos sobre el eje de propagación (campo nulo) y dirección de
+        # oscilación, ya en coordenadas de escena
+        self.puntos_eje = origen + np.outer(self.x_vals, base[0])
+        self.direccion = base[eje]
+
+        # sin(kx - t) = sin(kx)·cos(t) - cos(kx)·sin(t)
+        # La parte espacial se calcula una sola vez; cada t cuesta dos senos
+        self._sen_kx = amplitud * np.sin(k * self.x_vals)
+        self._cos_kx = amplitud * np.cos(k * self.x_vals)
+
+    def parametros(self):
+        """Todo lo que determina las muestras (para claves de caché)."""
+        return {
+            "x_vals": self.x_vals,
+            "amplitud": self.amplitud,
+            "k": self.k,
+            "puntos_eje": self.puntos_eje,
+            "direccion": self.direccion,
+        }
+
+    def valores(self, t=0):
+        """Valor del campo en cada x: forma t.shape + (n_puntos,)."""
+        t = np.asarray(t, dtype=float)
+        return (np.multiply.outer(np.cos(t), self._sen_kx)
+                - np.multiply.outer(np.sin(t), self._cos_kx))
+
+    def puntos(self, t=0):
+        """Puntos de la curva en la escena: forma t.shape + (n_puntos, 3)."""
+        return self.puntos_eje + self.valores(t)[..., None] * self.direccion
+
+
+def fijar_esquinas(vmobject, puntos):
+    """Equivalente a vmobject.set_points_as_corners(puntos) escribiendo en su lugar.
+
+    Si la curva ya tiene el mismo número de puntos se reutiliza su arreglo
+    (sin crear objetos nuevos por fotograma); si no, se reconstruye normal.
+    """
+    puntos = np.asarray(puntos, dtype=float)
+    n_curvas = len(puntos) - 1
+    if (vmobject.points.shape != (4 * n_curvas, 3)
+            or not vmobject.points.flags.c_contiguous):
+        return vmobject.set_points_as_corners(puntos)
+    # Cada segmento recto es una Bézier cúbica: ancla, 1/3, 2/3, ancla
+    destino = vmobject.points.reshape(n_curvas, 4, 3)
+    inicio, fin = puntos[:-1], puntos[1:]
+    destino[:, 0] = inicio
+    destino[:, 1] = inicio + (fin - inicio) / 3
+    destino[:, 2] = inicio + 2 * (fin - inicio) / 3
+    destino[:, 3] = fin
+    return vmobject
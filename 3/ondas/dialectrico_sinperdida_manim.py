@@ -13,7 +13,20 @@ Para alta calidad:
 from manim import *
 import numpy as np
 
-class OndaEMPlana(ThreeDScene):
+from camara import Escena3D
+from campos import MuestreadorCampo, fijar_esquinas
+from fotogramas import Fotogramas
+from medios import MedioEstratificado, Region
+from objetos import CampoEstrellas, EsferaLOD, PoolFlechas3D, plantilla
+
+class OndaEMPlana(Escena3D):
+    # ── Parámetros de la onda (barrido.py renderiza variantes cambiándolos) ──
+    amplitude = 1.5
+    k = 1.5  # número de onda (visual)
+    n_frames = 40
+    color_E = BLUE
+    color_B = RED
+
     def construct(self):
         # ── Configuración de cámara 3D ──
         self.set_camera_orientation(phi=65*DEGREES, theta=-45*DEGREES)
@@ -28,7 +41,8 @@ class OndaEMPlana(ThreeDScene):
         self.play(Write(titulo), Write(subtitulo), run_time=1.5)
 
         # ── Ejes 3D ──
-        axes = ThreeDAxes(
+        axes = plantilla(
+            ThreeDAxes,
             x_range=[-0.5, 7, 1],
             y_range=[-2, 2, 1],
             z_range=[-2, 2, 1],
@@ -39,12 +53,12 @@ class OndaEMPlana(ThreeDScene):
         )
 
         # Etiquetas de ejes
-        label_z = axes.get_z_axis_label(MathTex("z", color=WHITE), edge=RIGHT)
+        label_z = axes.get_z_axis_label(plantilla(MathTex, "z", color=WHITE), edge=RIGHT)
         label_x = axes.get_x_axis_label(
-            MathTex("\\hat{k}", color=YELLOW, font_size=36), edge=RIGHT
+            plantilla(MathTex, "\\hat{k}", color=YELLOW, font_size=36), edge=RIGHT
         )
-        label_E = Text("E (campo eléctrico)", font_size=14, color=BLUE)
-        label_B = Text("B (campo magnético)", font_size=14, color=RED)
+        label_E = plantilla(Text, "E (campo eléctrico)", font_size=14, color=self.color_E)
+        label_B = plantilla(Text, "B (campo magnético)", font_size=14, color=self.color_B)
         label_E.to_corner(DL).shift(UP*0.5)
         label_B.next_to(label_E, DOWN, buff=0.1)
         self.add_fixed_in_frame_mobjects(label_E, label_B)
@@ -55,57 +69,66 @@ class OndaEMPlana(ThreeDScene):
         # ── Parámetros de la onda ──
         n_points = 300
         x_vals = np.linspace(0, 6.5, n_points)
-        amplitude = 1.5
-        k = 1.5  # número de onda (visual)
+        amplitude = self.amplitude
+        k = self.k
+
+        # Muestreo vectorizado: una sola operación NumPy por curva y por t
+        muestreo_E = MuestreadorCampo(x_vals, amplitude, k, eje=1, axes=axes)
+        muestreo_B = MuestreadorCampo(x_vals, amplitude, k, eje=2, axes=axes)
+        x_flechas = np.linspace(0.3, 6.3, 12)
+        muestreo_flechas_E = MuestreadorCampo(x_flechas, amplitude, k, eje=1, axes=axes)
+        muestreo_flechas_B = MuestreadorCampo(x_flechas, amplitude, k, eje=2, axes=axes)
+
+        # ── Fotogramas clave: se calculan una vez y se reutilizan entre renders ──
+        n_frames = self.n_frames
+        t_final = 4 * PI  # 2 ciclos completos
+        duracion_propagacion = n_frames * 0.08
+        muestreos = {
+            "E": muestreo_E,
+            "B": muestreo_B,
+            "flechas_E": muestreo_flechas_E,
+            "flechas_B": muestreo_flechas_B,
+        }
+        fotogramas = Fotogramas(
+            "OndaEMPlana",
+            {nombre: m.parametros() for nombre, m in muestreos.items()},
+            lambda tiempos: {nombre: m.puntos(tiempos) for nombre, m in muestreos.items()},
+            0, t_final, duracion_propagacion,
+            directorio=config.get_dir("media_dir") / "fotogramas",
+        )
 
         # ── Campo E (oscila en eje Y - azul) ──
         def campo_E(t_offset=0):
-            points = []
-            for x in x_vals:
-                y = amplitude * np.sin(k * x - t_offset)
-                points.append(axes.c2p(x, y, 0))
-            return VMobject().set_points_as_corners(points).set_color(BLUE).set_stroke(width=3)
+            points = fotogramas.tramo("E", t_offset)
+            return VMobject().set_points_as_corners(points).set_color(self.color_E).set_stroke(width=3)
 
         # ── Campo B (oscila en eje Z - rojo) ──
         def campo_B(t_offset=0):
-            points = []
-            for x in x_vals:
-                z = amplitude * np.sin(k * x - t_offset)
-                points.append(axes.c2p(x, 0, z))
-            return VMobject().set_points_as_corners(points).set_color(RED).set_stroke(width=3)
+            points = fotogramas.tramo("B", t_offset)
+            return VMobject().set_points_as_corners(points).set_color(self.color_B).set_stroke(width=3)
 
         # ── Flechas representativas E y B ──
+        # Pool fijo: las mismas 12 flechas se reacomodan en cada fotograma
+        def flechas(nombre, color, t_offset=0):
+            muestreo = muestreos[nombre]
+            arrows = PoolFlechas3D(
+                muestreo.puntos_eje,
+                muestreo.direccion,
+                umbral=0.1,
+                color=color,
+                resolution=4,
+                thickness=0.02,
+            )
+            return arrows.fijar_extremos(fotogramas.tramo(nombre, t_offset))
+
         def flechas_E(t_offset=0):
-            arrows = VGroup()
-            for x in np.linspace(0.3, 6.3, 12):
-                y = amplitude * np.sin(k * x - t_offset)
-                if abs(y) > 0.1:
-                    arr = Arrow3D(
-                        start=axes.c2p(x, 0, 0),
-                        end=axes.c2p(x, y, 0),
-                        color=BLUE,
-                        resolution=4,
-                        thickness=0.02,
-                    )
-                    arrows.add(arr)
-            return arrows
+            return flechas("flechas_E", self.color_E, t_offset)
 
         def flechas_B(t_offset=0):
-            arrows = VGroup()
-            for x in np.linspace(0.3, 6.3, 12):
-                z = amplitude * np.sin(k * x - t_offset)
-                if abs(z) > 0.1:
-                    arr = Arrow3D(
-                        start=axes.c2p(x, 0, 0),
-                        end=axes.c2p(x, 0, z),
-                        color=RED,
-                        resolution=4,
-                        thickness=0.02,
-                    )
-                    arrows.add(arr)
-            return arrows
+            return flechas("flechas_B", self.color_B, t_offset)
 
         # ── Dibujar ondas iniciales ──
+        self.next_section("ondas")
         curva_E = campo_E(0)
         curva_B = campo_B(0)
         arr_E = flechas_E(0)
@@ -115,13 +138,15 @@ class OndaEMPlana(ThreeDScene):
         self.play(Create(arr_E), Create(arr_B), run_time=1.5)
 
         # ── Ecuación en pantalla ──
-        eq1 = MathTex(
+        eq1 = plantilla(
+            MathTex,
             r"\mathbf{E}(z,t) = E_0 \cos(\omega t - \beta z)\,\hat{x}",
-            font_size=22, color=BLUE
+            font_size=22, color=self.color_E
         )
-        eq2 = MathTex(
+        eq2 = plantilla(
+            MathTex,
             r"\mathbf{H}(z,t) = H_0 \cos(\omega t - \beta z)\,\hat{y}",
-            font_size=22, color=RED
+            font_size=22, color=self.color_B
         )
         eq1.to_corner(DR).shift(UP*1.2)
         eq2.next_to(eq1, DOWN, buff=0.2)
@@ -129,36 +154,38 @@ class OndaEMPlana(ThreeDScene):
         self.play(Write(eq1), Write(eq2), run_time=1.5)
 
         # ── Rotación de cámara inicial ──
+        self.next_section("rotacion")
         self.begin_ambient_camera_rotation(rate=0.15)
         self.wait(2)
         self.stop_ambient_camera_rotation()
 
         # ── Animación de propagación ──
+        self.next_section("propagacion")
         aviso = Text("Propagación en dirección +z →", font_size=16, color=YELLOW)
         aviso.to_edge(DOWN)
         self.add_fixed_in_frame_mobjects(aviso)
         self.play(Write(aviso))
 
-        # Animar 2 ciclos completos
-        n_frames = 40
-        for i in range(1, n_frames + 1):
-            t = (i / n_frames) * 4 * PI
-            nueva_E = campo_E(t)
-            nueva_B = campo_B(t)
-            nuevas_arrE = flechas_E(t)
-            nuevas_arrB = flechas_B(t)
-            self.play(
-                Transform(curva_E, nueva_E),
-                Transform(curva_B, nueva_B),
-                Transform(arr_E, nuevas_arrE),
-                Transform(arr_B, nuevas_arrB),
-                run_time=0.08,
-                rate_func=linear
-            )
+        # Animar 2 ciclos completos: un solo parámetro de tiempo continuo
+        # y las curvas y flechas se actualizan en su lugar en cada fotograma
+        tiempo = ValueTracker(0)
+        curva_E.add_updater(lambda m: fijar_esquinas(m, fotogramas.tramo("E", tiempo.get_value())))
+        curva_B.add_updater(lambda m: fijar_esquinas(m, fotogramas.tramo("B", tiempo.get_value())))
+        arr_E.add_updater(lambda m: m.fijar_extremos(fotogramas.tramo("flechas_E", tiempo.get_value())))
+        arr_B.add_updater(lambda m: m.fijar_extremos(fotogramas.tramo("flechas_B", tiempo.get_value())))
+        self.play(
+            tiempo.animate.set_value(t_final),
+            run_time=duracion_propagacion,
+            rate_func=linear
+        )
+        for m in (curva_E, curva_B, arr_E, arr_B):
+            m.clear_updaters()
 
         # ── Condición TEM destacada ──
+        self.next_section("tem")
         self.play(FadeOut(aviso))
-        tem = MathTex(
+        tem = plantilla(
+            MathTex,
             r"\mathbf{E} \perp \mathbf{B} \perp \hat{k}",
             font_size=32, color=YELLOW
         )
@@ -188,7 +215,7 @@ class OndaEMPlana(ThreeDScene):
 
 
 # ─── Escena de onda esférica con reveal 3D ───
-class OndaEsferica(ThreeDScene):
+class OndaEsferica(Escena3D):
     def construct(self):
         # Cámara frontal al inicio (vista 2D)
         self.set_camera_orientation(phi=0*DEGREES, theta=-90*DEGREES)
@@ -208,7 +235,8 @@ class OndaEsferica(ThreeDScene):
         self.play(Write(vista2d))
 
         # Fuente puntual
-        fuente = Sphere(radius=0.12, color=YELLOW)
+        # Esferas con nivel de detalle según su tamaño en pantalla y la calidad
+        fuente = EsferaLOD(radius=0.12, camara=self.camera, color=YELLOW)
         fuente.set_opacity(1)
         self.play(Create(fuente), run_time=0.5)
 
@@ -218,7 +246,7 @@ class OndaEsferica(ThreeDScene):
         esferas = []
 
         for color, r in zip(colores, radios_max):
-            esfera = Sphere(radius=0.05)
+            esfera = EsferaLOD(radius=0.05, camara=self.camera)
             esfera.set_stroke(color=color, width=2)
             esfera.set_opacity(0)
             esferas.append(esfera)
@@ -229,7 +257,7 @@ class OndaEsferica(ThreeDScene):
         anims = []
         for i, (e, r, color) in enumerate(zip(esferas, radios_max, colores)):
             opacidad = max(0.15, 0.9 / (i + 1))
-            nueva = Sphere(radius=r)
+            nueva = EsferaLOD(radius=r, camara=self.camera)
             nueva.set_stroke(color=color, width=2.5 - i*0.3)
             nueva.set_opacity(opacidad * 0.3)
             anims.append(Transform(e, nueva))
@@ -238,6 +266,7 @@ class OndaEsferica(ThreeDScene):
         self.wait(0.5)
 
         # ── FASE 2: Reveal 3D — rotación de cámara ──
+        self.next_section("reveal_3d")
         self.play(FadeOut(vista2d))
         reveal = Text("¡En realidad son frentes de onda ESFÉRICOS!", 
                       font_size=16, color=YELLOW)
@@ -291,22 +320,13 @@ class OndaEsferica(ThreeDScene):
 
 
 # ─── Escena: Dieléctrico sin pérdidas — Onda en el espacio 3D ───
-class DielectricoEspacio(ThreeDScene):
+class DielectricoEspacio(Escena3D):
     def construct(self):
         # Cámara ligeramente inclinada para dar sensación 3D desde el inicio
         self.set_camera_orientation(phi=55*DEGREES, theta=-60*DEGREES)
 
-        # ── Fondo: estrellas en 3D ──
-        import random
-        random.seed(42)
-        estrellas = VGroup()
-        for _ in range(150):
-            x = random.uniform(-7, 7)
-            y = random.uniform(-5, 5)
-            z = random.uniform(-3, -0.5)
-            star = Dot3D(point=[x, y, z], radius=random.uniform(0.02, 0.05), color=WHITE)
-            star.set_opacity(random.uniform(0.3, 1.0))
-            estrellas.add(star)
+        # ── Fondo: estrellas en 3D (una sola nube de puntos, misma semilla) ──
+        estrellas = CampoEstrellas(n=150, semilla=42)
         self.add(estrellas)
 
         # ── Título ──
@@ -316,10 +336,11 @@ class DielectricoEspacio(ThreeDScene):
         self.play(Write(titulo), run_time=1)
 
         # ── Sol en 3D ──
-        sol = Sphere(radius=0.6, resolution=(16, 16))
+        # Resolución automática según tamaño en pantalla, calidad y cámara
+        sol = EsferaLOD(radius=0.6, camara=self.camera)
         sol.set_color(YELLOW)
         sol.set_opacity(1)
-        sol_glow = Sphere(radius=0.85, resolution=(12, 12))
+        sol_glow = EsferaLOD(radius=0.85, camara=self.camera)
         sol_glow.set_color(ORANGE)
         sol_glow.set_opacity(0.25)
         sol_grupo = VGroup(sol_glow, sol).move_to([-5.5, 0, 0])
@@ -329,13 +350,13 @@ class DielectricoEspacio(ThreeDScene):
         self.play(Create(sol_grupo), Write(label_sol), run_time=1.2)
 
         # ── Planeta con atmósfera en 3D ──
-        planeta = Sphere(radius=0.75, resolution=(20, 20))
+        planeta = EsferaLOD(radius=0.75, camara=self.camera)
         planeta.set_color("#1A6BA0")
         planeta.set_opacity(1)
-        atm1 = Sphere(radius=1.0, resolution=(16, 16))
+        atm1 = EsferaLOD(radius=1.0, camara=self.camera)
         atm1.set_color(TEAL)
         atm1.set_opacity(0.12)
-        atm2 = Sphere(radius=1.3, resolution=(14, 14))
+        atm2 = EsferaLOD(radius=1.3, camara=self.camera)
         atm2.set_color(BLUE_A)
         atm2.set_opacity(0.06)
         planeta_grupo = VGroup(atm2, atm1, planeta).move_to([4.5, 0, 0])
@@ -366,53 +387,90 @@ class DielectricoEspacio(ThreeDScene):
         self.play(Write(sub_vacio), Write(sub_atm), run_time=0.8)
 
         # ── Aviso parte 1 — abajo solo ──
+        self.next_section("vacio")
         aviso1 = Text("Onda viajando en el vacío...", font_size=14, color=GREY)
         aviso1.to_edge(DOWN)
         self.add_fixed_in_frame_mobjects(aviso1)
         self.play(Write(aviso1))
 
+        # ── Medio: vacío | atmósfera, interfaz en el divisor ──
+        # ε_r de la atmósfera exagerado para que la compresión de λ se vea
+        # (β pasa de 2.2 a 4.2); la onda incide desde el Sol hacia +x
+        medio = MedioEstratificado(
+            [Region(), Region(eps_r=(4.2 / 2.2) ** 2)],
+            interfaces=[3.0], k0=2.2, amplitud=1.1,
+        )
+        x_vacio = np.linspace(-5.0, 3.0, 300)
+        x_atm = np.linspace(3.0, 5.5, 200)
+
+        def curvas(x, tiempos, parte="total"):
+            y = medio.campo(x, tiempos, parte)
+            return np.stack(np.broadcast_arrays(x, y, 0.0), axis=-1)
+
+        # Fotogramas clave de todo el recorrido (antes 17 + 21 pasos de 0.3)
+        t_vacio, t_atm = 17 * 0.3, 21 * 0.3
+        fotogramas = Fotogramas(
+            "DielectricoEspacio",
+            dict(medio.parametros(), x_vacio=x_vacio, x_atm=x_atm),
+            lambda tiempos: {
+                "incidente": curvas(x_vacio, tiempos, "incidente"),
+                "vacio": curvas(x_vacio, tiempos),
+                "atmosfera": curvas(x_atm, tiempos),
+            },
+            0, t_vacio + t_atm, (17 + 21) * 0.07,
+            directorio=config.get_dir("media_dir") / "fotogramas",
+        )
+
         # ── Onda en vacío (λ grande, color amarillo) ──
-        def onda_vacio(offset=0):
-            pts = []
-            for x in np.linspace(-5.0, 2.9, 300):
-                y = 1.1 * np.sin(2.2 * (x + offset))
-                pts.append([x, y, 0])
-            return VMobject().set_points_as_corners(pts).set_color(YELLOW).set_stroke(width=3)
-
-        # ── Onda en atmósfera (λ menor, misma amplitud, color teal) ──
-        def onda_atm(offset=0):
-            pts = []
-            for x in np.linspace(3.0, 5.5, 200):
-                y = 1.1 * np.sin(4.2 * (x + offset))
-                pts.append([x, y, 0])
-            return VMobject().set_points_as_corners(pts).set_color(TEAL).set_stroke(width=3)
+        # Antes de llegar al dieléctrico sólo está la onda incidente; la
+        # reflejada en la interfaz se suma con peso reflejo (0 → 1)
+        reflejo = ValueTracker(0)
+
+        def puntos_vacio(t):
+            incidente = fotogramas.tramo("incidente", t)
+            peso = reflejo.get_value()
+            if peso == 0:
+                return incidente
+            return incidente + peso * (fotogramas.tramo("vacio", t) - incidente)
+
+        def onda_vacio(t=0):
+            return VMobject().set_points_as_corners(puntos_vacio(t)).set_color(YELLOW).set_stroke(width=3)
+
+        # ── Onda en atmósfera (λ menor, transmitida, color teal) ──
+        def onda_atm(t=0):
+            puntos = fotogramas.tramo("atmosfera", t)
+            return VMobject().set_points_as_corners(puntos).set_color(TEAL).set_stroke(width=3)
 
         onda_v = onda_vacio(0)
         self.play(Create(onda_v), run_time=1.5)
 
-        # Propagar en vacío
-        for i in range(1, 18):
-            t = i * 0.3
-            self.play(Transform(onda_v, onda_vacio(t)), run_time=0.07, rate_func=linear)
+        # Propagar en vacío: un solo parámetro de tiempo continuo,
+        # la curva se actualiza en su lugar
+        tiempo = ValueTracker(0)
+        onda_v.add_updater(lambda m: fijar_esquinas(m, puntos_vacio(tiempo.get_value())))
+        self.play(tiempo.animate.set_value(t_vacio), run_time=17 * 0.07, rate_func=linear)
 
         # ── Onda entra al dieléctrico ──
+        self.next_section("dielectrico")
         self.play(FadeOut(aviso1))
         aviso2 = Text("Entra al dieléctrico — se comprime... ¡pero NO desaparece!", font_size=13, color=GREEN)
         aviso2.to_edge(DOWN)
         self.add_fixed_in_frame_mobjects(aviso2)
         self.play(Write(aviso2))
 
-        onda_a = onda_atm(0)
-        self.play(Create(onda_a), run_time=1)
+        # La onda transmitida aparece mientras la reflejada se suma en el
+        # vacío; ambas usan el mismo tiempo, así la fase coincide en x = 3
+        onda_a = onda_atm(tiempo.get_value())
+        self.play(Create(onda_a), reflejo.animate.set_value(1), run_time=1)
 
-        # Propagar ambas
-        for i in range(1, 22):
-            t = i * 0.3
-            self.play(
-                Transform(onda_v, onda_vacio(t)),
-                Transform(onda_a, onda_atm(t)),
-                run_time=0.07, rate_func=linear
-            )
+        # Propagar ambas desde donde quedaron
+        onda_a.add_updater(lambda m: fijar_esquinas(m, fotogramas.tramo("atmosfera", tiempo.get_value())))
+        self.play(
+            tiempo.animate.set_value(t_vacio + t_atm),
+            run_time=21 * 0.07, rate_func=linear
+        )
+        onda_v.clear_updaters()
+        onda_a.clear_updaters()
 
         self.wait(0.5)
 
@@ -425,6 +483,7 @@ class DielectricoEspacio(ThreeDScene):
         self.wait(1.5)
 
         # ── Rotación de cámara para apreciar el 3D ──
+        self.next_section("rotacion_3d")
         self.play(FadeOut(aviso3))
         aviso4 = Text("Vista 3D — propagación en el espacio", font_size=14, color=YELLOW)
         aviso4.to_edge(DOWN)
@@ -437,6 +496,7 @@ class DielectricoEspacio(ThreeDScene):
         self.stop_ambient_camera_rotation()
 
         # ── Fade out ──
+        self.next_section("cierre")
         self.play(
             FadeOut(onda_v), FadeOut(onda_a),
             FadeOut(sol_grupo), FadeOut(planeta_grupo),
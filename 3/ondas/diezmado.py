@@ -0,0 +1,316 @@
+"""
+Pirámide de diezmado para las trazas del medidor E/B
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+El osciloscopio del firmware (dibujarOsciloscopio) sólo guarda 128 puntos
+por canal. En la computadora queremos pasar de un día completo a muestras
+sueltas sin mandarle millones de puntos a la gráfica.
+
+PiramideDiezmado guarda, para gauss y e_v, niveles de cubetas de
+FACTOR^k muestras con el mínimo, el máximo y el promedio de cada una. Se
+construye sobre la marcha: cada agregar() sólo agrega a los niveles las
+cubetas que se completaron. Una consulta elige el nivel más fino que da
+a lo más los puntos pedidos y lee sólo las cubetas que caen enteras en el
+rango. Cada borde (y el final que el nivel todavía no cubre) se junta en
+una sola cubeta con lo que dan los niveles de abajo, así nunca se cuelan
+muestras de fuera y los puntos pedidos se respetan aunque sean pocos
+(más allá del último nivel todo el rango es una cubeta). El tiempo de
+una consulta depende de los puntos pedidos, no del rango.
+
+- envolvente(): mínimo y máximo por cubeta (nada de picos perdidos).
+- lttb(): Largest-Triangle-Three-Buckets sobre los mínimos y máximos de
+  un nivel con a lo más 2·puntos cubetas (como MinMaxLTTB): una sola
+  línea con la forma de la señal.
+
+Para ejecutar:
+  python diezmado.py sesiones/hoy --puntos 1000
+  python diezmado.py sesiones/hoy --desde 3600 --hasta 3660 --lttb
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+FACTOR = 8
+CANALES = ("gauss", "e_v")
+
+
+class _Arreglo:
+    """Arreglo 1-D que crece al final duplicando su capacidad."""
+
+    def __init__(self, dtype, capacidad=1024):
+        self._datos = np.empty(capacidad, dtype=dtype)
+        self.n = 0
+
+    def agregar(self, valores):
+        n = self.n + len(valores)
+        if n > len(self._datos):
+            datos = np.empty(max(n, 2 * len(self._datos)), dtype=self._datos.dtype)
+            datos[:self.n] = self._datos[:self.n]
+            self._datos = datos
+        self._datos[self.n:n] = valores
+        self.n = n
+
+    def __getitem__(self, indice):
+        return self._datos[:self.n][indice]
+
+
+class _Nivel:
+    """Cubetas de FACTOR^k muestras: t promedio y mínimo/máximo/promedio por canal."""
+
+    def __init__(self, k, canales):
+        self.k = k
+        self.tam = FACTOR ** k
+        self.t = _Arreglo(np.float64)
+        campos = ("min", "max", "medio") if k else ("medio",)
+        self.columnas = {(c, campo): _Arreglo(np.float32) for c in canales for campo in campos}
+
+    @property
+    def n(self):
+        return self.t.n
+
+    def columna(self, canal, campo):
+        # En el nivel 0 cada cubeta es una muestra: mínimo = máximo = valor
+        return self.columnas[(canal, campo if self.k else "medio")]
+
+
+# ─── Pirámide ───
+class PiramideDiezmado:
+    """Niveles de mínimo/máximo/promedio que se construyen al agregar muestras."""
+
+    def __init__(self, canales=CANALES):
+        self.canales = tuple(canales)
+        self.niveles = [_Nivel(0, self.canales)]
+
+    def __len__(self):
+        return self.niveles[0].n
+
+    def agregar(self, muestras):
+        """Agrega muestras (arreglo MUESTRA o dict de columnas con t y los canales)."""
+        t = np.asarray(muestras["t"], dtype=np.float64)
+        if len(t) == 0:
+            return
+        if len(self) and t[0] < self.niveles[0].t[-1]:
+            raise ValueError("los tiempos no pueden ir hacia atrás")
+        base = self.niveles[0]
+        base.t.agregar(t)
+        for c in self.canales:
+            base.columnas[(c, "medio")].agregar(muestras[c])
+        self._subir()
+
+    def _subir(self):
+        # Cada nivel toma las cubetas completas que el de abajo ya tiene
+        k = 1
+        while True:
+            abajo = self.niveles[k - 1]
+            if k == len(self.niveles):
+                if abajo.n < FACTOR:
+                    return
+                self.niveles.append(_Nivel(k, self.canales))
+            nivel = self.niveles[k]
+            inicio, fin = nivel.n * FACTOR, (abajo.n // FACTOR) * FACTOR
+            if fin <= inicio:
+                return
+            grupos = slice(inicio, fin)
+            nivel.t.agregar(abajo.t[grupos].reshape(-1, FACTOR).mean(axis=1))
+            for c in self.canales:
+                minimos = abajo.columna(c, "min")[grupos].reshape(-1, FACTOR)
+                maximos = abajo.columna(c, "max")[grupos].reshape(-1, FACTOR)
+                medios = abajo.columna(c, "medio")[grupos].reshape(-1, FACTOR)
+                nivel.columnas[(c, "min")].agregar(minimos.min(axis=1))
+                nivel.columnas[(c, "max")].agregar(maximos.max(axis=1))
+                nivel.columnas[(c, "medio")].agregar(medios.mean(axis=1, dtype=np.float64))
+            k += 1
+
+    # ── Consultas ──
+    def indices(self, desde=None, hasta=None):
+        """Muestras [a, b) con desde <= t < hasta."""
+        t = self.niveles[0].t
+        a = 0 if desde is None else int(np.searchsorted(t[:], desde))
+        b = len(self) if hasta is None else int(np.searchsorted(t[:], hasta))
+        return a, max(a, b)
+
+    def _enteras(self, k, a, b):
+        """Cubetas [i0, i1) del nivel k que caen enteras en las muestras [a, b)."""
+        if k >= len(self.niveles):
+            return 0, 0
+        tam = FACTOR ** k
+        return -(-a // tam), min(b // tam, self.niveles[k].n)
+
+    def _contar(self, k, a, b):
+        """Cubetas que da el nivel k para las muestras [a, b), bordes incluidos."""
+        if a >= b:
+            return 0
+        i0, i1 = self._enteras(k, a, b)
+        if i0 >= i1:
+            return 1
+        tam = FACTOR ** k
+        return i1 - i0 + (a < i0 * tam) + (i1 * tam < b)
+
+    def nivel_para(self, a, b, cubetas):
+        """Nivel más fino con a lo más cubetas cubetas para las muestras [a, b).
+
+        Puede ser len(niveles): el rango entero en una cubeta.
+        """
+        for k in range(len(self.niveles)):
+            if self._contar(k, a, b) <= cubetas:
+                return k
+        return len(self.niveles)
+
+    def _cubetas(self, k, a, b, canal, campos):
+        """Cubetas del nivel k para las muestras [a, b): partes [n, t, *campos].
+
+        Sólo se leen del nivel k las cubetas que caen enteras en [a, b). Cada
+        borde y lo que el nivel k todavía no cubre (menos de FACTOR^k muestras
+        al final) se juntan en una cubeta con lo que da el nivel k - 1, y así
+        hacia abajo hasta el nivel 0, que es exacto.
+        """
+        if a >= b:
+            return []
+        if k == 0:
+            base = self.niveles[0]
+            return [[np.ones(b - a, dtype=np.int64), base.t[a:b]]
+                    + [base.columna(canal, c)[a:b] for c in campos]]
+        i0, i1 = self._enteras(k, a, b)
+        if i0 >= i1:
+            return [_juntar(self._cubetas(k - 1, a, b, canal, campos), campos)]
+        nivel = self.niveles[k]
+        cabeza = self._cubetas(k - 1, a, i0 * nivel.tam, canal, campos)
+        cola = self._cubetas(k - 1, i1 * nivel.tam, b, canal, campos)
+        enteras = [np.full(i1 - i0, nivel.tam, dtype=np.int64), nivel.t[i0:i1]]
+        enteras += [nivel.columna(canal, c)[i0:i1] for c in campos]
+        partes = [enteras]
+        if cabeza:
+            partes.insert(0, _juntar(cabeza, campos))
+        if cola:
+            partes.append(_juntar(cola, campos))
+        return partes
+
+    def _leer(self, k, a, b, canal, campos):
+        """[t, *campos] de las cubetas del nivel k para las muestras [a, b)."""
+        partes = self._cubetas(k, a, b, canal, campos)
+        if not partes:
+            return [np.zeros(0)] * (len(campos) + 1)
+        return [np.concatenate(columna) for columna in list(zip(*partes))[1:]]
+
+    def envolvente(self, canal, desde=None, hasta=None, puntos=1000):
+        """(t, mínimo, máximo) con a lo más puntos cubetas en [desde, hasta)."""
+        a, b = self.indices(desde, hasta)
+        return tuple(self._leer(self.nivel_para(a, b, puntos), a, b, canal, ("min", "max")))
+
+    def lttb(self, canal, desde=None, hasta=None, puntos=1000):
+        """(t, y) con puntos muestras de la señal en [desde, hasta) elegidas con LTTB."""
+        a, b = self.indices(desde, hasta)
+        if b - a <= puntos:
+            return tuple(self._leer(0, a, b, canal, ("medio",)))
+        k = self.nivel_para(a, b, 2 * puntos)
+        t, minimos, maximos = self._leer(k, a, b, canal, ("min", "max"))
+        if k:
+            # Mínimo y máximo de cada cubeta como dos puntos: si la señal sube
+            # respecto a la cubeta anterior va primero el mínimo
+            centros = minimos.astype(np.float64) + maximos
+            baja = np.r_[False, centros[1:] < centros[:-1]]
+            t = np.repeat(t, 2)
+            y = np.column_stack([np.where(baja, maximos, minimos),
+                                 np.where(baja, minimos, maximos)]).ravel()
+        else:
+            y = minimos
+        elegidos = lttb(t, y, puntos)
+        return t[elegidos], y[elegidos]
+
+
+def _juntar(partes, campos):
+    """Una sola cubeta [n, t, *campos] con todas las de partes."""
+    n = np.concatenate([p[0] for p in partes])
+    total = n.sum()
+    cubeta = [np.array([total]), np.array([np.dot(n, np.concatenate([p[1] for p in partes]))
+                                           / total])]
+    for i, campo in enumerate(campos, start=2):
+        valores = np.concatenate([p[i] for p in partes])
+        if campo == "min":
+            valor = valores.min()
+        elif campo == "max":
+            valor = valores.max()
+        else:
+            valor = np.dot(n, valores.astype(np.float64)) / total
+        cubeta.append(np.array([valor], dtype=np.float32))
+    return cubeta
+
+
+def lttb(x, y, puntos):
+    """Índices de los puntos que elige Largest-Triangle-Three-Buckets."""
+    n = len(x)
+    if puntos >= n:
+        return np.arange(n)
+    if puntos < 3:
+        return np.array([0, n - 1][:max(puntos, 0)], dtype=np.int64)
+    # Primer y último punto fijos; el resto en puntos - 2 cubetas
+    bordes = np.linspace(1, n - 1, puntos - 1).astype(np.int64)
+    elegidos = np.empty(puntos, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Promedios de cada cubeta (el tercer vértice del triángulo es el de la siguiente)
+    sumas_x = np.add.reduceat(x[1:n - 1], bordes[:-1] - 1)
+    sumas_y = np.add.reduceat(y[1:n - 1], bordes[:-1] - 1)
+    tamanos = np.diff(bordes)
+    medios_x = np.append(sumas_x / tamanos, x[-1])
+    medios_y = np.append(sumas_y / tamanos, y[-1])
+    anterior = 0
+    for i in range(puntos - 2):
+        a, b = bordes[i], bordes[i + 1]
+        xa, ya = x[anterior], y[anterior]
+        areas = np.abs((xa - medios_x[i + 1]) * (y[a:b] - ya)
+                       - (xa - x[a:b]) * (medios_y[i + 1] - ya))
+        anterior = a + int(np.argmax(areas))
+        elegidos[i + 1] = anterior
+    return elegidos
+
+
+def desde_sesion(sesion, canales=CANALES, tramo=1 << 20):
+    """Pirámide de una sesión grabada (grabacion.Sesion), leída por tramos."""
+    piramide = PiramideDiezmado(canales)
+    for a in range(0, len(sesion), tramo):
+        b = min(a + tramo, len(sesion))
+        piramide.agregar({c: sesion.columna(c)[a:b] for c in ("t",) + tuple(canales)})
+    return piramide
+
+
+def main():
+    from grabacion import Sesion
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sesion")
+    parser.add_argument("--desde", type=float, help="s desde el inicio de la sesión")
+    parser.add_argument("--hasta", type=float, help="s desde el inicio de la sesión")
+    parser.add_argument("--puntos", type=int, default=1000)
+    parser.add_argument("--canal", choices=CANALES, default="e_v")
+    parser.add_argument("--lttb", action="store_true", help="una línea en vez de la envolvente")
+    args = parser.parse_args()
+
+    sesion = Sesion(args.sesion)
+    inicio = time.perf_counter()
+    piramide = desde_sesion(sesion)
+    construccion = time.perf_counter() - inicio
+    desde = None if args.desde is None else sesion.tiempo(args.desde)
+    hasta = None if args.hasta is None else sesion.tiempo(args.hasta)
+
+    inicio = time.perf_counter()
+    if args.lttb:
+        t, y = piramide.lttb(args.canal, desde, hasta, args.puntos)
+        extremos = (y.min(), y.max()) if len(y) else (np.nan, np.nan)
+    else:
+        t, minimos, maximos = piramide.envolvente(args.canal, desde, hasta, args.puntos)
+        extremos = (minimos.min(), maximos.max()) if len(t) else (np.nan, np.nan)
+    consulta = time.perf_counter() - inicio
+    print(f"{len(piramide)} muestras, {len(piramide.niveles)} niveles "
+          f"(construcción {construccion * 1000:.1f} ms)")
+    print(f"{len(t)} puntos de {args.canal} entre {extremos[0]:.3f} y {extremos[1]:.3f} "
+          f"en {consulta * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Descubrimiento y carga de las escenas de 3/ondas
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Encuentra las clases de escena leyendo el código con ast (sin importar
+manim), de modo que las herramientas de benchmark y render por lotes
+pueden listar las escenas aunque el módulo todavía no se haya cargado.
+"""
+
+import ast
+import copy
+import hashlib
+import importlib.util
+import os
+import sys
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+BASES_ESCENA = {"Scene", "ThreeDScene", "MovingCameraScene", "ZoomedScene", "Escena3D"}
+
+
+class Escena:
+    """Una clase de escena dentro de un archivo: (archivo, clase)."""
+
+    def __init__(self, archivo, clase, nodo=None, contexto=()):
+        self.archivo = os.path.abspath(archivo)
+        self.clase = clase
+        self.nodo = nodo
+        self.contexto = contexto
+
+    @property
+    def nombre(self):
+        """Identificador único: archivo sin extensión + clase."""
+        modulo = os.path.splitext(os.path.basename(self.archivo))[0]
+        return f"{modulo}.{self.clase}"
+
+    def dependencias(self):
+        """Lo que la clase usa del módulo, como texto: imports y definiciones.
+
+        Sólo cuentan los nombres que la clase (o lo que ella usa) resuelve;
+        los imports con * cuentan siempre.
+        """
+        usados = _nombres_usados(self.nodo)
+        incluidos = set()
+        cambio = True
+        while cambio:
+            cambio = False
+            for i, nodo in enumerate(self.contexto):
+                if i not in incluidos and _definidos(nodo) & usados:
+                    incluidos.add(i)
+                    usados |= _nombres_usados(nodo)
+                    cambio = True
+        textos = []
+        for i, nodo in enumerate(self.contexto):
+            if isinstance(nodo, (ast.Import, ast.ImportFrom)):
+                origen = ("from " + "." * nodo.level + (nodo.module or "") + " "
+                          if isinstance(nodo, ast.ImportFrom) else "")
+                for alias in nodo.names:
+                    if alias.name == "*" or _nombre_ligado(alias) in usados:
+                        textos.append(f"{origen}import {alias.name} as {_nombre_ligado(alias)}")
+            elif i in incluidos:
+                textos.append(ast.dump(sin_docstrings(nodo)))
+        return textos
+
+    @property
+    def huella(self):
+        """Hash del código de la clase y de lo que usa del módulo.
+
+        Dos escenas con la misma huella producen el mismo video aunque estén
+        en archivos distintos (no cuenta docstrings, comentarios, líneas ni
+        imports que la clase no usa).
+        """
+        h = hashlib.sha1()
+        for texto in self.dependencias():
+            h.update(texto.encode())
+        h.update(ast.dump(sin_docstrings(self.nodo)).encode())
+        return h.hexdigest()[:16]
+
+    def __repr__(self):
+        return f"Escena({self.nombre})"
+
+
+def sin_docstrings(nodo):
+    """Copia de nodo sin los docstrings de clases y funciones."""
+    nodo = copy.deepcopy(nodo)
+    for n in ast.walk(nodo):
+        if (isinstance(n, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)) and n.body
+                and isinstance(n.body[0], ast.Expr) and isinstance(n.body[0].value, ast.Constant)
+                and isinstance(n.body[0].value.value, str)):
+            n.body = n.body[1:] or [ast.Pass()]
+    return nodo
+
+
+def _nombres_usados(nodo):
+    return {n.id for n in ast.walk(nodo) if isinstance(n, ast.Name)}
+
+
+def _nombre_ligado(alias):
+    return alias.asname or alias.name.split(".")[0]
+
+
+def _definidos(nodo):
+    """Nombres que liga una sentencia del nivel superior del módulo."""
+    if isinstance(nodo, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+        return {nodo.name}
+    if isinstance(nodo, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+        objetivos = nodo.targets if isinstance(nodo, ast.Assign) else [nodo.target]
+        return {n.id for t in objetivos for n in ast.walk(t) if isinstance(n, ast.Name)}
+    return set()
+
+
+def _nombre_base(base):
+    if isinstance(base, ast.Name):
+        return base.id
+    if isinstance(base, ast.Attribute):
+        return base.attr
+    return None
+
+
+def escenas_en_archivo(archivo):
+    """Clases del archivo que heredan (directamente o entre sí) de una escena."""
+    with open(archivo, encoding="utf-8") as f:
+        arbol = ast.parse(f.read(), filename=archivo)
+    clases = [n for n in arbol.body if isinstance(n, ast.ClassDef)]
+    # Lo que la clase puede usar del módulo (Escena.dependencias elige)
+    definiciones = [n for n in arbol.body
+                    if isinstance(n, (ast.Import, ast.ImportFrom, ast.Assign, ast.AnnAssign,
+                                      ast.AugAssign, ast.FunctionDef, ast.AsyncFunctionDef,
+                                      ast.ClassDef))]
+    escenas = set(BASES_ESCENA)
+    encontradas = []
+    # Una pasada por clase basta: en Python la base va antes que la subclase
+    for nodo in clases:
+        if any(_nombre_base(b) in escenas for b in nodo.bases):
+            escenas.add(nodo.name)
+            contexto = tuple(n for n in definiciones if n is not nodo)
+            encontradas.append(Escena(archivo, nodo.name, nodo, contexto))
+    return encontradas
+
+
+def descubrir_escenas(directorio=DIRECTORIO, patron="_manim.py"):
+    """Todas las escenas de los archivos *_manim.py del directorio, en orden."""
+    escenas = []
+    for archivo in sorted(os.listdir(directorio)):
+        if archivo.endswith(patron):
+            escenas.extend(escenas_en_archivo(os.path.join(directorio, archivo)))
+    return escenas
+
+
+def filtrar(escenas, nombres):
+    """Escenas cuyo nombre completo o nombre de clase está en nombres."""
+    if not nombres:
+        return escenas
+    return [e for e in escenas if e.nombre in nombres or e.clase in nombres]
+
+
+def elegir(nombre, directorio=DIRECTORIO):
+    """La única escena distinta que coincide con nombre (ValueError si no)."""
+    escenas = filtrar(descubrir_escenas(directorio), [nombre])
+    if len({e.huella for e in escenas}) != 1:
+        coinciden = ", ".join(e.nombre for e in escenas) or "ninguna"
+        raise ValueError(f"'{nombre}' debe elegir una sola escena (coinciden: {coinciden})")
+    return escenas[0]
+
+
+def modulos_locales(archivo, vistos=None):
+    """Archivos .py del directorio importados (directa o indirectamente) por archivo."""
+    vistos = set() if vistos is None else vistos
+    with open(archivo, encoding="utf-8") as f:
+        arbol = ast.parse(f.read(), filename=archivo)
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.ImportFrom) and nodo.module:
+            nombres = [nodo.module]
+        elif isinstance(nodo, ast.Import):
+            nombres = [a.name for a in nodo.names]
+        else:
+            continue
+        for nombre in nombres:
+            ruta = os.path.join(DIRECTORIO, nombre + ".py")
+            if os.path.exists(ruta) and ruta not in vistos:
+                vistos.add(ruta)
+                modulos_locales(ruta, vistos)
+    return sorted(vistos)
+
+
+def cargar_clase(escena):
+    """Importa el archivo de la escena y devuelve la clase (requiere manim)."""
+    directorio = os.path.dirname(escena.archivo)
+    if directorio not in sys.path:
+        sys.path.insert(0, directorio)
+    modulo = os.path.splitext(os.path.basename(escena.archivo))[0]
+    spec = importlib.util.spec_from_file_location(modulo, escena.archivo)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[modulo] = mod
+    spec.loader.exec_module(mod)
+    return getattr(mod, escena.clase)
@@ -0,0 +1,85 @@
+"""
+Escritura continua del video de una escena
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Normalmente manim abre un codificador nuevo en cada self.play, escribe un
+archivo parcial por animación y al final los concatena. En los bucles de
+propagación eso son decenas de plays de 0.07 s: abrir y cerrar el
+codificador y escribir/leer los parciales cuesta más que rasterizarlos.
+
+EscritorContinuo abre un solo contenedor (el video final, con el mismo
+códec y las mismas opciones que los parciales) en el primer play y le
+manda todos los fotogramas de la escena; no hay archivos parciales ni
+paso de concatenación. Cada play se renderiza siempre (la caché por
+animación no sirve sin parciales).
+
+Se usa automáticamente en las escenas que heredan de Escena3D cuando la
+variable de entorno ONDAS_CONTINUO=1 está definida. Con --save_sections o
+formato GIF se vuelve al modo normal.
+
+Para ejecutar:
+  ONDAS_CONTINUO=1 manim -ql --disable_caching onda_plana_manim.py OndaEMPlana
+  python render_lote.py --continuo
+"""
+
+import os
+import shutil
+
+from manim import *
+
+VARIABLE = "ONDAS_CONTINUO"
+
+
+def continuo_activado():
+    return os.environ.get(VARIABLE, "") not in ("", "0")
+
+
+# ─── Escritor de un solo contenedor ───
+class EscritorContinuo(SceneFileWriter):
+    """SceneFileWriter que codifica toda la escena en un único stream."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.continuo = write_to_movie() and not is_gif_format() and not config.save_sections
+        self._abierto = False
+
+    def is_already_cached(self, hash_invocation):
+        if self.continuo:
+            return False
+        return super().is_already_cached(hash_invocation)
+
+    def begin_animation(self, allow_write=False, file_path=None):
+        if not self.continuo:
+            return super().begin_animation(allow_write, file_path)
+        if allow_write and not self._abierto:
+            self.open_partial_movie_stream(file_path=self.movie_file_path)
+            self._abierto = True
+
+    def end_animation(self, allow_write=False):
+        # El stream sigue abierto para el siguiente play
+        if not self.continuo:
+            super().end_animation(allow_write)
+
+    def finish(self):
+        if not self.continuo:
+            return super().finish()
+        if not self._abierto:
+            logger.info("No animations are contained in this scene.")
+        else:
+            self.close_partial_movie_stream()
+            self._abierto = False
+            if self.includes_sound:
+                self._agregar_sonido()
+            else:
+                self.print_file_ready_message(str(self.movie_file_path))
+        if self.subcaptions:
+            self.write_subcaption_file()
+
+    def _agregar_sonido(self):
+        # combine_to_movie ya sabe mezclar el audio; con un solo "parcial"
+        # la concatenación es una copia del stream
+        ruta = os.path.join(self.partial_movie_directory, "continuo" + config.movie_file_extension)
+        shutil.move(str(self.movie_file_path), ruta)
+        self.partial_movie_files = [ruta]
+        self.combine_to_movie()
+        os.remove(ruta)
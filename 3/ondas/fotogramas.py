@@ -0,0 +1,119 @@
+"""
+Tabla de fotogramas clave precalculada para las escenas de ondas
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Cada escena calcula una sola vez el estado completo de sus ondas como un
+arreglo (fotogramas, puntos, 3) y lo guarda en disco como .npy, con una
+clave derivada de los parámetros de la onda (no de la calidad de render).
+Los renders siguientes, en -ql/-qm/-qh o tras editar sólo textos, abren el
+archivo con mmap y no repiten nada de la matemática de los campos.
+
+Los fotogramas clave se toman a 60 por segundo de animación, así los
+fotogramas de 15, 30 y 60 fps caen exactamente sobre filas de la tabla;
+cualquier otro instante se interpola linealmente entre dos filas.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+
+from escenas import modulos_locales
+
+DIRECTORIO = os.path.join("media", "fotogramas")
+CLAVES_POR_SEGUNDO = 60
+
+
+def _serializable(valor):
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return str(valor)
+
+
+def clave_parametros(nombre, parametros):
+    """Nombre de archivo estable para un conjunto de parámetros."""
+    texto = json.dumps(parametros, sort_keys=True, default=_serializable)
+    return f"{nombre}-{hashlib.sha1(texto.encode()).hexdigest()[:16]}"
+
+
+def huella_codigo(calcular):
+    """Hash del código de calcular y de los módulos locales que importa su archivo.
+
+    calcular suele ser una lambda que llama a campos.py o medios.py: su
+    propio código no cambia cuando cambia la matemática de esos módulos.
+    """
+    h = hashlib.sha1()
+    try:
+        h.update(inspect.getsource(calcular).encode())
+        archivo = inspect.getsourcefile(calcular)
+    except (OSError, TypeError):
+        return None
+    for ruta in modulos_locales(archivo):
+        with open(ruta, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+class Fotogramas:
+    """Estados precalculados de una escena, indexados por un tiempo continuo t.
+
+    calcular(tiempos) devuelve un dict {tramo: arreglo (len(tiempos), n, 3)};
+    los tramos se concatenan a lo largo del eje de puntos en un solo arreglo.
+    Si ya existe en disco un arreglo con los mismos parámetros (incluido el
+    código de calcular y de los módulos locales que usa, ver huella_codigo),
+    se abre con mmap en lugar de recalcular.
+    """
+
+    def __init__(self, nombre, parametros, calcular, t_inicio, t_fin, duracion,
+                 directorio=DIRECTORIO):
+        self.t_inicio = t_inicio
+        self.t_fin = t_fin
+        n_claves = max(2, int(round(duracion * CLAVES_POR_SEGUNDO)) + 1)
+        parametros = dict(parametros, t_inicio=t_inicio, t_fin=t_fin, n_claves=n_claves)
+        parametros["huella_codigo"] = huella_codigo(calcular)
+
+        self.clave = clave_parametros(nombre, parametros)
+        ruta = os.path.join(directorio, self.clave)
+        self.recalculado = not (os.path.exists(ruta + ".npy") and os.path.exists(ruta + ".json"))
+        if self.recalculado:
+            tiempos = np.linspace(t_inicio, t_fin, n_claves)
+            tramos = calcular(tiempos)
+            self.tramos = {}
+            inicio = 0
+            for tramo, datos in tramos.items():
+                self.tramos[tramo] = (inicio, inicio + datos.shape[1])
+                inicio += datos.shape[1]
+            todo = np.concatenate(list(tramos.values()), axis=1).astype(float)
+            self._guardar(ruta, todo)
+        with open(ruta + ".json") as f:
+            self.tramos = {k: tuple(v) for k, v in json.load(f)["tramos"].items()}
+        self.datos = np.load(ruta + ".npy", mmap_mode="r")
+
+    def _guardar(self, ruta, todo):
+        # Escritura atómica: varios renders en paralelo pueden calcular la misma tabla
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as f:
+            np.save(f, np.ascontiguousarray(todo))
+        os.replace(temporal, ruta + ".npy")
+        with open(temporal, "w") as f:
+            json.dump({"tramos": self.tramos, "forma": list(todo.shape)}, f)
+        os.replace(temporal, ruta + ".json")
+
+    def tramo(self, nombre, t):
+        """Puntos del tramo en el instante t (interpolando entre fotogramas clave)."""
+        desde, hasta = self.tramos[nombre]
+        n_claves = len(self.datos)
+        posicion = (t - self.t_inicio) / (self.t_fin - self.t_inicio) * (n_claves - 1)
+        posicion = min(max(posicion, 0.0), n_claves - 1.0)
+        i = min(int(posicion), n_claves - 2)
+        fraccion = posicion - i
+        a = self.datos[i, desde:hasta]
+        if fraccion < 1e-9:
+            return np.array(a)
+        b = self.datos[i + 1, desde:hasta]
+        return a + (b - a) * fraccion
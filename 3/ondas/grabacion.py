@@ -0,0 +1,425 @@
+"""
+Grabación de sesiones del medidor E/B
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Las sesiones de campo duran horas; volcarlas como CSV (Gauss,mTesla,E_V,
+Nivel,BarraActiva) hace lento volver a cargarlas y ocupa varias veces lo
+que ocupan los números. Una sesión es un directorio que sólo crece:
+
+  meta.json     canales con su tipo, tamaño de bloque y hora de inicio
+  indice.bin    una entrada por bloque: t_primero, t_ultimo, n (24 bytes)
+  <canal>.bin   una columna por canal (t, gauss, mtesla, e_v, nivel, barra
+                y, en modo binario, seq, ain0, ain1, offset_mv y flags de
+                cada trama, para reproduccion.py)
+
+Las columnas se escriben en bloques de BLOQUE muestras; sólo el último
+puede estar incompleto. Sesion lee meta.json y el índice (24 h a 35 Hz
+son unos 740 bloques, 18 KB) y mapea las columnas en memoria sin leerlas:
+una consulta por tiempo busca sus bloques en el índice y sólo toca las
+páginas de esos bloques.
+
+Si el proceso se corta a media escritura, al reabrir la sesión se
+recortan las columnas a lo que registra el índice.
+
+Para ejecutar:
+  python grabacion.py grabar sesiones/hoy /dev/ttyACM0 --binario
+  python grabacion.py grabar sesiones/prueba --simular -d 60
+  python grabacion.py importar captura.csv sesiones/vieja
+  python grabacion.py info sesiones/hoy
+  python grabacion.py exportar sesiones/hoy --desde 3600 --hasta 3660 > tramo.csv
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from medidor import ENCABEZADO, MUESTRA, NIVELES, parsear_bloque
+
+FORMATO = 1
+BLOQUE = 4096  # muestras por bloque
+INDICE = np.dtype([("t_primero", "<f8"), ("t_ultimo", "<f8"), ("n", "<i8")])
+
+
+def _tipos_disco(dtype):
+    # Las columnas siempre en little-endian, sea cual sea la máquina
+    return [(nombre, dtype[nombre].newbyteorder("<").str) for nombre in dtype.names]
+
+
+def _leer_meta(ruta):
+    with open(os.path.join(ruta, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("formato") != FORMATO:
+        raise ValueError(f"{ruta}: formato de sesión {meta.get('formato')} desconocido")
+    return meta
+
+
+def _leer_indice(ruta):
+    archivo = os.path.join(ruta, "indice.bin")
+    if not os.path.exists(archivo):
+        return np.zeros(0, dtype=INDICE)
+    # Una entrada a medio escribir se ignora
+    n = os.path.getsize(archivo) // INDICE.itemsize
+    return np.fromfile(archivo, dtype=INDICE, count=n)
+
+
+# ─── Escritura ───
+class EscritorSesion:
+    """Agrega muestras (arreglos MUESTRA) al final de una sesión.
+
+    Las muestras se juntan en memoria y se escriben por bloques completos;
+    volcar() escribe también el bloque incompleto (que luego se sigue
+    llenando). Los tiempos no pueden ir hacia atrás. tipo (MUESTRA o
+    medidor.MUESTRA_TRAMA) fija los canales de una sesión nueva.
+    """
+
+    def __init__(self, ruta, bloque=BLOQUE, t0_unix=None, origen="", tipo=MUESTRA):
+        self.ruta = ruta
+        os.makedirs(ruta, exist_ok=True)
+        if os.path.exists(os.path.join(ruta, "meta.json")):
+            self.meta = _leer_meta(ruta)
+        else:
+            self.meta = {
+                "formato": FORMATO,
+                "bloque": bloque,
+                "canales": _tipos_disco(tipo),
+                # t + t0_unix = hora Unix (t de medidor es time.monotonic())
+                "t0_unix": time.time() - time.monotonic() if t0_unix is None else t0_unix,
+                "inicio": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "origen": origen,
+            }
+            temporal = os.path.join(ruta, "meta.json.tmp")
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(self.meta, f, indent=2, ensure_ascii=False)
+            os.replace(temporal, os.path.join(ruta, "meta.json"))
+        self.bloque = self.meta["bloque"]
+        self.tipos = {nombre: np.dtype(tipo) for nombre, tipo in self.meta["canales"]}
+        self._tipo = np.dtype([(nombre, t.newbyteorder("=")) for nombre, t in self.tipos.items()])
+
+        self.indice = _leer_indice(ruta)
+        self.escritas = int(self.indice["n"].sum())
+        self._recortar()
+        self._archivos = {nombre: open(self._columna(nombre), "ab") for nombre in self.tipos}
+        self._archivo_indice = open(os.path.join(ruta, "indice.bin"), "r+b")
+        self._pendientes = []
+        self._n_pendientes = 0
+
+    def _columna(self, nombre):
+        return os.path.join(self.ruta, f"{nombre}.bin")
+
+    def _recortar(self):
+        # Lo que quedó después de la última entrada del índice no cuenta
+        with open(os.path.join(self.ruta, "indice.bin"), "ab") as f:
+            f.truncate(len(self.indice) * INDICE.itemsize)
+        for nombre, tipo in self.tipos.items():
+            with open(self._columna(nombre), "ab") as f:
+                f.truncate(self.escritas * tipo.itemsize)
+
+    @property
+    def muestras(self):
+        """Escritas en disco más las pendientes."""
+        return self.escritas + self._n_pendientes
+
+    @property
+    def t_ultimo(self):
+        if self._pendientes:
+            return float(self._pendientes[-1]["t"][-1])
+        return float(self.indice["t_ultimo"][-1]) if len(self.indice) else -np.inf
+
+    def agregar(self, muestras):
+        if len(muestras) == 0:
+            return
+        t = muestras["t"]
+        if t[0] < self.t_ultimo or np.any(np.diff(t) < 0):
+            raise ValueError("los tiempos de una sesión no pueden ir hacia atrás")
+        tramo = np.empty(len(muestras), dtype=self._tipo)
+        for nombre in self.tipos:
+            tramo[nombre] = muestras[nombre]
+        self._pendientes.append(tramo)
+        self._n_pendientes += len(muestras)
+        if self._n_pendientes >= self._libres():
+            self._escribir(completos=True)
+
+    def volcar(self):
+        """Escribe todo lo pendiente, incluido el bloque incompleto."""
+        if self._pendientes:
+            self._escribir(completos=False)
+        for f in self._archivos.values():
+            f.flush()
+        self._archivo_indice.flush()
+
+    def cerrar(self):
+        self.volcar()
+        for f in self._archivos.values():
+            f.close()
+        self._archivo_indice.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    # ── Internos ──
+    def _libres(self):
+        """Muestras que faltan para completar el último bloque en disco."""
+        return self.bloque - (self.escritas % self.bloque)
+
+    def _escribir(self, completos):
+        muestras = np.concatenate(self._pendientes)
+        hecho = 0
+        while hecho < len(muestras):
+            n = min(self._libres(), len(muestras) - hecho)
+            if completos and n < self._libres():
+                break
+            self._escribir_tramo(muestras[hecho:hecho + n])
+            hecho += n
+        resto = muestras[hecho:]
+        self._pendientes = [resto] if len(resto) else []
+        self._n_pendientes = len(resto)
+
+    def _escribir_tramo(self, tramo):
+        # Primero las columnas y después el índice: si algo se corta, el
+        # índice nunca apunta a datos que no están
+        for nombre, f in self._archivos.items():
+            f.write(np.ascontiguousarray(tramo[nombre], dtype=self.tipos[nombre]).tobytes())
+            f.flush()
+        if self.escritas % self.bloque:
+            # Se sigue llenando el último bloque: se reescribe su entrada
+            entrada = self.indice[-1].copy()
+            entrada["t_ultimo"] = tramo["t"][-1]
+            entrada["n"] += len(tramo)
+            self.indice[-1] = entrada
+        else:
+            entrada = np.array((tramo["t"][0], tramo["t"][-1], len(tramo)), dtype=INDICE)
+            self.indice = np.append(self.indice, entrada)
+        self._archivo_indice.seek((len(self.indice) - 1) * INDICE.itemsize)
+        self._archivo_indice.write(self.indice[-1:].tobytes())
+        self._archivo_indice.flush()
+        self.escritas += len(tramo)
+
+
+# ─── Lectura ───
+class Sesion:
+    """Sesión grabada, con las columnas mapeadas en memoria (sólo lectura)."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.meta = _leer_meta(ruta)
+        self.bloque = self.meta["bloque"]
+        self.tipos = {nombre: np.dtype(tipo) for nombre, tipo in self.meta["canales"]}
+        self.indice = _leer_indice(ruta)
+        self.n = int(self.indice["n"].sum())
+        self._inicios = np.concatenate([[0], np.cumsum(self.indice["n"])]).astype(np.int64)
+        self._columnas = {}
+
+    def __len__(self):
+        return self.n
+
+    def columna(self, nombre):
+        """La columna completa como memmap (no se lee hasta que se usa)."""
+        if nombre not in self._columnas:
+            if self.n == 0:
+                self._columnas[nombre] = np.zeros(0, dtype=self.tipos[nombre])
+            else:
+                self._columnas[nombre] = np.memmap(
+                    os.path.join(self.ruta, f"{nombre}.bin"),
+                    dtype=self.tipos[nombre], mode="r", shape=(self.n,),
+                )
+        return self._columnas[nombre]
+
+    @property
+    def duracion(self):
+        if not len(self.indice):
+            return 0.0
+        return float(self.indice["t_ultimo"][-1] - self.indice["t_primero"][0])
+
+    def tiempo(self, segundos):
+        """Segundos desde el inicio de la sesión -> t absoluto de las muestras."""
+        return self.indice["t_primero"][0] + segundos if len(self.indice) else segundos
+
+    def filas(self, desde=None, hasta=None):
+        """slice de las muestras con desde <= t < hasta (t absoluto).
+
+        Sólo se leen las columnas t de los bloques que cruzan el intervalo.
+        """
+        if self.n == 0:
+            return slice(0, 0)
+        primero = 0 if desde is None else int(np.searchsorted(self.indice["t_ultimo"], desde))
+        ultimo = len(self.indice) if hasta is None else int(
+            np.searchsorted(self.indice["t_primero"], hasta))
+        if primero >= ultimo:
+            return slice(self._inicios[primero], self._inicios[primero])
+        a, b = self._inicios[primero], self._inicios[ultimo]
+        t = self.columna("t")[a:b]
+        inicio = a if desde is None else a + int(np.searchsorted(t, desde))
+        fin = b if hasta is None else a + int(np.searchsorted(t, hasta))
+        return slice(inicio, fin)
+
+    def consultar(self, desde=None, hasta=None, canales=None):
+        """Copia (arreglo estructurado) de las muestras con desde <= t < hasta."""
+        tramo = self.filas(desde, hasta)
+        canales = list(self.tipos) if canales is None else list(canales)
+        resultado = np.zeros(tramo.stop - tramo.start,
+                             dtype=[(c, self.tipos[c].newbyteorder("=")) for c in canales])
+        for c in canales:
+            resultado[c] = self.columna(c)[tramo]
+        return resultado
+
+    def resumen(self):
+        return {
+            "muestras": self.n,
+            "bloques": len(self.indice),
+            "duracion_s": round(self.duracion, 3),
+            "inicio": self.meta.get("inicio"),
+            "origen": self.meta.get("origen"),
+            "bytes": sum(self.n * t.itemsize for t in self.tipos.values()),
+        }
+
+
+# ─── Fuentes ───
+async def grabar(lector, escritor, duracion=None, volcado=5.0):
+    """Graba lo que llega a un LectorMedidor; vuelca a disco cada volcado s."""
+    suscripcion = lector.suscribir()
+    inicio = ultimo_volcado = time.monotonic()
+    try:
+        while duracion is None or time.monotonic() - inicio < duracion:
+            muestras = await suscripcion.siguiente(minimo=1)
+            if len(muestras) == 0:
+                break
+            escritor.agregar(muestras)
+            if time.monotonic() - ultimo_volcado >= volcado:
+                escritor.volcar()
+                ultimo_volcado = time.monotonic()
+    finally:
+        suscripcion.cerrar()
+        escritor.volcar()
+    return suscripcion.perdidas
+
+
+def importar_csv(archivo, ruta, frecuencia=35.0, bloque=BLOQUE, lineas=1 << 16):
+    """Convierte un volcado CSV del firmware en sesión (t = i / frecuencia)."""
+    with open(archivo, "rb") as f, EscritorSesion(ruta, bloque, t0_unix=os.path.getmtime(archivo),
+                                                   origen=os.path.abspath(archivo)) as escritor:
+        resto = b""
+        malas = 0
+        while True:
+            datos = f.read(lineas * 32)
+            fin = not datos
+            # Una captura cortada con Ctrl-C no termina en \n: la última
+            # línea también cuenta
+            datos = resto + datos + (b"\n" if fin and resto else b"")
+            corte = len(datos) if fin else datos.rfind(b"\n") + 1
+            resto = datos[corte:]
+            valores, descartadas, _ = parsear_bloque(datos[:corte])
+            malas += descartadas
+            muestras = np.zeros(len(valores), dtype=MUESTRA)
+            muestras["t"] = (escritor.muestras + np.arange(len(valores))) / frecuencia
+            for i, nombre in enumerate(MUESTRA.names[1:]):
+                muestras[nombre] = valores[:, i]
+            escritor.agregar(muestras)
+            if fin:
+                break
+        return escritor.muestras, malas
+
+
+def exportar_csv(sesion, salida, desde=None, hasta=None, filas=1 << 16):
+    """Escribe el tramo como el CSV del firmware, con t (s desde el inicio) delante."""
+    tramo = sesion.filas(desde, hasta)
+    t0 = sesion.indice["t_primero"][0] if len(sesion.indice) else 0.0
+    salida.write("t," + ENCABEZADO.decode() + "\n")
+    niveles = np.array(NIVELES)
+    for a in range(tramo.start, tramo.stop, filas):
+        b = min(a + filas, tramo.stop)
+        columnas = [np.char.mod("%.3f", sesion.columna("t")[a:b] - t0),
+                    np.char.mod("%.2f", sesion.columna("gauss")[a:b]),
+                    np.char.mod("%.3f", sesion.columna("mtesla")[a:b]),
+                    np.char.mod("%.3f", sesion.columna("e_v")[a:b]),
+                    niveles[sesion.columna("nivel")[a:b]],
+                    np.where(sesion.columna("barra")[a:b], "SI", "NO")]
+        salida.writelines(",".join(fila) + "\n" for fila in zip(*columnas))
+
+
+# ── Línea de comandos ──
+async def _grabar(args):
+    from medidor import MUESTRA_TRAMA, AnilloMuestras, abrir, configurar_puerto, simular_placa
+
+    tareas = []
+    if args.simular:
+        maestro, esclavo = os.openpty()
+        ruta = os.ttyname(esclavo)
+        configurar_puerto(esclavo)
+        tareas.append(asyncio.create_task(simular_placa(maestro, args.frecuencia)))
+    else:
+        ruta = args.puerto
+    tipo = MUESTRA_TRAMA if args.binario else MUESTRA
+    lector = await abrir(ruta, args.baudios, anillo=AnilloMuestras(tipo=tipo),
+                         binario=args.binario)
+    try:
+        with EscritorSesion(args.sesion, args.bloque, origen=ruta, tipo=tipo) as escritor:
+            perdidas = await grabar(lector, escritor, args.duracion)
+    finally:
+        lector.transporte.close()
+        for tarea in tareas:
+            tarea.cancel()
+    return {**lector.conteos(), "perdidas_grabacion": perdidas}
+
+
+def main():
+    from medidor import BAUDIOS
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p = comandos.add_parser("grabar", help="grabar del puerto serie")
+    p.add_argument("sesion")
+    p.add_argument("puerto", nargs="?")
+    p.add_argument("-b", "--baudios", type=int, default=BAUDIOS)
+    p.add_argument("-d", "--duracion", type=float, help="segundos (por defecto, sin fin)")
+    p.add_argument("--binario", action="store_true", help="pedir tramas binarias")
+    p.add_argument("--simular", action="store_true", help="placa simulada en un pty")
+    p.add_argument("--frecuencia", type=float, default=35.0, help="muestras/s simuladas")
+    p.add_argument("--bloque", type=int, default=BLOQUE, help="muestras por bloque")
+
+    p = comandos.add_parser("importar", help="convertir un volcado CSV")
+    p.add_argument("csv")
+    p.add_argument("sesion")
+    p.add_argument("--frecuencia", type=float, default=35.0, help="muestras/s del volcado")
+    p.add_argument("--bloque", type=int, default=BLOQUE)
+
+    p = comandos.add_parser("info", help="resumen de una sesión")
+    p.add_argument("sesion")
+
+    p = comandos.add_parser("exportar", help="tramo de una sesión como CSV")
+    p.add_argument("sesion")
+    p.add_argument("--desde", type=float, help="s desde el inicio de la sesión")
+    p.add_argument("--hasta", type=float, help="s desde el inicio de la sesión")
+    args = parser.parse_args()
+
+    if args.comando == "grabar":
+        if not args.simular and not args.puerto:
+            parser.error("indica el puerto o usa --simular")
+        try:
+            print(asyncio.run(_grabar(args)))
+        except KeyboardInterrupt:
+            pass
+        print(Sesion(args.sesion).resumen())
+    elif args.comando == "importar":
+        muestras, malas = importar_csv(args.csv, args.sesion, args.frecuencia, args.bloque)
+        print(f"{muestras} muestras importadas, {malas} líneas descartadas")
+    elif args.comando == "info":
+        print(json.dumps(Sesion(args.sesion).resumen(), indent=2, ensure_ascii=False))
+    else:
+        sesion = Sesion(args.sesion)
+        desde = None if args.desde is None else sesion.tiempo(args.desde)
+        hasta = None if args.hasta is None else sesion.tiempo(args.hasta)
+        exportar_csv(sesion, sys.stdout, desde, hasta)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
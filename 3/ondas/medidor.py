@@ -0,0 +1,703 @@
+"""
+Lectura asíncrona del medidor de campo E y B (medidorEB.ino)
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+El firmware manda por serie (115200 baudios) el encabezado
+Gauss,mTesla,E_V,Nivel,BarraActiva y después una línea por loop (~35 por
+segundo), por ejemplo "1.25,0.125,1.832,ALTO,SI".
+
+LectorMedidor es un asyncio.Protocol: cada bloque de bytes que llega se
+parte en líneas completas y se convierte de una vez con NumPy (los
+textos de nivel y barra se reemplazan por números antes de parsear) a un
+AnilloMuestras preasignado; no se crean objetos por muestra.
+
+- Resincronización: una línea cortada o con basura (bytes perdidos, el
+  arranque a media línea, un reset de la placa) se descarta entera y la
+  lectura sigue en el siguiente salto de línea.
+- Contrapresión: si el consumidor más lento tiene más de alto·capacidad
+  muestras sin leer se pausa la lectura del puerto, y se reanuda cuando
+  baja de bajo·capacidad. Lo que el sistema operativo tire mientras tanto
+  aparece como líneas descartadas.
+- Conteos: muestras, líneas descartadas, bytes descartados, pausas y, por
+  consumidor, muestras perdidas (sobrescritas antes de leerlas).
+
+Modo binario (--binario): el lector manda 'B' al abrir el puerto y el
+firmware, si la recibe en su ventana de arranque, pasa a tramas de 15
+bytes (sync 0x5AA5, secuencia, AIN0/AIN1 crudos, offset Hall, flags y
+CRC-16/CCITT; ver medidorEB.ino). DecodificadorTramas las convierte por
+lotes con np.frombuffer (sin copiar cuando el bloque llega alineado),
+valida todos los CRC de una vez y cuenta las tramas perdidas por los
+saltos de secuencia. Gauss, mT y E se suavizan al llegar como en la
+placa (reproduccion.Reproductor, que sigue bufIdx con la secuencia y
+vuelve a empezar en cada recalibración), así que significan lo mismo que
+en modo CSV; nivel y barra son los flags que calculó la placa. El anillo
+(MUESTRA_TRAMA) guarda además las lecturas crudas de cada trama.
+
+Para probar sin la placa, --simular crea un pseudo-terminal y escribe en
+él lo que mandaría el firmware (con algunas líneas o tramas corruptas).
+
+Para ejecutar:
+  python medidor.py /dev/ttyACM0
+  python medidor.py /dev/ttyACM0 --binario      # y resetear la placa
+  python medidor.py --simular --corrupcion 0.02
+  python medidor.py --simular --binario --corrupcion 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import termios
+import time
+import tty
+import warnings
+
+import numpy as np
+
+BAUDIOS = 115200
+ENCABEZADO = b"Gauss,mTesla,E_V,Nivel,BarraActiva"
+CAMPOS = 5
+MAX_LINEA = 256
+NIVELES = ("BAJO", "MED", "ALTO", "MUY!")
+
+MUESTRA = np.dtype([
+    ("t", "f8"),        # time.monotonic() al recibir el bloque
+    ("gauss", "f4"),
+    ("mtesla", "f4"),
+    ("e_v", "f4"),
+    ("nivel", "i1"),    # índice en NIVELES
+    ("barra", "?"),
+])
+
+# Texto del firmware -> número, antes de parsear todo el bloque como CSV
+SUSTITUCIONES = (
+    (b"\r", b""),
+    (b"BAJO", b"0"), (b"MED ", b"1"), (b"MED", b"1"), (b"ALTO", b"2"), (b"MUY!", b"3"),
+    (b"SI", b"1"), (b"NO", b"0"),
+)
+PERMITIDOS = np.zeros(256, dtype=bool)
+PERMITIDOS[np.frombuffer(b"0123456789.-+,\n", dtype=np.uint8)] = True
+
+# Trama binaria (little-endian, sin relleno)
+SYNC = 0x5AA5
+TRAMA = np.dtype([
+    ("sync", "<u2"),
+    ("seq", "<u2"),
+    ("ain0", "<i2"),       # Hall crudo
+    ("ain1", "<i2"),       # E crudo
+    ("offset_mv", "<f4"),  # offset Hall de la calibración
+    ("flags", "u1"),       # bits 0-1 nivel, bit 2 barra
+    ("crc", "<u2"),        # CRC-16/CCITT de los 13 bytes anteriores
+])
+BYTES_TRAMA = TRAMA.itemsize
+# Muestra con las lecturas crudas de su trama (modo binario): con ellas
+# reproduccion.py rehace el cálculo de la placa
+CRUDOS = ("seq", "ain0", "ain1", "offset_mv", "flags")
+MUESTRA_TRAMA = np.dtype(MUESTRA.descr + [(campo, TRAMA[campo].str) for campo in CRUDOS])
+MV_POR_CUENTA = 4096 / 32768  # ADS1115 con GAIN_ONE (±4.096 V)
+SS49E_SENS = 5.0              # mV/Gauss
+
+
+# ── Parseo por bloques ──
+def parsear_bloque(datos):
+    """Líneas completas (terminadas en \\n) -> (valores (n, 5), malas, encabezados).
+
+    Una línea es mala si, tras las sustituciones, tiene un carácter que no
+    es de número, no tiene exactamente 5 campos o algún campo vacío. Lo que
+    sigue al último \\n (una línea sin terminar) se ignora.
+    """
+    datos = datos[:datos.rfind(b"\n") + 1]
+    for texto, numero in SUSTITUCIONES:
+        datos = datos.replace(texto, numero)
+    octetos = np.frombuffer(datos, dtype=np.uint8)
+    fin = np.flatnonzero(octetos == 10)
+    if len(fin) == 0:
+        return np.empty((0, CAMPOS)), 0, 0
+    inicio = np.concatenate([[0], fin[:-1] + 1])
+
+    comas = octetos == 44
+    separador = np.concatenate([[True], comas[:-1] | (octetos[:-1] == 10)])
+    # Coma al principio, doble coma o coma al final de la línea: campo vacío
+    malos = ~PERMITIDOS[octetos] | (comas & separador) | ((octetos == 10) & separador)
+    acumulado_malos = np.concatenate([[0], np.cumsum(malos)])
+    acumulado_comas = np.concatenate([[0], np.cumsum(comas)])
+    vacias = fin == inicio
+    validas = ((acumulado_malos[fin] - acumulado_malos[inicio]) == 0) \
+        & ((acumulado_comas[fin] - acumulado_comas[inicio]) == CAMPOS - 1) & ~vacias
+
+    invalidas = np.flatnonzero(~validas & ~vacias)
+    encabezados = sum(datos.startswith(ENCABEZADO, inicio[i]) for i in invalidas)
+    malas = len(invalidas) - encabezados
+    n = int(validas.sum())
+    if n == 0:
+        return np.empty((0, CAMPOS)), malas, encabezados
+
+    if n < len(fin):
+        octetos = octetos[np.repeat(validas, fin - inicio + 1)]
+    texto = octetos.tobytes()[:-1].replace(b"\n", b",")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        try:
+            valores = np.fromstring(texto, sep=",")
+        except (ValueError, DeprecationWarning):
+            valores = None
+    if valores is None or len(valores) != n * CAMPOS:
+        # Algún número mal formado ("1.2.3", "-"): línea por línea
+        return _parsear_lento(texto.split(b","), n, malas, encabezados)
+    return valores.reshape(n, CAMPOS), malas, encabezados
+
+
+def _parsear_lento(campos, n, malas, encabezados):
+    valores = np.empty((n, CAMPOS))
+    buenas = 0
+    for i in range(n):
+        try:
+            valores[buenas] = [float(c) for c in campos[i * CAMPOS:(i + 1) * CAMPOS]]
+            buenas += 1
+        except ValueError:
+            malas += 1
+    return valores[:buenas], malas, encabezados
+
+
+# ── Tramas binarias ──
+def _tabla_crc():
+    tabla = np.zeros(256, dtype=np.uint16)
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1
+        tabla[i] = crc & 0xFFFF
+    return tabla
+
+
+TABLA_CRC = _tabla_crc()
+
+
+def crc16_ccitt(filas):
+    """CRC-16/CCITT (poly 0x1021, init 0xFFFF) de cada fila de un arreglo (n, m) uint8."""
+    crc = np.full(len(filas), 0xFFFF, dtype=np.uint16)
+    for columna in np.asarray(filas, dtype=np.uint8).T:
+        crc = (crc << 8) ^ TABLA_CRC[(crc >> 8) ^ columna]
+    return crc
+
+
+def empaquetar_tramas(seq, ain0, ain1, offset_mv, flags):
+    """Bytes de las tramas como las arma enviarTrama() en el firmware."""
+    tramas = np.zeros(len(seq), dtype=TRAMA)
+    tramas["sync"] = SYNC
+    tramas["seq"] = seq
+    tramas["ain0"] = ain0
+    tramas["ain1"] = ain1
+    tramas["offset_mv"] = offset_mv
+    tramas["flags"] = flags
+    crudo = tramas.view(np.uint8).reshape(-1, BYTES_TRAMA)
+    tramas["crc"] = crc16_ccitt(crudo[:, :BYTES_TRAMA - 2])
+    return tramas.tobytes()
+
+
+def muestras_de_tramas(tramas, reproductor=None):
+    """Tramas -> filas (gauss, mT, E, nivel, barra) como las del CSV.
+
+    Gauss, mT y E salen suavizados como los imprime la placa; con el mismo
+    reproductor (reproduccion.Reproductor) en cada bloque la media móvil
+    sigue de un bloque al otro. Nivel y barra son los flags de la placa.
+    """
+    from reproduccion import Reproductor  # reproduccion importa medidor
+
+    if reproductor is None:
+        reproductor = Reproductor()
+    muestras = reproductor.agregar(tramas["ain0"], tramas["ain1"], tramas["offset_mv"],
+                                   tramas["seq"])
+    return np.column_stack([
+        muestras["gauss"], muestras["mtesla"], muestras["e_v"],
+        tramas["flags"] & 0x03, (tramas["flags"] >> 2) & 1,
+    ])
+
+
+# ─── Decodificador de tramas ───
+class DecodificadorTramas:
+    """Bytes del modo binario -> arreglos estructurados TRAMA, por lotes.
+
+    Si el bloque empieza con sync y todas sus tramas tienen CRC válido, el
+    resultado es una vista de los bytes recibidos (np.frombuffer, sin
+    copiar). Si no, se buscan todos los sync, se validan todos los CRC a
+    la vez y se toman las tramas válidas que no se pisan.
+    """
+
+    def __init__(self):
+        self._pendiente = b""
+        self._ultima_seq = None
+        self.tramas = 0
+        self.perdidas = 0        # por saltos de secuencia
+        self.reinicios = 0       # la secuencia volvió atrás (reset de la placa)
+        self.crc_malos = 0
+        self.bytes_descartados = 0
+
+    def decodificar(self, datos):
+        bloque = self._pendiente + datos
+        n = len(bloque) // BYTES_TRAMA
+        if n and bloque[0] == SYNC & 0xFF and bloque[1] == SYNC >> 8:
+            tramas = np.frombuffer(bloque, dtype=TRAMA, count=n)
+            crudo = np.frombuffer(bloque, dtype=np.uint8, count=n * BYTES_TRAMA)
+            crc = crc16_ccitt(crudo.reshape(n, BYTES_TRAMA)[:, :BYTES_TRAMA - 2])
+            if np.all(tramas["sync"] == SYNC) and np.array_equal(crc, tramas["crc"]):
+                self._pendiente = bloque[n * BYTES_TRAMA:]
+                return self._contar(tramas)
+        return self._resincronizar(bloque)
+
+    def _resincronizar(self, bloque):
+        octetos = np.frombuffer(bloque, dtype=np.uint8)
+        candidatos = np.flatnonzero((octetos[:-1] == SYNC & 0xFF) & (octetos[1:] == SYNC >> 8))
+        candidatos = candidatos[candidatos + BYTES_TRAMA <= len(octetos)]
+        filas = octetos[candidatos[:, None] + np.arange(BYTES_TRAMA)]
+        crc = filas[:, -2].astype(np.uint16) | (filas[:, -1].astype(np.uint16) << 8)
+        validos = crc16_ccitt(filas[:, :BYTES_TRAMA - 2]) == crc
+        # Un sync con CRC válido dentro de otra trama válida es casi imposible,
+        # pero si pasa gana la que empieza antes
+        inicios = candidatos[validos]
+        aceptadas = np.ones(len(inicios), dtype=bool)
+        fin = -BYTES_TRAMA
+        for i, inicio in enumerate(inicios):
+            if inicio < fin:
+                aceptadas[i] = False
+            else:
+                fin = inicio + BYTES_TRAMA
+        inicios = inicios[aceptadas]
+
+        # Sync con CRC malo fuera de las tramas aceptadas: trama dañada
+        malos = candidatos[~validos]
+        if len(inicios):
+            dentro = np.searchsorted(inicios, malos, side="right") - 1
+            cubiertos = (dentro >= 0) & (malos < inicios[np.maximum(dentro, 0)] + BYTES_TRAMA)
+        else:
+            cubiertos = np.zeros(len(malos), dtype=bool)
+        self.crc_malos += int(np.count_nonzero(~cubiertos))
+
+        # Lo que queda después de la última trama completa posible se guarda
+        corte = max(int(inicios[-1]) + BYTES_TRAMA if len(inicios) else 0,
+                    len(bloque) - (BYTES_TRAMA - 1))
+        corte = max(corte, 0)
+        self.bytes_descartados += corte - len(inicios) * BYTES_TRAMA
+        self._pendiente = bloque[corte:]
+        tramas = filas[validos][aceptadas].view(TRAMA).reshape(-1)
+        return self._contar(tramas)
+
+    def _contar(self, tramas):
+        if len(tramas) == 0:
+            return tramas
+        seq = tramas["seq"].astype(np.int64)
+        if self._ultima_seq is not None:
+            seq = np.concatenate([[self._ultima_seq], seq])
+        saltos = (np.diff(seq) - 1) % 65536
+        # Saltos "negativos" (secuencia que vuelve a 0 o trama repetida): reinicio
+        reinicio = saltos >= 32768
+        self.perdidas += int(saltos[~reinicio].sum())
+        self.reinicios += int(np.count_nonzero(reinicio))
+        self._ultima_seq = int(tramas["seq"][-1])
+        self.tramas += len(tramas)
+        return tramas
+
+
+# ─── Anillo de muestras ───
+class AnilloMuestras:
+    """Arreglo estructurado preasignado que se sobrescribe en círculo.
+
+    escritas cuenta todas las muestras desde el inicio; un consumidor guarda
+    su propio cursor en esa numeración. tipo es MUESTRA o MUESTRA_TRAMA.
+    """
+
+    def __init__(self, capacidad=1 << 16, tipo=MUESTRA):
+        self.capacidad = capacidad
+        self.datos = np.zeros(capacidad, dtype=tipo)
+        self.escritas = 0
+
+    def escribir(self, valores, t, tramas=None):
+        """Agrega n filas (gauss, mT, E, nivel, barra) recibidas en el instante t.
+
+        tramas (arreglo TRAMA de las mismas filas): sus lecturas crudas se
+        guardan si el anillo tiene esos campos.
+        """
+        n = len(valores)
+        if n > self.capacidad:
+            valores = valores[-self.capacidad:]
+            tramas = None if tramas is None else tramas[-self.capacidad:]
+            self.escritas += n - self.capacidad
+            n = self.capacidad
+        crudos = [] if tramas is None else [c for c in CRUDOS if c in self.datos.dtype.names]
+        i = self.escritas % self.capacidad
+        primero = min(n, self.capacidad - i)
+        for destino, origen in ((slice(i, i + primero), slice(0, primero)),
+                                (slice(0, n - primero), slice(primero, n))):
+            bloque = self.datos[destino]
+            bloque["t"] = t
+            bloque["gauss"] = valores[origen, 0]
+            bloque["mtesla"] = valores[origen, 1]
+            bloque["e_v"] = valores[origen, 2]
+            bloque["nivel"] = valores[origen, 3]
+            bloque["barra"] = valores[origen, 4]
+            for campo in crudos:
+                bloque[campo] = tramas[campo][origen]
+        self.escritas += n
+
+    def leer(self, desde, maximo=None):
+        """Copia ordenada de las muestras desde el cursor desde.
+
+        Devuelve (muestras, cursor nuevo, perdidas): perdidas son las que ya
+        se habían sobrescrito antes de leerlas.
+        """
+        primera = max(desde, self.escritas - self.capacidad)
+        perdidas = primera - desde
+        ultima = self.escritas if maximo is None else min(self.escritas, primera + maximo)
+        indices = np.arange(primera, ultima) % self.capacidad
+        return self.datos[indices], ultima, perdidas
+
+    def ultimas(self, n):
+        return self.leer(max(0, self.escritas - n))[0]
+
+
+# ─── Consumidores ───
+class Suscripcion:
+    """Cursor de un consumidor sobre el anillo de un LectorMedidor."""
+
+    def __init__(self, lector):
+        self.lector = lector
+        self.cursor = lector.anillo.escritas
+        self.perdidas = 0
+        self._hay_datos = asyncio.Event()
+
+    async def siguiente(self, minimo=1, maximo=None):
+        """Espera al menos minimo muestras nuevas y las devuelve (copia)."""
+        while self.lector.anillo.escritas - self.cursor < minimo:
+            if self.lector.cerrado:
+                break
+            self._hay_datos.clear()
+            await self._hay_datos.wait()
+        muestras, self.cursor, perdidas = self.lector.anillo.leer(self.cursor, maximo)
+        self.perdidas += perdidas
+        self.lector.revisar_contrapresion()
+        return muestras
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        muestras = await self.siguiente()
+        if len(muestras) == 0 and self.lector.cerrado:
+            raise StopAsyncIteration
+        return muestras
+
+    def cerrar(self):
+        self.lector.suscripciones.remove(self)
+        self.lector.revisar_contrapresion()
+
+
+# ─── Protocolo ───
+class LectorMedidor(asyncio.Protocol):
+    """Parsea el stream del medidor (CSV o tramas binarias) hacia un AnilloMuestras."""
+
+    PEDIDOS_BINARIO = 20      # veces que se manda 'B' mientras no llegan tramas
+    INTERVALO_PEDIDO = 0.25   # s
+
+    def __init__(self, anillo=None, alto=0.75, bajo=0.25, binario=False):
+        if anillo is None:
+            anillo = AnilloMuestras(tipo=MUESTRA_TRAMA if binario else MUESTRA)
+        self.anillo = anillo
+        self.alto = alto
+        self.bajo = bajo
+        self.decodificador = None
+        if binario:
+            from reproduccion import Reproductor
+
+            self.decodificador = DecodificadorTramas()
+            self.reproductor = Reproductor()
+        self.suscripciones = []
+        self.transporte = None
+        self.pausado = False
+        self.cerrado = False
+        self._pendiente = bytearray()
+        self._descartando = False
+        # Conteos
+        self.muestras = 0
+        self.lineas_descartadas = 0
+        self.bytes_descartados = 0
+        self.encabezados = 0
+        self.pausas = 0
+
+    def suscribir(self):
+        suscripcion = Suscripcion(self)
+        self.suscripciones.append(suscripcion)
+        return suscripcion
+
+    # ── asyncio.Protocol ──
+    def connection_made(self, transporte):
+        self.transporte = transporte
+        if self.decodificador is not None:
+            self._pedir_binario(self.PEDIDOS_BINARIO)
+
+    def data_received(self, datos):
+        if self.decodificador is not None:
+            tramas = self.decodificador.decodificar(datos)
+            if len(tramas):
+                self._guardar(muestras_de_tramas(tramas, self.reproductor), tramas)
+            return
+        if self._descartando:
+            salto = datos.find(b"\n")
+            if salto < 0:
+                self.bytes_descartados += len(datos)
+                return
+            self.bytes_descartados += salto + 1
+            datos = datos[salto + 1:]
+            self._descartando = False
+        self._pendiente += datos
+        salto = self._pendiente.rfind(b"\n")
+        if salto >= 0:
+            completas = bytes(self._pendiente[:salto + 1])
+            del self._pendiente[:salto + 1]
+            self._procesar(completas)
+        if len(self._pendiente) > MAX_LINEA:
+            # Basura sin salto de línea: se tira hasta el próximo \n
+            self.bytes_descartados += len(self._pendiente)
+            self.lineas_descartadas += 1
+            self._pendiente.clear()
+            self._descartando = True
+
+    def connection_lost(self, error):
+        self.cerrado = True
+        for suscripcion in self.suscripciones:
+            suscripcion._hay_datos.set()
+
+    # ── Internos ──
+    def _pedir_binario(self, restantes):
+        # La placa sólo escucha durante su ventana de arranque: se insiste
+        # hasta que llega la primera trama
+        if self.cerrado or self.decodificador.tramas or restantes == 0:
+            return
+        os.write(self.transporte.get_extra_info("pipe").fileno(), b"B")
+        asyncio.get_running_loop().call_later(
+            self.INTERVALO_PEDIDO, self._pedir_binario, restantes - 1
+        )
+
+    def _procesar(self, completas):
+        valores, malas, encabezados = parsear_bloque(completas)
+        self.lineas_descartadas += malas
+        self.encabezados += encabezados
+        self._guardar(valores)
+
+    def _guardar(self, valores, tramas=None):
+        if len(valores) == 0:
+            return
+        self.anillo.escribir(valores, time.monotonic(), tramas)
+        self.muestras += len(valores)
+        for suscripcion in self.suscripciones:
+            suscripcion._hay_datos.set()
+        self.revisar_contrapresion()
+
+    def retraso(self):
+        """Muestras sin leer del consumidor más lento."""
+        if not self.suscripciones:
+            return 0
+        return self.anillo.escritas - min(s.cursor for s in self.suscripciones)
+
+    def revisar_contrapresion(self):
+        if self.transporte is None or self.cerrado:
+            return
+        retraso = self.retraso()
+        if not self.pausado and retraso >= self.alto * self.anillo.capacidad:
+            self.transporte.pause_reading()
+            self.pausado = True
+            self.pausas += 1
+        elif self.pausado and retraso <= self.bajo * self.anillo.capacidad:
+            self.transporte.resume_reading()
+            self.pausado = False
+
+    def conteos(self):
+        if self.decodificador is not None:
+            d = self.decodificador
+            conteos = {
+                "muestras": self.muestras,
+                "tramas_perdidas": d.perdidas,
+                "crc_malos": d.crc_malos,
+                "bytes_descartados": d.bytes_descartados,
+                "reinicios": d.reinicios,
+            }
+        else:
+            conteos = {
+                "muestras": self.muestras,
+                "lineas_descartadas": self.lineas_descartadas,
+                "bytes_descartados": self.bytes_descartados,
+                "encabezados": self.encabezados,
+            }
+        conteos["pausas"] = self.pausas
+        conteos["perdidas"] = sum(s.perdidas for s in self.suscripciones)
+        return conteos
+
+
+# ── Puerto serie ──
+def configurar_puerto(fd, baudios=BAUDIOS):
+    """Modo crudo (sin eco ni traducción de \\r) a la velocidad dada."""
+    tty.setraw(fd)
+    atributos = termios.tcgetattr(fd)
+    velocidad = getattr(termios, f"B{baudios}")
+    atributos[4] = atributos[5] = velocidad
+    termios.tcsetattr(fd, termios.TCSANOW, atributos)
+
+
+async def abrir(ruta, baudios=BAUDIOS, **kwargs):
+    """Abre el puerto (o el lado esclavo de un pty) y devuelve el LectorMedidor."""
+    loop = asyncio.get_running_loop()
+    fd = os.open(ruta, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    try:
+        configurar_puerto(fd, baudios)
+    except termios.error:
+        os.close(fd)
+        raise
+    _, lector = await loop.connect_read_pipe(
+        lambda: LectorMedidor(**kwargs), os.fdopen(fd, "rb", buffering=0)
+    )
+    return lector
+
+
+# ── Placa simulada ──
+def linea_firmware(gauss, e_v, barra):
+    """Una línea como la de Serial.print en medidorEB.ino."""
+    nivel = NIVELES[int(np.searchsorted([1.1, 1.7, 2.5], e_v, side="right"))]
+    nivel = "MED " if nivel == "MED" else nivel
+    return f"{gauss:.2f},{gauss * 0.1:.3f},{e_v:.3f},{nivel},{'SI' if barra else 'NO'}\r\n"
+
+
+def trama_firmware(seq, gauss, e_v, barra, offset_mv=2500.0):
+    """Una trama como la de enviarTrama() en medidorEB.ino."""
+    ain0 = int(np.clip(round((gauss * SS49E_SENS + offset_mv) / MV_POR_CUENTA), -32768, 32767))
+    ain1 = int(np.clip(round(e_v * 1000 / MV_POR_CUENTA), -32768, 32767))
+    nivel = int(np.searchsorted([1.1, 1.7, 2.5], e_v, side="right"))
+    return empaquetar_tramas([seq & 0xFFFF], [ain0], [ain1], [offset_mv],
+                             [nivel | (bool(barra) << 2)])
+
+
+async def _esperar_modo(fd, ventana):
+    # Como esperarModo() del firmware: 'B' dentro de la ventana -> binario
+    fin = time.monotonic() + ventana
+    while time.monotonic() < fin:
+        try:
+            if b"B" in os.read(fd, 64):
+                return True
+        except BlockingIOError:
+            pass
+        await asyncio.sleep(0.02)
+    return False
+
+
+def salida_placa(frecuencia=35.0, corrupcion=0.0, semilla=0, binario=False):
+    """Bytes que manda la placa simulada en cada loop (sin fin, sin el encabezado)."""
+    rng = np.random.default_rng(semilla)
+    n = 0
+    while True:
+        t = n / frecuencia
+        gauss = 12 * np.sin(2 * np.pi * 0.3 * t) + rng.normal(0, 0.2)
+        e_v = 1.9 + 1.2 * np.sin(2 * np.pi * 0.1 * t) + rng.normal(0, 0.02)
+        if binario:
+            linea = trama_firmware(n, gauss, e_v, e_v > 1.5)
+        else:
+            linea = linea_firmware(gauss, e_v, e_v > 1.5).encode()
+        if rng.random() < corrupcion:
+            if binario and rng.random() < 0.5:
+                # Un bit cambiado en el cable: el CRC no cuadra
+                linea = bytearray(linea)
+                linea[int(rng.integers(2, len(linea)))] ^= 1 << int(rng.integers(8))
+                linea = bytes(linea)
+            else:
+                # Bytes perdidos a media línea, como con el buffer del sistema lleno
+                corte = int(rng.integers(1, len(linea) - 2))
+                linea = linea[:corte]
+        yield linea
+        n += 1
+
+
+async def simular_placa(fd, frecuencia=35.0, duracion=None, corrupcion=0.0, semilla=0,
+                        ventana=2.0):
+    """Escribe en fd (el lado maestro de un pty) lo que mandaría la placa.
+
+    Devuelve cuántos loops escribió (las salidas son las de salida_placa).
+    """
+    # Sin bloquear el loop: si nadie lee, las líneas se pierden como en la placa
+    os.set_blocking(fd, False)
+    binario = await _esperar_modo(fd, ventana) if ventana else False
+    if not binario:
+        os.write(fd, ENCABEZADO + b"\r\n")
+    salida = salida_placa(frecuencia, corrupcion, semilla, binario)
+    inicio = time.monotonic()
+    n = 0
+    while duracion is None or time.monotonic() - inicio < duracion:
+        try:
+            os.write(fd, next(salida))
+        except BlockingIOError:
+            pass
+        n += 1
+        # Reloj absoluto: sin deriva aunque el sleep se atrase
+        await asyncio.sleep(max(0.0, inicio + n / frecuencia - time.monotonic()))
+    return n
+
+
+# ── Línea de comandos ──
+async def _principal(args):
+    tareas = []
+    if args.simular:
+        maestro, esclavo = os.openpty()
+        ruta = os.ttyname(esclavo)
+        configurar_puerto(esclavo)
+        tareas.append(asyncio.create_task(
+            simular_placa(maestro, args.frecuencia, args.duracion, args.corrupcion)
+        ))
+    else:
+        ruta = args.puerto
+    anillo = AnilloMuestras(args.capacidad, MUESTRA_TRAMA if args.binario else MUESTRA)
+    lector = await abrir(ruta, args.baudios, anillo=anillo, binario=args.binario)
+    suscripcion = lector.suscribir()
+    inicio = time.monotonic()
+    try:
+        while args.duracion is None or time.monotonic() - inicio < args.duracion:
+            muestras = await suscripcion.siguiente(minimo=1)
+            if len(muestras) == 0:
+                break
+            ultima = muestras[-1]
+            print(f"{ultima['gauss']:8.2f} G {ultima['e_v']:6.3f} V "
+                  f"{NIVELES[ultima['nivel']]:4} {'SI' if ultima['barra'] else 'NO'}  "
+                  f"(+{len(muestras)}) {lector.conteos()}")
+            if args.intervalo:
+                await asyncio.sleep(args.intervalo)
+    finally:
+        lector.transporte.close()
+        for tarea in tareas:
+            tarea.cancel()
+    return lector.conteos()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("puerto", nargs="?", help="/dev/ttyACM0, /dev/ttyUSB0...")
+    parser.add_argument("-b", "--baudios", type=int, default=BAUDIOS)
+    parser.add_argument("-n", "--capacidad", type=int, default=1 << 16,
+                        help="muestras en el anillo")
+    parser.add_argument("-i", "--intervalo", type=float, default=1.0,
+                        help="segundos entre lecturas del consumidor")
+    parser.add_argument("-d", "--duracion", type=float, help="segundos (por defecto, sin fin)")
+    parser.add_argument("--binario", action="store_true",
+                        help="pedir tramas binarias (la placa escucha 2 s al arrancar)")
+    parser.add_argument("--simular", action="store_true", help="placa simulada en un pty")
+    parser.add_argument("--frecuencia", type=float, default=35.0, help="líneas/s simuladas")
+    parser.add_argument("--corrupcion", type=float, default=0.0,
+                        help="fracción de líneas/tramas simuladas dañadas")
+    args = parser.parse_args()
+    if not args.simular and not args.puerto:
+        parser.error("indica el puerto o usa --simular")
+
+    try:
+        conteos = asyncio.run(_principal(args))
+    except KeyboardInterrupt:
+        return 0
+    print(conteos)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
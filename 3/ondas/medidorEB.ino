@@ -14,6 +14,19 @@
 //    y26–33  : barra E (borde vacío / llena según persistencia)
 //    y34     : separador
 //    y35–63  : osciloscopio E (blanco) + B (punteado/gris)
+//
+//  Serie (115200):
+//    Por defecto CSV: Gauss,mTesla,E_V,Nivel,BarraActiva
+//    Si llega una 'B' en los primeros MODO_VENTANA_MS tras el
+//    arranque → tramas binarias de 15 bytes (little-endian):
+//      0  u16  sync 0x5AA5 (bytes A5 5A)
+//      2  u16  secuencia (da la vuelta en 65535)
+//      4  i16  AIN0 crudo (Hall)    — GAIN_ONE: 0.125 mV/cuenta
+//      6  i16  AIN1 crudo (E)
+//      8  f32  offset Hall en mV (calibración)
+//     12  u8   flags: bits 0–1 nivel E (0 BAJO … 3 MUY!),
+//                     bit 2 barra E activa
+//     13  u16  CRC-16/CCITT (poly 0x1021, init 0xFFFF) de bytes 0–12
 // ============================================================
 
 #include <Wire.h>
@@ -58,6 +71,11 @@
 #define PIN_CAL      9
 #define CAL_HOLD_MS  800       // ms que hay que mantener pulsado
 
+// ---- Modo binario ----
+#define MODO_VENTANA_MS  2000  // ms tras el arranque para pedir 'B'
+#define SYNC_TRAMA     0x5AA5
+#define BYTES_TRAMA        15
+
 // ---- Objetos ----
 Adafruit_ADS1115 ads;
 Adafruit_SSD1306 oled(OLED_WIDTH, OLED_HEIGHT, &Wire, -1);
@@ -85,14 +103,25 @@ int8_t oscB[OSC_W];   // valor Y escalado para B  (0..OSC_H-1)
 int    oscIdx = 0;
 bool   oscLleno = false;
 
+// ---- Serie ----
+bool     modoBinario = false;
+uint16_t secuencia   = 0;
+int16_t  crudoHall   = 0;   // última lectura cruda AIN0
+int16_t  crudoE      = 0;   // última lectura cruda AIN1
+
 // ============================================================
 //  Nivel texto campo E
 // ============================================================
+uint8_t nivelIndice(float v) {
+  if      (v < E_BAJO)  return 0;
+  else if (v < E_MEDIO) return 1;
+  else if (v < E_ALTO)  return 2;
+  else                  return 3;
+}
+
 const char* nivelE(float v) {
-  if      (v < E_BAJO)  return "BAJO";
-  else if (v < E_MEDIO) return "MED ";
-  else if (v < E_ALTO)  return "ALTO";
-  else                  return "MUY!";
+  static const char* const textos[] = {"BAJO", "MED ", "ALTO", "MUY!"};
+  return textos[nivelIndice(v)];
 }
 
 // ============================================================
@@ -100,12 +129,14 @@ const char* nivelE(float v) {
 // ============================================================
 float leerHall_mV() {
   ads.setGain(GAIN_ONE);
-  return ads.computeVolts(ads.readADC_SingleEnded(0)) * 1000.0f;
+  crudoHall = ads.readADC_SingleEnded(0);
+  return ads.computeVolts(crudoHall) * 1000.0f;
 }
 
 float leerE_V() {
   ads.setGain(GAIN_ONE);
-  return ads.computeVolts(ads.readADC_SingleEnded(1));
+  crudoE = ads.readADC_SingleEnded(1);
+  return ads.computeVolts(crudoE);
 }
 
 // ============================================================
@@ -317,6 +348,46 @@ void mostrar(float gauss, float tesla, float e_v) {
   oled.display();
 }
 
+// ============================================================
+//  TRAMA BINARIA
+// ============================================================
+uint16_t crc16(const uint8_t* datos, uint8_t n) {
+  uint16_t crc = 0xFFFF;
+  for (uint8_t i = 0; i < n; i++) {
+    crc ^= (uint16_t)datos[i] << 8;
+    for (uint8_t b = 0; b < 8; b++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+void enviarTrama(float e_v) {
+  uint8_t trama[BYTES_TRAMA];
+  uint16_t sync = SYNC_TRAMA;
+  uint8_t flags = nivelIndice(e_v) | (barraELlena ? 0x04 : 0);
+  // AVR es little-endian: memcpy deja los campos en el orden de la trama
+  memcpy(trama + 0,  &sync,          2);
+  memcpy(trama + 2,  &secuencia,     2);
+  memcpy(trama + 4,  &crudoHall,     2);
+  memcpy(trama + 6,  &crudoE,        2);
+  memcpy(trama + 8,  &offsetHall_mV, 4);
+  trama[12] = flags;
+  uint16_t crc = crc16(trama, 13);
+  memcpy(trama + 13, &crc,           2);
+  Serial.write(trama, BYTES_TRAMA);
+  secuencia++;
+}
+
+// 'B' por serie durante la ventana de arranque → modo binario
+bool esperarModo() {
+  uint32_t t0 = millis();
+  while (millis() - t0 < MODO_VENTANA_MS) {
+    if (Serial.available() && Serial.read() == 'B') return true;
+  }
+  return false;
+}
+
 // ============================================================
 //  SETUP
 // ============================================================
@@ -347,7 +418,10 @@ void setup() {
 
   pinMode(PIN_CAL, INPUT_PULLUP);   // botón re-calibración
 
-  Serial.println("Gauss,mTesla,E_V,Nivel,BarraActiva");
+  modoBinario = esperarModo();
+  if (!modoBinario) {
+    Serial.println("Gauss,mTesla,E_V,Nivel,BarraActiva");
+  }
 }
 
 // ============================================================
@@ -398,6 +472,11 @@ void loop() {
 
   mostrar(gauss, tesla, eSuav);
 
+  if (modoBinario) {
+    enviarTrama(eSuav);
+    return;
+  }
+
   Serial.print(gauss, 2);             Serial.print(",");
   Serial.print(tesla * 1000.0f, 3);   Serial.print(",");
   Serial.print(eSuav, 3);             Serial.print(",");
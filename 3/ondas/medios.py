@@ -0,0 +1,134 @@
+"""
+Medios dieléctricos estratificados para las animaciones de ondas
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Onda plana con incidencia normal sobre regiones sin pérdidas separadas por
+interfaces planas en x = x_1 < x_2 < ... Cada región se describe con ε_r y
+μ_r; de ahí salen β = k0·√(ε_r μ_r), v_p = c/√(ε_r μ_r) y η = η0·√(μ_r/ε_r).
+
+Las amplitudes de la onda progresiva y regresiva de cada región se
+resuelven una vez con matrices de transferencia (continuidad de E y H
+tangenciales en cada interfaz), así la fase es continua en todas las
+fronteras. El campo de cualquier conjunto de puntos y de instantes es
+Re{E(x)·e^{jωt}}: un solo producto de NumPy para todos los fotogramas.
+
+Uso típico:
+  medio = MedioEstratificado([Region(), Region(eps_r=3.6)], interfaces=[3.0], k0=2.2)
+  y = medio.campo(x_vals, tiempos)                    # (n_tiempos, n_puntos)
+  y_inc = medio.campo(x_vals, tiempos, "incidente")
+"""
+
+import numpy as np
+
+ETA0 = 376.730313668  # impedancia del vacío [Ω]
+
+
+class Region:
+    """Región homogénea sin pérdidas."""
+
+    def __init__(self, eps_r=1.0, mu_r=1.0):
+        self.eps_r = eps_r
+        self.mu_r = mu_r
+
+    @property
+    def indice(self):
+        return np.sqrt(self.eps_r * self.mu_r)
+
+    @property
+    def impedancia(self):
+        return ETA0 * np.sqrt(self.mu_r / self.eps_r)
+
+
+class MedioEstratificado:
+    """Regiones[i] ocupa de interfaces[i-1] a interfaces[i] (la primera y la
+    última se extienden al infinito). La onda incide desde la izquierda con
+    amplitud dada y viaja hacia +x; de la derecha no llega nada.
+
+    k0 es el número de onda en el vacío y la escena usa c = 1, de modo que
+    ω = k0 (radianes de fase por unidad de tiempo de la animación).
+    """
+
+    def __init__(self, regiones, interfaces, k0=1.0, amplitud=1.0):
+        if len(regiones) != len(interfaces) + 1:
+            raise ValueError("se necesita una región más que interfaces")
+        self.regiones = list(regiones)
+        self.interfaces = np.asarray(interfaces, dtype=float)
+        self.k0 = k0
+        self.omega = k0
+        self.amplitud = amplitud
+
+        self.beta = k0 * np.array([r.indice for r in self.regiones])
+        self.velocidad_fase = self.omega / self.beta
+        self.impedancia = np.array([r.impedancia for r in self.regiones])
+        # Cada región mide su fase desde su interfaz izquierda (la primera,
+        # desde la primera interfaz; sin interfaces, medio homogéneo, desde 0)
+        if len(self.interfaces):
+            self.referencias = np.concatenate([self.interfaces[:1], self.interfaces])
+        else:
+            self.referencias = np.zeros(1)
+        self.progresiva, self.regresiva = self._resolver()
+
+    def _resolver(self):
+        n = len(self.regiones)
+        A = np.zeros(n, dtype=complex)
+        B = np.zeros(n, dtype=complex)
+        A[-1] = 1.0
+        # De derecha a izquierda: E y H continuos en cada interfaz
+        for i in range(n - 2, -1, -1):
+            d = self.interfaces[i] - self.referencias[i]
+            E = A[i + 1] + B[i + 1]
+            H = (A[i + 1] - B[i + 1]) * self.impedancia[i] / self.impedancia[i + 1]
+            A[i] = (E + H) / 2 * np.exp(1j * self.beta[i] * d)
+            B[i] = (E - H) / 2 * np.exp(-1j * self.beta[i] * d)
+        escala = self.amplitud / A[0]
+        return A * escala, B * escala
+
+    @property
+    def reflexion(self):
+        """Coeficiente de reflexión Γ en la primera interfaz."""
+        return self.regresiva[0] / self.progresiva[0]
+
+    @property
+    def transmision(self):
+        """Amplitud transmitida a la última región relativa a la incidente."""
+        return self.progresiva[-1] / self.progresiva[0]
+
+    def region_de(self, x):
+        return np.searchsorted(self.interfaces, x, side="right")
+
+    def fasor(self, x, parte="total"):
+        """E(x) complejo. parte: "total", "incidente" (progresiva de la primera
+        región), "reflejada" (regresiva de la primera región), "progresiva" o
+        "regresiva" (en todas las regiones)."""
+        x = np.asarray(x, dtype=float)
+        i = self.region_de(x)
+        local = self.beta[i] * (x - self.referencias[i])
+        progresiva = self.progresiva[i] * np.exp(-1j * local)
+        regresiva = self.regresiva[i] * np.exp(1j * local)
+        if parte == "total":
+            return progresiva + regresiva
+        if parte == "progresiva":
+            return progresiva
+        if parte == "regresiva":
+            return regresiva
+        primera = i == 0
+        if parte == "incidente":
+            return np.where(primera, progresiva, 0)
+        if parte == "reflejada":
+            return np.where(primera, regresiva, 0)
+        raise ValueError(f"parte desconocida: {parte}")
+
+    def campo(self, x, t=0, parte="total"):
+        """Re{E(x)·e^{jωt}}: forma t.shape + x.shape."""
+        fase = np.exp(1j * self.omega * np.asarray(t, dtype=float))
+        return np.real(np.multiply.outer(fase, self.fasor(x, parte)))
+
+    def parametros(self):
+        """Todo lo que determina el campo (para claves de caché)."""
+        return {
+            "eps_r": [r.eps_r for r in self.regiones],
+            "mu_r": [r.mu_r for r in self.regiones],
+            "interfaces": self.interfaces,
+            "k0": self.k0,
+            "amplitud": self.amplitud,
+        }
@@ -0,0 +1,370 @@
+"""
+Mobjects reutilizables para las animaciones de ondas
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Objetos pensados para actualizarse en su lugar fotograma a fotograma
+(con updaters), sin crear ni destruir mobjects dentro del ciclo de animación.
+"""
+
+from manim import *
+import numpy as np
+import random
+
+
+# ─── Pool fijo de flechas 3D ───
+class PoolFlechas3D(VGroup):
+    """Grupo de tamaño fijo de Arrow3D que oscilan a lo largo de una dirección.
+
+    Cada flecha nace en inicios[i] y su extremo es inicios[i] + valor*direccion.
+    Las flechas con |valor| <= umbral se ocultan (opacidad 0) en vez de
+    quitarse, así el grupo siempre tiene las mismas submobjects y se puede
+    interpolar sin "saltos". La geometría se recalcula en un solo lote de
+    NumPy a partir de una plantilla común y se escribe en los puntos de las
+    caras ya existentes.
+    """
+
+    def __init__(self, inicios, direccion, umbral=0.1, longitud_ref=1.0,
+                 height=0.3, opacidad=1.0, **kwargs):
+        super().__init__()
+        self.inicios = np.asarray(inicios, dtype=float)
+        self.escala = np.linalg.norm(direccion)
+        self.umbral = umbral
+        self.longitud_ref = longitud_ref
+        self.altura_punta = height
+        self.opacidad = opacidad
+
+        # Base ortonormal (u, v, w) con u a lo largo de la flecha
+        self.u = np.asarray(direccion, dtype=float) / self.escala
+        auxiliar = OUT if abs(self.u[2]) < 0.9 else RIGHT
+        self.w = normalize(np.cross(self.u, auxiliar))
+        self.v = np.cross(self.w, self.u)
+
+        flechas = [
+            Arrow3D(start=p, end=p + longitud_ref * self.u, height=height, **kwargs)
+            for p in self.inicios
+        ]
+        self.add(*flechas)
+
+        # Plantilla: coordenadas (a, b, c) de cada punto en la base (u, v, w)
+        # relativas al inicio; es la misma para todas las flechas del pool
+        plantilla = flechas[0]
+        ids_punta = {id(m) for m in plantilla.cone.get_family()}
+        ids_punta.add(id(plantilla.end_point))
+        miembros = [m for m in plantilla.get_family() if len(m.points) > 0]
+        relativos = np.concatenate([m.points for m in miembros]) - self.inicios[0]
+        self._a = relativos @ self.u
+        self._b = relativos @ self.v
+        self._c = relativos @ self.w
+        self._es_punta = np.concatenate([
+            np.full(len(m.points), id(m) in ids_punta) for m in miembros
+        ])
+
+        # Dónde va cada tramo del lote: (miembro, flecha, inicio, fin)
+        self._destinos = []
+        for i, flecha in enumerate(flechas):
+            desde = 0
+            for m in flecha.get_family():
+                if len(m.points) == 0:
+                    continue
+                self._destinos.append((m, i, desde, desde + len(m.points)))
+                desde += len(m.points)
+
+        self._visibles = np.ones(len(flechas), dtype=bool)
+
+    def fijar_valores(self, valores):
+        """Ajusta cada flecha al valor del campo en su posición."""
+        valores = np.asarray(valores, dtype=float)
+        longitud = np.abs(valores) * self.escala
+        signo = np.where(valores < 0, -1.0, 1.0)[:, None, None]
+
+        # Cuerpo: se estira; punta: se traslada al extremo (y se encoge si
+        # la flecha es más corta que la propia punta)
+        h = self.altura_punta
+        estirar = np.maximum(longitud - h, 0) / (self.longitud_ref - h)
+        encoger = np.minimum(1.0, longitud / h)[:, None]
+        a_punta = (self._a - self.longitud_ref) * encoger + longitud[:, None]
+        a = np.where(self._es_punta, a_punta, self._a * estirar[:, None])
+        radial = np.where(self._es_punta, encoger, 1.0)
+        b = self._b * radial
+        c = self._c * radial
+
+        # Flechas negativas: giro de 180° alrededor de w (conserva la
+        # orientación de las caras, a diferencia de un espejo)
+        puntos = (self.inicios[:, None]
+                  + signo * (a[..., None] * self.u + b[..., None] * self.v)
+                  + c[..., None] * self.w)
+        for m, i, desde, hasta in self._destinos:
+            m.points = puntos[i, desde:hasta]
+
+        visibles = np.abs(valores) > self.umbral
+        for i in np.flatnonzero(visibles != self._visibles):
+            opacidad = self.opacidad if visibles[i] else 0
+            self.submobjects[i].set_fill(opacity=opacidad).set_stroke(opacity=opacidad)
+        self._visibles = visibles
+        return self
+
+    def fijar_extremos(self, extremos):
+        """Igual que fijar_valores, a partir de los extremos de cada flecha."""
+        valores = (np.asarray(extremos) - self.inicios) @ self.u / self.escala
+        return self.fijar_valores(valores)
+
+
+# ─── Campo de flechas instanciado ───
+# Plantilla común de una flecha: dos siluetas planas cruzadas (planos u-v y
+# u-w) para que se vea desde cualquier ángulo. Cada vértice es
+#   a = coef_cuerpo * largo_cuerpo + coef_largo * longitud   (a lo largo de u)
+#   r = lado * (ancho_punta si es de la punta, si no grosor)  (transversal)
+_SILUETA = np.array([
+    # coef_cuerpo, coef_largo, lado, es_punta
+    [0, 0, -1, 0],
+    [1, 0, -1, 0],
+    [1, 0, -1, 1],
+    [0, 1,  0, 1],
+    [1, 0,  1, 1],
+    [1, 0,  1, 0],
+    [0, 0,  1, 0],
+    [0, 0, -1, 0],
+], dtype=float)
+_BEZIER_T = np.array([0, 1 / 3, 2 / 3, 1])
+
+DTYPE_FLECHA = np.dtype([
+    ("base", float, 3),
+    ("direccion", float, 3),
+    ("longitud", float),
+    ("color", float, 4),
+])
+
+
+class CampoFlechas(VGroup):
+    """Campo denso de flechas guardado como filas de un solo arreglo.
+
+    self.datos tiene una fila por flecha (base, dirección unitaria, longitud,
+    color RGBA). Todas comparten la misma plantilla y se transforman juntas
+    en una sola operación de NumPy; se dibujan como un VMobject por color,
+    así mil flechas cuestan como una sola malla en lugar de mil superficies.
+    Las flechas con longitud <= umbral se colapsan a su base (invisibles).
+    """
+
+    def __init__(self, bases, direcciones=RIGHT, longitudes=1.0, colores=WHITE,
+                 grosor=0.015, altura_punta=0.15, ancho_punta=0.06,
+                 umbral=0.0, opacidad=1.0, **kwargs):
+        super().__init__(**kwargs)
+        bases = np.asarray(bases, dtype=float)
+        self.datos = np.zeros(len(bases), dtype=DTYPE_FLECHA)
+        self.datos["base"] = bases
+        self.datos["direccion"] = np.broadcast_to(normalize_along_axis(
+            np.atleast_2d(np.asarray(direcciones, dtype=float)), 1), bases.shape)
+        self.datos["longitud"] = longitudes
+        if isinstance(colores, (str, ManimColor)):
+            colores = [colores]
+        rgbas = np.array([ManimColor(c).to_rgba() for c in colores])
+        self.datos["color"] = np.broadcast_to(rgbas, (len(bases), 4))
+
+        self.grosor = grosor
+        self.altura_punta = altura_punta
+        self.ancho_punta = ancho_punta
+        self.umbral = umbral
+
+        # Un VMobject por color distinto
+        unicos, self._grupo = np.unique(self.datos["color"], axis=0, return_inverse=True)
+        self._grupo = self._grupo.ravel()
+        for rgba in unicos:
+            capa = VMobject(stroke_width=0)
+            capa.set_fill(rgb_to_color(rgba[:3]), opacity=rgba[3] * opacidad)
+            self.add(capa)
+        self.regenerar()
+
+    def fijar_vectores(self, vectores):
+        """Ajusta dirección y longitud de cada flecha a partir de vectores (n, 3)."""
+        vectores = np.asarray(vectores, dtype=float)
+        longitud = np.linalg.norm(vectores, axis=-1)
+        nulos = longitud == 0
+        direccion = vectores / np.where(nulos, 1, longitud)[:, None]
+        direccion[nulos] = self.datos["direccion"][nulos]
+        self.datos["direccion"] = direccion
+        self.datos["longitud"] = longitud
+        return self.regenerar()
+
+    def puntos_lote(self):
+        """Puntos Bézier de todas las flechas: forma (n, 2*7*4, 3)."""
+        d = self.datos
+        u = d["direccion"]
+        auxiliar = np.where((np.abs(u[:, 2]) < 0.9)[:, None], OUT, RIGHT)
+        v = normalize_along_axis(np.cross(u, auxiliar), 1)
+        w = np.cross(u, v)
+
+        longitud = np.where(d["longitud"] > self.umbral, d["longitud"], 0.0)
+        encoger = np.minimum(1.0, longitud / self.altura_punta)
+        cuerpo = np.maximum(longitud - self.altura_punta, 0.0)
+
+        coef_cuerpo, coef_largo, lado, es_punta = _SILUETA.T
+        a = np.outer(cuerpo, coef_cuerpo) + np.outer(longitud, coef_largo)
+        ancho = np.where(es_punta > 0, self.ancho_punta * encoger[:, None],
+                         self.grosor * (longitud > 0)[:, None])
+        r = lado * ancho
+
+        # (n, 2 planos, 8 vértices, 3)
+        eje = a[:, None, :, None] * u[:, None, None, :]
+        transversal = np.stack([v, w], axis=1)[:, :, None, :] * r[:, None, :, None]
+        vertices = d["base"][:, None, None, :] + eje + transversal
+
+        inicio, fin = vertices[:, :, :-1, None], vertices[:, :, 1:, None]
+        bezier = inicio + (fin - inicio) * _BEZIER_T[:, None]
+        return bezier.reshape(len(d), -1, 3)
+
+    def regenerar(self):
+        puntos = self.puntos_lote()
+        for i, capa in enumerate(self.submobjects):
+            capa.points = puntos[self._grupo == i].reshape(-1, 3)
+        return self
+
+
+# ─── Fondo de estrellas como nube de puntos ───
+class CampoEstrellas(PGroup):
+    """Fondo de estrellas dibujado como nube de puntos en lugar de Dot3D.
+
+    Guarda posiciones, radios y opacidades en arreglos y las dibuja como unas
+    pocas capas PMobject (una por tamaño en píxeles), así cuestan casi nada por
+    fotograma aunque la cámara gire. Con la misma semilla genera exactamente
+    las mismas estrellas que el bucle original con random.seed(semilla) y
+    Dot3D. La opacidad se aplica al color (pensado para fondo negro), porque
+    la nube de puntos se pinta sin mezcla alfa.
+    """
+
+    def __init__(self, n=150, semilla=42, rango_x=(-7, 7), rango_y=(-5, 5),
+                 rango_z=(-3, -0.5), rango_radio=(0.02, 0.05),
+                 rango_opacidad=(0.3, 1.0), color=WHITE, **kwargs):
+        super().__init__(**kwargs)
+        # Mismo orden de sorteo que el bucle original: x, y, z, radio, opacidad
+        azar = random.Random(semilla)
+        datos = np.array([
+            [azar.uniform(*rango_x), azar.uniform(*rango_y), azar.uniform(*rango_z),
+             azar.uniform(*rango_radio), azar.uniform(*rango_opacidad)]
+            for _ in range(n)
+        ])
+        self.posiciones = datos[:, :3]
+        self.radios = datos[:, 3]
+        self.opacidades = datos[:, 4]
+
+        # Diámetro en píxeles a la calidad de render actual
+        diametros = np.maximum(1, np.rint(
+            2 * self.radios * config.pixel_width / config.frame_width
+        )).astype(int)
+        rgb = ManimColor(color).to_rgb()
+        for diametro in np.unique(diametros):
+            elegidas = diametros == diametro
+            capa = PMobject(stroke_width=diametro)
+            rgbas = np.ones((elegidas.sum(), 4))
+            rgbas[:, :3] = self.opacidades[elegidas, None] * rgb
+            capa.add_points(self.posiciones[elegidas], rgbas=rgbas)
+            # Se ordena en profundidad junto con las superficies 3D
+            capa.shade_in_3d = True
+            self.add(capa)
+
+    def fade(self, darkness=0.5, family=True):
+        for capa in self.submobjects:
+            capa.rgbas[:, :3] *= 1 - darkness
+        return self
+
+
+# ─── Esfera con nivel de detalle según su tamaño en pantalla ───
+def resolucion_esfera(radio_px, tolerancia_px=1.0, minimo=6, maximo=32):
+    """Divisiones (u, v) para que la silueta facetada no se separe del
+    círculo ideal más de tolerancia_px (flecha de la cuerda)."""
+    if radio_px <= tolerancia_px:
+        n = minimo
+    else:
+        angulo = 2 * np.arccos(1 - tolerancia_px / radio_px)
+        n = int(np.ceil(TAU / angulo))
+    n = int(np.clip(n + n % 2, minimo, maximo))
+    return (n, max(n // 2, 3))
+
+
+class EsferaLOD(Sphere):
+    """Sphere cuya teselación depende de su radio proyectado en pantalla.
+
+    El radio en píxeles se calcula con la calidad de render (config.pixel_height,
+    -ql vs -qh) y, si se da la cámara 3D, con su zoom y perspectiva. Con cámara
+    se agrega un updater que vuelve a teselar cuando la cámara o el tamaño de la
+    esfera cambian lo suficiente (más de un 25 % en divisiones), conservando
+    colores, opacidades y trazo.
+    """
+
+    def __init__(self, center=ORIGIN, radius=1, camara=None, tolerancia_px=1.0,
+                 minimo=6, maximo=32, **kwargs):
+        self.camara = camara
+        self.tolerancia_px = tolerancia_px
+        self.minimo = minimo
+        self.maximo = maximo
+        if kwargs.get("resolution") is None:
+            kwargs["resolution"] = self.resolucion_para(radius, center)
+        super().__init__(center=center, radius=radius, **kwargs)
+        if camara is not None:
+            self.add_updater(lambda m: m.refinar())
+
+    def radio_en_pantalla(self, radio, centro):
+        escala = config.pixel_height / config.frame_height
+        if self.camara is None:
+            return radio * escala
+        profundidad = np.dot(np.asarray(centro) - self.camara.frame_center,
+                             self.camara.get_rotation_matrix()[2])
+        distancia = self.camara.get_focal_distance()
+        perspectiva = distancia / max(distancia - profundidad, 1e-3)
+        return radio * escala * perspectiva * self.camara.get_zoom()
+
+    def resolucion_para(self, radio, centro):
+        return resolucion_esfera(self.radio_en_pantalla(radio, centro),
+                                 self.tolerancia_px, self.minimo, self.maximo)
+
+    def refinar(self):
+        puntos = self.get_all_points()
+        if len(puntos) == 0:
+            return self
+        minimo, maximo = puntos.min(axis=0), puntos.max(axis=0)
+        centro = (minimo + maximo) / 2
+        radio = (maximo - minimo).max() / 2
+        deseada = self.resolucion_para(radio, centro)
+        actual = self.resolution[0] if not isinstance(self.resolution, int) else self.resolution
+        if abs(deseada[0] - actual) <= 0.25 * actual:
+            return self
+        return self.teselar(deseada, radio, centro)
+
+    def teselar(self, resolucion, radio, centro):
+        """Reconstruye las caras con otra resolución en el mismo lugar."""
+        estilos = []
+        for cara in self.submobjects[:2]:
+            estilos.append(dict(
+                fill_color=cara.get_fill_color(), fill_opacity=cara.get_fill_opacity(),
+                stroke_color=cara.get_stroke_color(), stroke_width=cara.get_stroke_width(),
+                stroke_opacity=cara.get_stroke_opacity(),
+            ))
+        self.radius = radio
+        self.resolution = resolucion
+        self.submobjects = []
+        self._setup_in_uv_space()
+        self.apply_function(lambda p: self.func(p[0], p[1]))
+        self.shift(centro)
+        # Alterna los dos estilos como el patrón de tablero original
+        for cara in self.submobjects:
+            estilo = estilos[(cara.u_index + cara.v_index) % len(estilos)]
+            cara.set_fill(estilo["fill_color"], opacity=estilo["fill_opacity"])
+            cara.set_stroke(estilo["stroke_color"], width=estilo["stroke_width"],
+                            opacity=estilo["stroke_opacity"])
+        return self
+
+
+# ─── Plantillas compartidas ───
+_plantillas = {}
+
+
+def plantilla(clase, *args, **kwargs):
+    """Copia de clase(*args, **kwargs), construido una sola vez por proceso.
+
+    Para ejes, textos y ecuaciones que se repiten igual entre renders del
+    mismo proceso (barrido.py): la copia es mucho más barata que volver a
+    construir los ticks o a leer el SVG de un MathTex.
+    """
+    clave = (clase.__module__, clase.__qualname__, repr(args), repr(sorted(kwargs.items())))
+    if clave not in _plantillas:
+        _plantillas[clave] = clase(*args, **kwargs)
+    return _plantillas[clave].copy()
@@ -0,0 +1,244 @@
+"""
+Perfilado por animación de las escenas de 3/ondas
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Instrumentación opcional: envuelve play, wait, move_camera,
+add_fixed_in_frame_mobjects y la creación de Text/MathTex, además del
+rasterizado (camera.capture_mobjects) y la escritura de fotogramas al
+codificador. Al final de cada play/wait anota cuántos mobjects y puntos
+hay en pantalla. El resultado es un archivo de eventos en formato Chrome
+Trace (JSON), que abren chrome://tracing, ui.perfetto.dev y speedscope.
+
+Para ejecutar:
+  python perfil.py OndaEMPlana                        # -> media/perfil/<escena>.json
+  python perfil.py dialectrico_sinperdida_manim.DielectricoEspacio -q m
+
+Desde código:
+  with Perfilador() as perfil:
+      Escena().render()
+  perfil.guardar("traza.json")
+
+El codificador de video corre en un hilo aparte: "codificar" mide sólo
+lo que el hilo principal tarda en entregarle cada fotograma y en cerrar
+el archivo al final.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from escenas import DIRECTORIO, cargar_clase, elegir
+
+SALIDA = os.path.join(DIRECTORIO, "media", "perfil")
+CALIDADES = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+
+
+def contar_en_pantalla(escena):
+    """(mobjects, puntos) de toda la familia de mobjects de la escena."""
+    familia = escena.get_mobject_family_members()
+    return len(familia), sum(len(m.points) for m in familia)
+
+
+class Perfilador:
+    """Registra eventos de duración (ph "X") y contadores (ph "C").
+
+    instalar() reemplaza los métodos en las clases de manim y desinstalar()
+    los restaura; también funciona como context manager.
+    """
+
+    def __init__(self):
+        self.eventos = []
+        self.llamadas = []   # play/wait más externos, para bench_escenas
+        self.fotogramas = 0
+        self._originales = []
+        self._pila = []
+        self._t0 = time.perf_counter()
+        self._pid = os.getpid()
+
+    # ── Registro ──
+    def _ahora_us(self):
+        return (time.perf_counter() - self._t0) * 1e6
+
+    def _completo(self, nombre, categoria, inicio, args=None):
+        evento = {
+            "name": nombre, "cat": categoria, "ph": "X",
+            "ts": inicio, "dur": self._ahora_us() - inicio,
+            "pid": self._pid, "tid": 0,
+        }
+        if args:
+            evento["args"] = args
+        self.eventos.append(evento)
+        return evento
+
+    def _contador(self, escena):
+        mobjects, puntos = contar_en_pantalla(escena)
+        self.eventos.append({
+            "name": "en pantalla", "ph": "C", "ts": self._ahora_us(),
+            "pid": self._pid, "tid": 0,
+            "args": {"mobjects": mobjects, "puntos": puntos},
+        })
+        return mobjects, puntos
+
+    # ── Envolturas ──
+    def _envolver(self, clase, metodo, crear):
+        original = clase.__dict__.get(metodo)
+        heredado = getattr(clase, metodo)
+        self._originales.append((clase, metodo, original))
+        setattr(clase, metodo, crear(heredado))
+
+    def _medir(self, nombre, categoria, etiqueta=None):
+        perfil = self
+
+        def crear(metodo):
+            def envoltura(obj, *args, **kwargs):
+                inicio = perfil._ahora_us()
+                try:
+                    return metodo(obj, *args, **kwargs)
+                finally:
+                    args_evento = etiqueta(obj, args, kwargs) if etiqueta else None
+                    perfil._completo(nombre, categoria, inicio, args_evento)
+            return envoltura
+        return crear
+
+    def _medir_animacion(self, nombre):
+        # wait() llama a play(): ambos quedan en la traza anidados, pero
+        # sólo el más externo cuenta como llamada de la escena
+        perfil = self
+
+        def crear(metodo):
+            def envoltura(escena, *args, **kwargs):
+                inicio, fotogramas = perfil._ahora_us(), perfil.fotogramas
+                perfil._pila.append(nombre)
+                try:
+                    return metodo(escena, *args, **kwargs)
+                finally:
+                    perfil._pila.pop()
+                    mobjects, puntos = perfil._contador(escena)
+                    args_evento = {
+                        "fotogramas": perfil.fotogramas - fotogramas,
+                        "mobjects": mobjects,
+                        "puntos": puntos,
+                    }
+                    if nombre == "play":
+                        args_evento["animaciones"] = [type(a).__name__ for a in args]
+                    evento = perfil._completo(nombre, "escena", inicio, args_evento)
+                    if not perfil._pila:
+                        perfil.llamadas.append({
+                            "tipo": nombre,
+                            "segundos": evento["dur"] / 1e6,
+                            "fotogramas": args_evento["fotogramas"],
+                        })
+            return envoltura
+        return crear
+
+    def _contar_fotogramas(self, metodo):
+        perfil = self
+
+        def envoltura(renderer, frame, num_frames=1):
+            if not renderer.skip_animations:
+                perfil.fotogramas += num_frames
+            return metodo(renderer, frame, num_frames)
+        return envoltura
+
+    def instalar(self, clase_escena=None):
+        """Instrumenta manim (y el construct de clase_escena, si se da)."""
+        from manim import MathTex, Scene, Tex, Text, ThreeDScene
+        from manim.camera.camera import Camera
+        from manim.renderer.cairo_renderer import CairoRenderer
+        from manim.scene.scene_file_writer import SceneFileWriter
+
+        def texto(obj, args, kwargs):
+            return {"texto": " ".join(str(a) for a in args)[:80]}
+
+        def fijos(obj, args, kwargs):
+            return {"n": len(args)}
+
+        self._envolver(Scene, "play", self._medir_animacion("play"))
+        self._envolver(Scene, "wait", self._medir_animacion("wait"))
+        self._envolver(ThreeDScene, "move_camera", self._medir("move_camera", "escena"))
+        self._envolver(ThreeDScene, "add_fixed_in_frame_mobjects",
+                       self._medir("add_fixed_in_frame_mobjects", "escena", fijos))
+        for clase in (Text, MathTex, Tex):
+            self._envolver(clase, "__init__", self._medir(clase.__name__, "texto", texto))
+        self._envolver(Camera, "capture_mobjects", self._medir("rasterizar", "render"))
+        self._envolver(SceneFileWriter, "write_frame", self._medir("codificar", "render"))
+        self._envolver(SceneFileWriter, "finish", self._medir("cerrar video", "render"))
+        self._envolver(CairoRenderer, "add_frame", self._contar_fotogramas)
+        if clase_escena is not None:
+            self._envolver(clase_escena, "construct", self._medir("construct", "escena"))
+        return self
+
+    def desinstalar(self):
+        for clase, metodo, original in reversed(self._originales):
+            if original is None:
+                delattr(clase, metodo)
+            else:
+                setattr(clase, metodo, original)
+        self._originales = []
+
+    def __enter__(self):
+        if not self._originales:
+            self.instalar()
+        return self
+
+    def __exit__(self, *exc):
+        self.desinstalar()
+
+    # ── Resultados ──
+    def resumen(self):
+        """Segundos totales por tipo de evento (con hijos incluidos)."""
+        totales = {}
+        for e in self.eventos:
+            if e["ph"] == "X":
+                totales[e["name"]] = totales.get(e["name"], 0.0) + e["dur"] / 1e6
+        # Tiempo en Python de la escena: construct menos rasterizado y codificación
+        if "construct" in totales:
+            totales["construct (propio)"] = (totales["construct"]
+                                             - totales.get("rasterizar", 0.0)
+                                             - totales.get("codificar", 0.0))
+        return totales
+
+    def guardar(self, ruta):
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        with open(ruta, "w") as f:
+            json.dump({"traceEvents": self.eventos, "displayTimeUnit": "ms"}, f)
+        return ruta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("escena", help="Clase o archivo.Clase")
+    parser.add_argument("-q", "--calidad", choices=CALIDADES, default="l")
+    parser.add_argument("-o", "--salida", help="archivo de traza JSON")
+    args = parser.parse_args()
+
+    try:
+        escena = elegir(args.escena)
+    except ValueError as error:
+        parser.error(str(error))
+
+    from manim import tempconfig
+
+    clase = cargar_clase(escena)
+    perfil = Perfilador()
+    with tempconfig({"quality": CALIDADES[args.calidad], "disable_caching": True}):
+        with perfil.instalar(clase):
+            clase().render()
+
+    ruta = perfil.guardar(args.salida or os.path.join(SALIDA, f"{escena.nombre}.json"))
+    for nombre, segundos in sorted(perfil.resumen().items(), key=lambda x: -x[1]):
+        print(f"{nombre:30} {segundos:8.2f} s")
+    print(f"Traza: {ruta}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Precalentado en paralelo de la caché de Text y MathTex
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Lee los *_manim.py con ast y junta cada llamada a Text(...), MathTex(...)
+o Tex(...) (también dentro de plantilla(Text, ...)) cuyos argumentos son literales o constantes de manim (colores,
+tamaños, etc.). Cada expresión distinta se construye una vez en un pool de
+procesos, lo que deja el SVG en media/texts o media/Tex; así el render ya
+no compila LaTeX ni maqueta fuentes en serie dentro de construct().
+
+Al final reporta aciertos (el SVG ya estaba en caché), fallos (se tuvo que
+compilar) y omitidas (dependen de variables locales de la escena).
+Los atributos de la escena (self.color_E, ...) se pueden fijar con valores
+concretos, una vez por variante (ver barrido.py).
+
+Para ejecutar (desde 3/ondas, igual que manim):
+  python precalentar.py
+  python precalentar.py -j 8 onda_plana_manim.py
+"""
+
+import argparse
+import ast
+import builtins
+import copy
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from escenas import DIRECTORIO
+
+TIPOS = ("Text", "MathTex", "Tex")
+
+# Estado de cada proceso del pool
+_espacio = {}
+_compilaciones = [0]
+
+
+def recolectar(archivos, variantes=({},)):
+    """Expresiones distintas (código fuente normalizado) de Text/MathTex/Tex.
+
+    variantes: dicts {atributo: código}; cada expresión que usa self.atributo
+    se agrega una vez por variante con ese código en su lugar.
+    """
+    expresiones = []
+    for archivo in archivos:
+        with open(archivo, encoding="utf-8") as f:
+            arbol = ast.parse(f.read(), filename=archivo)
+        for nodo in ast.walk(arbol):
+            llamada = _llamada_texto(nodo)
+            if llamada is None:
+                continue
+            for atributos in variantes:
+                expresion = ast.unparse(_Sustituir(atributos).visit(copy.deepcopy(llamada)))
+                if expresion not in expresiones:
+                    expresiones.append(expresion)
+    return expresiones
+
+
+class _Sustituir(ast.NodeTransformer):
+    """Reemplaza self.atributo por el código dado."""
+
+    def __init__(self, atributos):
+        self.atributos = atributos
+
+    def visit_Attribute(self, nodo):
+        if (isinstance(nodo.value, ast.Name) and nodo.value.id == "self"
+                and nodo.attr in self.atributos):
+            return ast.parse(self.atributos[nodo.attr], mode="eval").body
+        return self.generic_visit(nodo)
+
+
+def _llamada_texto(nodo):
+    """La llamada Text/MathTex/Tex de nodo, o None. plantilla(Text, ...) -> Text(...)."""
+    if not (isinstance(nodo, ast.Call) and isinstance(nodo.func, ast.Name)):
+        return None
+    if nodo.func.id in TIPOS:
+        return nodo
+    if (nodo.func.id == "plantilla" and nodo.args
+            and isinstance(nodo.args[0], ast.Name) and nodo.args[0].id in TIPOS):
+        return ast.Call(func=nodo.args[0], args=nodo.args[1:], keywords=nodo.keywords)
+    return None
+
+
+def _iniciar():
+    """Prepara un proceso del pool: manim cargado y compilaciones contadas."""
+    import manim
+    import manimpango
+    from manim import config
+    from manim.utils import tex_file_writing
+
+    os.chdir(DIRECTORIO)
+    # La limpieza de LaTeX borra los .dvi de los demás procesos a mitad de
+    # compilar: se hace una sola vez al final (limpiar)
+    config.no_latex_cleanup = True
+    config.verbosity = "WARNING"
+    _espacio.update(vars(manim))
+
+    def contar(funcion):
+        def envoltura(*args, **kwargs):
+            _compilaciones[0] += 1
+            return funcion(*args, **kwargs)
+        return envoltura
+
+    tex_file_writing.compile_tex = contar(tex_file_writing.compile_tex)
+    manimpango.text2svg = contar(manimpango.text2svg)
+
+
+def construir(expresion):
+    """Construye una expresión; devuelve (expresion, estado, segundos)."""
+    nombres = {n.id for n in ast.walk(ast.parse(expresion)) if isinstance(n, ast.Name)}
+    if not nombres <= _espacio.keys() | vars(builtins).keys():
+        return expresion, "omitida", 0.0
+    antes = _compilaciones[0]
+    inicio = time.perf_counter()
+    try:
+        eval(expresion, dict(_espacio))
+    except Exception as error:
+        return expresion, f"error: {error}", time.perf_counter() - inicio
+    estado = "fallo" if _compilaciones[0] > antes else "acierto"
+    return expresion, estado, time.perf_counter() - inicio
+
+
+def limpiar():
+    from manim.utils.tex_file_writing import delete_nonsvg_files
+
+    delete_nonsvg_files()
+
+
+def precalentar(archivos, procesos=None, variantes=({},)):
+    """Construye en paralelo todos los textos de los archivos; devuelve los resultados."""
+    expresiones = recolectar(archivos, variantes)
+    if not expresiones:
+        return []
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar) as pool:
+        resultados = list(pool.map(construir, expresiones))
+        pool.submit(limpiar).result()
+    return resultados
+
+
+def resumir(resultados):
+    """{estado: cantidad}, con todos los errores juntos como "error"."""
+    conteo = {"acierto": 0, "fallo": 0, "omitida": 0, "error": 0}
+    for _, estado, _ in resultados:
+        conteo["error" if estado.startswith("error") else estado] += 1
+    return conteo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("archivos", nargs="*", help="por defecto, todos los *_manim.py")
+    parser.add_argument("-j", "--procesos", type=int, default=os.cpu_count())
+    parser.add_argument("-v", "--detalle", action="store_true", help="una línea por expresión")
+    args = parser.parse_args()
+
+    archivos = args.archivos or sorted(
+        os.path.join(DIRECTORIO, a) for a in os.listdir(DIRECTORIO) if a.endswith("_manim.py")
+    )
+    inicio = time.perf_counter()
+    resultados = precalentar(archivos, args.procesos)
+    if args.detalle:
+        for expresion, estado, segundos in resultados:
+            print(f"{estado:10} {segundos:6.2f} s  {expresion[:90]}")
+    conteo = resumir(resultados)
+    print(f"{len(resultados)} textos en {time.perf_counter() - inicio:.1f} s: "
+          f"{conteo['acierto']} aciertos, {conteo['fallo']} fallos, "
+          f"{conteo['omitida']} omitidas, {conteo['error']} errores")
+    return 1 if conteo["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Render por lotes de todas las escenas de 3/ondas
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Descubre todas las clases de escena de los *_manim.py, junta las que son
+idénticas (OndaEMPlana está copiada en los tres archivos) comparando el
+hash de su código, y renderiza las distintas en paralelo, una por núcleo.
+Los videos quedan juntos en media/lote/<calidad>/.
+
+Para ejecutar:
+  python render_lote.py                  # todas, calidad baja
+  python render_lote.py -q h             # todas en alta calidad
+  python render_lote.py --listar         # sólo muestra qué se renderizaría
+  python render_lote.py OndaEsferica -j 2
+  python render_lote.py --continuo       # un solo stream por escena (escritor.py)
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from escenas import DIRECTORIO, Escena, cargar_clase, descubrir_escenas, filtrar
+from perfil import CALIDADES
+from precalentar import precalentar, resumir
+
+SALIDA = os.path.join(DIRECTORIO, "media", "lote")
+
+
+def agrupar(escenas):
+    """{huella: [escenas idénticas]} en el orden en que aparecen."""
+    grupos = {}
+    for escena in escenas:
+        grupos.setdefault(escena.huella, []).append(escena)
+    return grupos
+
+
+def nombres_salida(representantes):
+    """Nombre de video por escena: la clase, o archivo.Clase si se repite."""
+    clases = [e.clase for e in representantes]
+    return {
+        e.huella: e.clase if clases.count(e.clase) == 1 else e.nombre
+        for e in representantes
+    }
+
+
+def renderizar(archivo, clase, calidad, destino, continuo=False):
+    """Renderiza una escena en este proceso y copia el video a destino."""
+    from manim import tempconfig
+
+    # Mismo media/ (cachés de textos y fotogramas) que precalentar
+    os.chdir(DIRECTORIO)
+    if continuo:
+        os.environ["ONDAS_CONTINUO"] = "1"
+    escena = Escena(archivo, clase)
+    inicio = time.perf_counter()
+    # En modo continuo no hay parciales que reutilizar: ni se calculan los hashes
+    with tempconfig({"quality": CALIDADES[calidad], "preview": False,
+                     "disable_caching": continuo,
+                     "progress_bar": "none", "verbosity": "WARNING"}):
+        instancia = cargar_clase(escena)()
+        instancia.render()
+        video = instancia.renderer.file_writer.movie_file_path
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    destino = destino + os.path.splitext(str(video))[1]
+    shutil.copyfile(video, destino)
+    return destino, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("escenas", nargs="*", help="clases o archivo.Clase a renderizar")
+    parser.add_argument("-q", "--calidad", choices=CALIDADES, default="l")
+    parser.add_argument("-j", "--procesos", type=int, default=os.cpu_count())
+    parser.add_argument("-o", "--salida", default=SALIDA)
+    parser.add_argument("--listar", action="store_true",
+                        help="mostrar las escenas distintas y sus copias sin renderizar")
+    parser.add_argument("--sin-precalentar", action="store_true",
+                        help="no construir antes los Text/MathTex en paralelo")
+    parser.add_argument("--continuo", action="store_true",
+                        help="escribir cada escena 3D en un solo stream, sin parciales")
+    args = parser.parse_args()
+
+    grupos = agrupar(filtrar(descubrir_escenas(), args.escenas))
+    representantes = [copias[0] for copias in grupos.values()]
+    nombres = nombres_salida(representantes)
+    for escena in representantes:
+        copias = ", ".join(e.nombre for e in grupos[escena.huella][1:])
+        print(f"{nombres[escena.huella]:30} {escena.nombre}"
+              + (f"  (idéntica a: {copias})" if copias else ""))
+    if args.listar or not representantes:
+        return 0
+
+    if not args.sin_precalentar:
+        conteo = resumir(precalentar(sorted({e.archivo for e in representantes}), args.procesos))
+        print(f"Textos precalentados: {conteo['acierto']} aciertos, {conteo['fallo']} fallos")
+    directorio = os.path.join(args.salida, CALIDADES[args.calidad])
+    procesos = max(1, min(args.procesos, len(representantes)))
+    print(f"\nRenderizando {len(representantes)} escenas con {procesos} procesos...")
+    inicio = time.perf_counter()
+    fallidas = 0
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        tareas = {
+            pool.submit(renderizar, e.archivo, e.clase, args.calidad,
+                        os.path.join(directorio, nombres[e.huella]), args.continuo): e
+            for e in representantes
+        }
+        for tarea in as_completed(tareas):
+            escena = tareas[tarea]
+            try:
+                video, segundos = tarea.result()
+                print(f"  {escena.nombre:45} {segundos:7.1f} s  -> {video}")
+            except Exception as error:
+                fallidas += 1
+                print(f"  {escena.nombre:45} ERROR: {error}")
+    print(f"Total: {time.perf_counter() - inicio:.1f} s")
+    return 1 if fallidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
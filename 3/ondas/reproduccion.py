@@ -0,0 +1,356 @@
+"""
+Reproducción de la lógica de medidorEB sobre arreglos completos
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+La placa procesa muestra por muestra: media móvil de VENTANA lecturas en
+bufHall/bufE, nivel de E con E_BAJO/E_MEDIO/E_ALTO y la persistencia de
+la barra E (CAMBIO_UMBRAL, PERSIST_CICLOS). Aquí está el mismo cálculo
+con NumPy sobre arreglos completos y en float32 con el mismo orden de
+operaciones. Hace falta lo que traen las tramas del modo binario (AIN0 y
+AIN1 crudos, offset_mv y seq), que las sesiones grabadas en ese modo
+guardan: con todas las tramas, gauss, E, nivel y barra salen idénticos
+bit a bit a los del firmware (test_reproduccion.py los compara con una
+traducción directa de loop()). Las sesiones CSV sólo tienen E ya
+suavizado y redondeado: con ellas sólo se barren umbrales.
+
+- Media móvil: suavizar() suma el búfer por ranura (0..5), no por
+  antigüedad; la suma se hace columna por columna en ese orden.
+- Nivel: el if/else anidado de nivelIndice(); con los umbrales en orden
+  equivale a contar los que no superan a e_v, y si no, np.where anidados.
+- Barra E: llena mientras hayan pasado menos de PERSIST_CICLOS muestras
+  desde el último cambio >= CAMBIO_UMBRAL; el último cambio sale de un
+  maximum.accumulate de los índices.
+
+niveles() y barra() aceptan arreglos de umbrales y evalúan todas las
+combinaciones de una vez (una fila por combinación).
+
+Tramos: calibrar() deja los búferes en 0, bufIdx en 0 y eAnterior en 0.
+Un cambio de offset_mv (recalibración) o una secuencia que vuelve atrás
+(reset de la placa) empieza un tramo nuevo desde ese estado. Al arrancar,
+la trama 0 es el primer loop después de calibrar; tras una recalibración
+el tramo empieza en la primera trama que llegó (si justo esa se perdió,
+bufIdx queda corrido todo el tramo).
+
+Tramas perdidas: dentro de un tramo cada trama va en el loop que dice su
+seq, así que bufIdx sigue en fase. Lo que la placa leyó en los loops
+perdidos no se sabe y se toma igual a la última lectura recibida: gauss
+y E pueden diferir de la placa en los VENTANA - 1 loops que siguen a un
+hueco y la barra en los VENTANA + PERSIST_CICLOS - 1; después vuelven a
+ser idénticos.
+
+Reproductor hace lo mismo por bloques, para tramas que llegan de a poco,
+con el mismo resultado que reproducir() sobre todas juntas.
+
+Para ejecutar:
+  python reproduccion.py sesiones/hoy --bajo 1.0 1.1 1.2 --alto 2.4 2.5
+  python reproduccion.py sesiones/binaria --umbral 0.02 0.03 --ciclos 20 35
+"""
+
+import argparse
+import itertools
+import sys
+import time
+
+import numpy as np
+
+from medidor import MUESTRA, NIVELES
+
+# Mismos valores que los #define de medidorEB.ino, en float32
+VENTANA = 6
+E_BAJO = np.float32(1.1)
+E_MEDIO = np.float32(1.7)
+E_ALTO = np.float32(2.5)
+PERSIST_CICLOS = 35
+CAMBIO_UMBRAL = np.float32(0.03)
+# Loops anteriores que bastan para seguir un tramo sin cambiar el resultado
+COLA = VENTANA + PERSIST_CICLOS
+SS49E_SENS = np.float32(5.0)
+# Adafruit_ADS1X15::computeVolts con GAIN_ONE: cuentas * (4.096f / 32768)
+VOLTS_POR_CUENTA = np.float32(4.096) / np.float32(32768)
+
+
+def voltios(crudo):
+    return np.asarray(crudo).astype(np.float32) * VOLTS_POR_CUENTA
+
+
+def media_movil(x, ventana=VENTANA):
+    """suavizar() de la placa para toda la señal (búfer en 0 al empezar).
+
+    En la muestra j = ventana·r + c el búfer tiene en las ranuras 0..c las
+    muestras de la fila r y en las ranuras c+1.. las de la fila r - 1; se
+    suman ranura por ranura, como el for del firmware. La suma de las
+    ranuras 0..c es común a las columnas c, c+1..., así que se acumula una
+    sola vez.
+    """
+    x = np.asarray(x, dtype=np.float32)
+    n = len(x)
+    filas = -(-n // ventana)
+    matriz = np.zeros((filas, ventana), dtype=np.float32)
+    matriz.ravel()[:n] = x
+    # Columnas contiguas de la fila actual y de la anterior
+    actual = [np.ascontiguousarray(matriz[:, i]) for i in range(ventana)]
+    anterior = [np.concatenate([[np.float32(0)], columna[:-1]]) for columna in actual]
+    prefijo = np.zeros(filas, dtype=np.float32)
+    suma = np.empty(filas, dtype=np.float32)
+    for c in range(ventana):
+        prefijo += actual[c]
+        suma[:] = prefijo
+        for i in range(c + 1, ventana):
+            suma += anterior[i]
+        suma /= np.float32(ventana)
+        matriz[:, c] = suma
+    return matriz.ravel()[:n]
+
+
+def _columna(valores):
+    # Umbrales escalares o arreglos -> columna para comparar contra (n,)
+    return np.asarray(valores, dtype=np.float32).reshape(-1, 1)
+
+
+def niveles(e_v, bajo=E_BAJO, medio=E_MEDIO, alto=E_ALTO):
+    """nivelIndice() de la placa: (n,) con umbrales escalares, (k, n) con k umbrales."""
+    e_v = np.asarray(e_v, dtype=np.float32)
+    escalar = all(np.ndim(u) == 0 for u in (bajo, medio, alto))
+    bajo, medio, alto = np.broadcast_arrays(_columna(bajo), _columna(medio), _columna(alto))
+    if np.all(bajo <= medio) and np.all(medio <= alto):
+        # Umbrales en orden: el if/else anidado cuenta los umbrales que no
+        # superan a e_v (los NaN no son < nada y dan 3, igual que en la placa)
+        nivel = np.less(e_v, bajo, dtype=bool)
+        np.logical_not(nivel, out=nivel)
+        nivel = nivel.view(np.int8)
+        for umbral in (medio, alto):
+            nivel += ~np.less(e_v, umbral)
+    else:
+        nivel = np.where(e_v < bajo, np.int8(0),
+                         np.where(e_v < medio, np.int8(1),
+                                  np.where(e_v < alto, np.int8(2), np.int8(3))))
+    return nivel[0] if escalar else nivel
+
+
+def ultimo_cambio(e_v, umbral=CAMBIO_UMBRAL):
+    """Índice del último cambio >= umbral hasta cada muestra (-1 si no hubo)."""
+    e_v = np.asarray(e_v, dtype=np.float32)
+    anterior = np.empty_like(e_v)
+    anterior[:1] = 0  # eAnterior después de calibrar()
+    anterior[1:] = e_v[:-1]
+    delta = np.abs(e_v - anterior)
+    tipo = np.int32 if len(e_v) < 2 ** 31 else np.int64
+    indices = np.arange(len(e_v), dtype=tipo)
+    cambios = np.where(delta >= _columna(umbral), indices, tipo(-1))
+    return np.maximum.accumulate(cambios, axis=1)
+
+
+def barra(e_v, umbral=CAMBIO_UMBRAL, ciclos=PERSIST_CICLOS):
+    """barraELlena de la placa.
+
+    (n,) con umbral y ciclos escalares; con arreglos, (len(umbral),
+    len(ciclos), n): el último cambio se calcula una vez por umbral.
+    """
+    ultimo = ultimo_cambio(e_v, umbral)
+    indices = np.arange(ultimo.shape[1], dtype=ultimo.dtype)
+    ciclos_col = np.asarray(ciclos).reshape(-1, 1, 1)
+    llena = (ultimo >= 0) & (indices - ultimo < ciclos_col)
+    llena = llena.transpose(1, 0, 2)
+    if np.ndim(umbral) == 0 and np.ndim(ciclos) == 0:
+        return llena[0, 0]
+    return llena
+
+
+def reproducir_senales(hall_rel_mv, e_v, suavizar=True):
+    """Lo que imprime la placa a partir de hallRel (mV) y eAbsoluto (V).
+
+    Devuelve un arreglo MUESTRA (t en 0). Con suavizar=False las señales se
+    toman como ya suavizadas (sesiones grabadas en modo CSV).
+    """
+    hall = np.asarray(hall_rel_mv, dtype=np.float32)
+    e_v = np.asarray(e_v, dtype=np.float32)
+    if suavizar:
+        hall, e_v = media_movil(hall), media_movil(e_v)
+    gauss = hall / SS49E_SENS
+    muestras = np.zeros(len(e_v), dtype=MUESTRA)
+    muestras["gauss"] = gauss
+    # tesla = gauss * 1e-4f; Serial imprime tesla * 1000.0f
+    gauss *= np.float32(1e-4)
+    gauss *= np.float32(1000)
+    muestras["mtesla"] = gauss
+    muestras["e_v"] = e_v
+    muestras["nivel"] = niveles(e_v)
+    muestras["barra"] = barra(e_v)
+    return muestras
+
+
+# ── Tramas ──
+def lecturas(ain0, ain1, offset_mv):
+    """hallRel (mV) y eAbsoluto (V) como los calcula loop() con las cuentas crudas."""
+    hall_rel = voltios(ain0)
+    hall_rel *= np.float32(1000)
+    hall_rel -= np.asarray(offset_mv, dtype=np.float32)
+    return hall_rel, voltios(ain1)
+
+
+def _reinicio(salto):
+    # La secuencia vuelve atrás o se repite: reset de la placa (como en
+    # medidor.DecodificadorTramas)
+    return (salto - 1) % 65536 >= 32768
+
+
+def tramos(offset_mv, seq):
+    """Bordes de los tramos entre recalibraciones (cambia offset_mv) y resets."""
+    offset_mv = np.asarray(offset_mv, dtype=np.float32)
+    seq = np.asarray(seq, dtype=np.int64)
+    corte = (offset_mv[1:] != offset_mv[:-1]) | _reinicio(np.diff(seq))
+    return np.concatenate([[0], np.flatnonzero(corte) + 1, [len(offset_mv)]])
+
+
+class Reproductor:
+    """reproducir() por bloques: agregar() da las muestras de cada bloque.
+
+    Guarda el final del tramo en curso (las últimas COLA lecturas, una por
+    loop) y lo vuelve a pasar con el bloque siguiente, así que el resultado
+    es el mismo que con todas las tramas juntas.
+    """
+
+    def __init__(self):
+        self._offset = None
+        self._seq = None
+        self._fin = 0  # loop del tramo que sigue a la última trama
+        self._hall = self._e = np.zeros(0, dtype=np.float32)
+
+    def agregar(self, ain0, ain1, offset_mv, seq):
+        """Muestras (MUESTRA, t en 0) de las tramas del bloque, en orden."""
+        hall_rel, e_v = lecturas(ain0, ain1, offset_mv)
+        offset_mv = np.broadcast_to(np.asarray(offset_mv, dtype=np.float32), hall_rel.shape)
+        seq = np.asarray(seq, dtype=np.int64)
+        bordes = tramos(offset_mv, seq)
+        partes = [self._tramo(hall_rel[a:b], e_v[a:b], offset_mv[a], seq[a:b])
+                  for a, b in zip(bordes[:-1], bordes[1:]) if a < b]
+        if not partes:
+            return np.zeros(0, dtype=MUESTRA)
+        return np.concatenate(partes)
+
+    def _tramo(self, hall_rel, e_v, offset_mv, seq):
+        salto = None if self._seq is None else (int(seq[0]) - self._seq) % 65536
+        if salto is not None and offset_mv == self._offset and not _reinicio(salto):
+            primera = self._fin - 1 + salto
+        else:
+            # Al arrancar la trama 0 es el primer loop; tras recalibrar, la
+            # primera que llegó
+            primera = int(seq[0]) if salto is None or _reinicio(salto) else 0
+            self._fin = 0
+            self._hall = self._e = np.zeros(0, dtype=np.float32)
+        loops = primera + np.concatenate([[0], np.cumsum(np.diff(seq) % 65536)])
+
+        # Una lectura por loop desde el final de la cola: los loops perdidos
+        # repiten la última lectura recibida
+        conocidos = loops
+        if len(self._hall):
+            conocidos = np.concatenate([[self._fin - 1], loops])
+            hall_rel = np.concatenate([self._hall[-1:], hall_rel])
+            e_v = np.concatenate([self._e[-1:], e_v])
+        cual = np.searchsorted(conocidos, np.arange(self._fin, loops[-1] + 1), side="right") - 1
+        np.maximum(cual, 0, out=cual)
+        inicio = self._fin - len(self._hall)
+        hall = np.concatenate([self._hall, hall_rel[cual]])
+        e = np.concatenate([self._e, e_v[cual]])
+
+        # media_movil() empieza en la ranura 0: ceros hasta la ranura del
+        # primer loop (sólo cambian la cola, que ya salió en el bloque anterior)
+        relleno = np.zeros(inicio % VENTANA, dtype=np.float32)
+        muestras = reproducir_senales(np.concatenate([relleno, hall]), np.concatenate([relleno, e]))
+        self._fin = int(loops[-1]) + 1
+        self._hall, self._e = hall[-COLA:], e[-COLA:]
+        self._seq, self._offset = int(seq[-1]), offset_mv
+        return muestras[len(relleno) + loops - inicio]
+
+
+def reproducir(ain0, ain1, offset_mv, seq=None):
+    """Lo que calcula la placa a partir de las lecturas crudas de las tramas.
+
+    Las tramas van desde el arranque de la placa (una sesión completa); sin
+    seq se toman como loops seguidos.
+    """
+    if seq is None:
+        seq = np.arange(len(ain0)) % 65536
+    return Reproductor().agregar(ain0, ain1, offset_mv, seq)
+
+
+def reproducir_tramas(tramas):
+    """reproducir() sobre un arreglo TRAMA (medidor.DecodificadorTramas)."""
+    return reproducir(tramas["ain0"], tramas["ain1"], tramas["offset_mv"], tramas["seq"])
+
+
+def coincidencias(tramas):
+    """Fracción de tramas cuyo nivel y barra coinciden con los de la reproducción."""
+    muestras = reproducir_tramas(tramas)
+    flags = tramas["flags"]
+    return {
+        "nivel": float(np.mean(muestras["nivel"] == (flags & 0x03))),
+        "barra": float(np.mean(muestras["barra"] == ((flags >> 2) & 1).astype(bool))),
+    }
+
+
+# ── Barridos ──
+def barrer(e_v, bajos=(E_BAJO,), medios=(E_MEDIO,), altos=(E_ALTO,),
+           umbrales=(CAMBIO_UMBRAL,), ciclos=(PERSIST_CICLOS,), bordes=None):
+    """Niveles y barra para todas las combinaciones de umbrales.
+
+    Devuelve (combinaciones_nivel, niveles (k, n), combinaciones_barra,
+    barras (len(umbrales)·len(ciclos), n)); nivel y barra no dependen de
+    los mismos parámetros, así que se barren por separado. Con bordes (de
+    tramos()) la barra vuelve al estado de calibrar() en cada tramo; se
+    calcula sobre las muestras recibidas, así que cerca de tramas perdidas
+    es aproximada.
+    """
+    e_v = np.asarray(e_v, dtype=np.float32)
+    combinaciones_nivel = list(itertools.product(bajos, medios, altos))
+    bajo, medio, alto = (np.array(c, dtype=np.float32) for c in zip(*combinaciones_nivel))
+    combinaciones_barra = list(itertools.product(umbrales, ciclos))
+    if bordes is None:
+        bordes = (0, len(e_v))
+    umbrales, ciclos = np.asarray(umbrales, dtype=np.float32), np.asarray(ciclos)
+    llena = np.concatenate([barra(e_v[a:b], umbrales, ciclos)
+                            for a, b in zip(bordes[:-1], bordes[1:])], axis=-1)
+    return (combinaciones_nivel, niveles(e_v, bajo, medio, alto),
+            combinaciones_barra, llena.reshape(-1, len(e_v)))
+
+
+def main():
+    from grabacion import Sesion
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sesion")
+    parser.add_argument("--bajo", nargs="+", type=float, default=[float(E_BAJO)])
+    parser.add_argument("--medio", nargs="+", type=float, default=[float(E_MEDIO)])
+    parser.add_argument("--alto", nargs="+", type=float, default=[float(E_ALTO)])
+    parser.add_argument("--umbral", nargs="+", type=float, default=[float(CAMBIO_UMBRAL)],
+                        help="V (CAMBIO_UMBRAL)")
+    parser.add_argument("--ciclos", nargs="+", type=int, default=[PERSIST_CICLOS],
+                        help="muestras (PERSIST_CICLOS)")
+    args = parser.parse_args()
+
+    sesion = Sesion(args.sesion)
+    inicio = time.perf_counter()
+    if "ain0" in sesion.tipos:
+        # Sesión binaria: E sale de reproducir la placa con las lecturas crudas
+        crudas = [np.asarray(sesion.columna(c)) for c in ("ain0", "ain1", "offset_mv", "seq")]
+        e_v = reproducir(*crudas)["e_v"]
+        bordes = tramos(crudas[2], crudas[3])
+    else:
+        e_v = np.asarray(sesion.columna("e_v"), dtype=np.float32)
+        bordes = None
+    combinaciones_nivel, nivel, combinaciones_barra, llena = barrer(
+        e_v, args.bajo, args.medio, args.alto, args.umbral, args.ciclos, bordes)
+    segundos = time.perf_counter() - inicio
+    print(f"{len(e_v)} muestras, {len(combinaciones_nivel) + len(combinaciones_barra)} "
+          f"combinaciones en {segundos * 1000:.1f} ms")
+    for (bajo, medio, alto), fila in zip(combinaciones_nivel, nivel):
+        fracciones = np.bincount(fila, minlength=len(NIVELES)) / max(len(fila), 1)
+        texto = "  ".join(f"{n.strip()} {f:6.1%}" for n, f in zip(NIVELES, fracciones))
+        print(f"  bajo {bajo:.3f} medio {medio:.3f} alto {alto:.3f}:  {texto}")
+    for (umbral, ciclos), fila in zip(combinaciones_barra, llena):
+        print(f"  umbral {umbral:.3f} V, {ciclos:3} ciclos:  barra llena {fila.mean():6.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+"""
+Render en paralelo por secciones de una sola escena larga
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+Las escenas se dividen con self.next_section("nombre") en construct().
+Cada proceso ejecuta construct() completo hasta el final de su sección:
+las secciones anteriores se reproducen con el mismo paso de tiempo que
+en un render normal (los updaters y la rotación de cámara llegan al mismo
+estado) pero sin rasterizar ni codificar, y al llegar a la siguiente
+sección el proceso termina. Al final los videos de cada sección se unen
+sin recodificar (demuxer concat de FFmpeg, vía PyAV).
+
+Caché por sección: al llegar al inicio de su sección cada proceso calcula
+una clave con el estado de la escena en ese punto (mobjects, cámara,
+tiempo y variables locales de construct) más el código de la sección, de
+los demás métodos, del módulo y de los módulos locales que importa. Si ya
+hay un video con esa clave en media/secciones/ se reutiliza sin
+renderizar; así, corregir un texto de la última sección sólo vuelve a
+renderizar esa sección.
+
+Para ejecutar:
+  python segmentos.py DielectricoEspacio              # -> media/segmentos/<calidad>/
+  python segmentos.py onda_plana_manim.OndaEMPlana -q h -j 4
+  python segmentos.py OndaEMPlana --sin-cache
+"""
+
+import argparse
+import ast
+import hashlib
+import os
+import shutil
+import sys
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from escenas import DIRECTORIO, cargar_clase, elegir, escenas_en_archivo, modulos_locales
+from perfil import CALIDADES
+from precalentar import precalentar, resumir
+
+SALIDA = os.path.join(DIRECTORIO, "media", "segmentos")
+CACHE = os.path.join(DIRECTORIO, "media", "secciones")
+
+
+def contar_secciones(escena):
+    """1 + número de llamadas a self.next_section(...) en la clase."""
+    llamadas = [
+        n for n in ast.walk(escena.nodo)
+        if isinstance(n, ast.Call)
+        and isinstance(n.func, ast.Attribute)
+        and n.func.attr == "next_section"
+    ]
+    return 1 + len(llamadas)
+
+
+def _es_corte(nodo):
+    return (isinstance(nodo, ast.Expr) and isinstance(nodo.value, ast.Call)
+            and isinstance(nodo.value.func, ast.Attribute)
+            and nodo.value.func.attr == "next_section")
+
+
+def fuentes_secciones(escena):
+    """Código del que depende cada sección sin contar lo ejecutado antes.
+
+    Si algún next_section no está al nivel superior de construct no se
+    puede partir el código: todas las secciones dependen de construct entero.
+    """
+    construct = next((n for n in escena.nodo.body
+                      if isinstance(n, ast.FunctionDef) and n.name == "construct"), None)
+    h = hashlib.sha1()
+    for texto in escena.dependencias():
+        h.update(texto.encode())
+    for nodo in escena.nodo.body:
+        if nodo is not construct:
+            h.update(ast.dump(nodo).encode())
+    for ruta in modulos_locales(escena.archivo):
+        with open(ruta, "rb") as f:
+            h.update(f.read())
+    comun = h.hexdigest()
+    n_secciones = contar_secciones(escena)
+    cuerpo = construct.body if construct else []
+    if sum(map(_es_corte, cuerpo)) != n_secciones - 1:
+        return [comun + ast.dump(construct)] * n_secciones
+    partes = [[]]
+    for nodo in cuerpo:
+        if _es_corte(nodo):
+            partes.append([])
+        partes[-1].append(ast.dump(nodo))
+    return [comun + "".join(p) for p in partes]
+
+
+def huella_valor(valor, h, vistos):
+    """Agrega a h todo lo que determina valor (sin id() ni hash() de Python).
+
+    vistos guarda {id: objeto}: mantener vivos los objetos evita que un id
+    reutilizado por un temporal se confunda con un ciclo.
+    """
+    from manim import Camera, Mobject, Scene
+
+    import numpy as np
+
+    if valor is None or isinstance(valor, (bool, int, float, complex, str, bytes)):
+        h.update(repr(valor).encode())
+        return
+    if isinstance(valor, np.ndarray):
+        h.update(f"{valor.dtype}{valor.shape}".encode())
+        h.update(np.ascontiguousarray(valor).tobytes())
+        return
+    if isinstance(valor, np.generic):
+        h.update(repr(valor.item()).encode())
+        return
+    if isinstance(valor, (types.ModuleType, type)):
+        h.update(getattr(valor, "__qualname__", valor.__name__).encode())
+        return
+    if isinstance(valor, (Scene, Camera)):
+        # Su estado relevante va aparte en huella_estado; el resto (hilos,
+        # rutas del file_writer, último fotograma) cambia entre corridas
+        h.update(type(valor).__name__.encode())
+        return
+    if id(valor) in vistos:
+        h.update(b"<ciclo>")
+        return
+    vistos[id(valor)] = valor
+    if isinstance(valor, (list, tuple)):
+        h.update(f"{type(valor).__name__}{len(valor)}".encode())
+        for v in valor:
+            huella_valor(v, h, vistos)
+    elif isinstance(valor, dict):
+        h.update(f"dict{len(valor)}".encode())
+        for k, v in valor.items():
+            huella_valor(k, h, vistos)
+            huella_valor(v, h, vistos)
+    elif isinstance(valor, (set, frozenset)):
+        # Sin orden: se ordenan las huellas de los elementos
+        partes = []
+        for v in valor:
+            parcial = hashlib.sha1()
+            huella_valor(v, parcial, vistos)
+            partes.append(parcial.hexdigest())
+        h.update("".join(sorted(partes)).encode())
+    elif isinstance(valor, types.CodeType):
+        h.update(valor.co_code)
+        h.update(repr(valor.co_names).encode())
+        huella_valor(valor.co_consts, h, vistos)
+    elif isinstance(valor, types.MethodType):
+        huella_valor(valor.__func__, h, vistos)
+    elif isinstance(valor, types.FunctionType):
+        huella_valor(valor.__code__, h, vistos)
+        huella_valor(valor.__defaults__, h, vistos)
+        for celda in valor.__closure__ or ():
+            try:
+                contenido = celda.cell_contents
+            except ValueError:  # celda todavía vacía
+                contenido = None
+            huella_valor(contenido, h, vistos)
+    elif isinstance(valor, Mobject):
+        h.update(type(valor).__name__.encode())
+        # Atributos simples y arreglos (puntos, colores, grosores, z_index...)
+        # de toda la familia, más sus updaters
+        for m in valor.get_family():
+            h.update(f"{type(m).__name__}{len(m.submobjects)}".encode())
+            for nombre, v in sorted(vars(m).items()):
+                if isinstance(v, (np.ndarray, bool, int, float, str)) or v is None:
+                    h.update(nombre.encode())
+                    huella_valor(v, h, vistos)
+            huella_valor(m.updaters, h, vistos)
+    elif hasattr(valor, "__dict__"):
+        h.update(type(valor).__qualname__.encode())
+        huella_valor(vars(valor), h, vistos)
+    else:
+        h.update(type(valor).__qualname__.encode())
+
+
+def huella_estado(escena, locales):
+    """Estado de la escena en un corte de sección: mobjects, cámara, tiempo y locales."""
+    h = hashlib.sha1()
+    vistos = {}
+    camara = escena.renderer.camera
+    huella_valor(escena.mobjects, h, vistos)
+    huella_valor(escena.updaters, h, vistos)
+    huella_valor(escena.renderer.time, h, vistos)
+    for nombre in ("frame_center", "frame_width", "frame_height"):
+        huella_valor(getattr(camara, nombre, None), h, vistos)
+    if hasattr(camara, "get_value_trackers"):
+        huella_valor(camara.get_value_trackers(), h, vistos)
+        huella_valor(camara.light_source, h, vistos)
+        huella_valor(camara.fixed_in_frame_mobjects, h, vistos)
+        huella_valor(camara.fixed_orientation_mobjects, h, vistos)
+    huella_valor({k: v for k, v in locales.items() if v is not escena}, h, vistos)
+    return h.hexdigest()
+
+
+def renderizar_seccion(archivo, clase, indice, calidad, cache=CACHE):
+    """Renderiza sólo la sección indice de la escena.
+
+    Devuelve (video o None, "acierto" | "fallo" | "sin cache"). Con cache=None
+    no se busca ni se guarda nada.
+    """
+    import manim
+    from manim import Scene, config, tempconfig
+    from manim.renderer.cairo_renderer import CairoRenderer
+    from manim.utils.exceptions import EndSceneEarlyException
+
+    escena = next(e for e in escenas_en_archivo(archivo) if e.clase == clase)
+    seccion = [0]
+    clave = [None]
+    siguiente_seccion = Scene.next_section
+    estado_salto = CairoRenderer.update_skipping_status
+    dibujar = CairoRenderer.update_frame
+    progresion = Scene.get_time_progression
+
+    def next_section(self, *args, **kwargs):
+        seccion[0] += 1
+        if seccion[0] > indice:
+            raise EndSceneEarlyException()
+        if seccion[0] == indice and cache is not None:
+            clave[0] = clave_seccion(huella_estado(self, sys._getframe(1).f_locals))
+            if buscar(clave[0]):
+                raise EndSceneEarlyException()
+        return siguiente_seccion(self, *args, **kwargs)
+
+    def update_skipping_status(self):
+        estado_salto(self)
+        if seccion[0] != indice:
+            self.skip_animations = True
+
+    # Las animaciones saltadas no se dibujan, pero sí avanzan fotograma a
+    # fotograma: los updaters que dependen de dt terminan igual que en el
+    # render completo y no hay saltos en la unión de las secciones
+    def update_frame(self, *args, **kwargs):
+        if not self.skip_animations:
+            return dibujar(self, *args, **kwargs)
+
+    def get_time_progression(self, *args, **kwargs):
+        kwargs["override_skip_animations"] = True
+        return progresion(self, *args, **kwargs)
+
+    # Mismo media/ (cachés de textos y fotogramas) que precalentar
+    os.chdir(DIRECTORIO)
+    directorio_cache = cache and os.path.join(cache, CALIDADES[calidad], clase)
+    fuente = fuentes_secciones(escena)[indice]
+
+    def clave_seccion(estado):
+        h = hashlib.sha1(f"{manim.__version__}|{calidad}|{estado}|".encode())
+        h.update(fuente.encode())
+        return h.hexdigest()[:20]
+
+    def buscar(clave):
+        for extension in (".mp4", ".vacia"):
+            ruta = os.path.join(directorio_cache, clave + extension)
+            if os.path.exists(ruta):
+                return ruta
+        return None
+
+    # La primera sección empieza con la escena vacía: basta con el código
+    if indice == 0 and cache is not None:
+        clave[0] = clave_seccion("inicio")
+        ruta = buscar(clave[0])
+        if ruta:
+            return (ruta if ruta.endswith(".mp4") else None), "acierto"
+
+    sufijo = f"_seccion{indice:02d}"
+    ajustes = {
+        "quality": CALIDADES[calidad],
+        "disable_caching": True,
+        "output_file": clase + sufijo,
+        "partial_movie_dir": "{video_dir}/partial_movie_files/{scene_name}" + sufijo,
+        "preview": False,
+        "progress_bar": "none",
+        "verbosity": "WARNING",
+    }
+    # Un mismo proceso del pool puede renderizar varias secciones:
+    # los reemplazos se deshacen al terminar cada una
+    Scene.next_section = next_section
+    Scene.get_time_progression = get_time_progression
+    CairoRenderer.update_skipping_status = update_skipping_status
+    CairoRenderer.update_frame = update_frame
+    try:
+        with tempconfig(ajustes):
+            instancia = cargar_clase(escena)()
+            instancia.render()
+    finally:
+        Scene.next_section = siguiente_seccion
+        Scene.get_time_progression = progresion
+        CairoRenderer.update_skipping_status = estado_salto
+        CairoRenderer.update_frame = dibujar
+    if cache is None:
+        estado = "sin cache"
+    elif clave[0] and buscar(clave[0]):
+        ruta = buscar(clave[0])
+        return (ruta if ruta.endswith(".mp4") else None), "acierto"
+    else:
+        estado = "fallo"
+    # Una sección sin animaciones no produce video
+    video = str(instancia.renderer.file_writer.movie_file_path)
+    if not os.path.exists(video):
+        video = None
+    if clave[0] and cache is not None:
+        os.makedirs(directorio_cache, exist_ok=True)
+        destino = os.path.join(directorio_cache, clave[0] + (".mp4" if video else ".vacia"))
+        # Copia y renombrado: otro proceso nunca ve un video a medias
+        temporal = f"{destino}.{os.getpid()}"
+        if video:
+            shutil.copyfile(video, temporal)
+        else:
+            open(temporal, "wb").close()
+        os.replace(temporal, destino)
+    return video, estado
+
+
+def unir_videos(entradas, salida):
+    """Concatena videos con el mismo formato sin recodificar."""
+    import av
+
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    lista = "".join(f"file 'file:{os.path.abspath(v)}'\n" for v in entradas)
+    with av.open(BytesIO(lista.encode()), format="concat",
+                 options={"safe": "0"}) as entrada:
+        flujo = entrada.streams.video[0]
+        with av.open(salida, mode="w") as contenedor:
+            destino = contenedor.add_stream_from_template(template=flujo)
+            for paquete in entrada.demux(flujo):
+                # demux agrega paquetes vacíos de vaciado al final
+                if paquete.dts is None:
+                    continue
+                # Los dts de archivos consecutivos no son crecientes: que libav los calcule
+                paquete.dts = None
+                paquete.stream = destino
+                contenedor.mux(paquete)
+    return salida
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("escena", help="Clase o archivo.Clase")
+    parser.add_argument("-q", "--calidad", choices=CALIDADES, default="l")
+    parser.add_argument("-j", "--procesos", type=int, default=os.cpu_count())
+    parser.add_argument("-o", "--salida", help="video final")
+    parser.add_argument("--sin-precalentar", action="store_true",
+                        help="no construir antes los Text/MathTex en paralelo")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="renderizar todas las secciones sin buscar ni guardar en caché")
+    args = parser.parse_args()
+
+    try:
+        escena = elegir(args.escena)
+    except ValueError as error:
+        parser.error(str(error))
+    n_secciones = contar_secciones(escena)
+    salida = args.salida or os.path.join(SALIDA, CALIDADES[args.calidad], escena.clase + ".mp4")
+
+    if not args.sin_precalentar:
+        conteo = resumir(precalentar([escena.archivo], args.procesos))
+        print(f"Textos precalentados: {conteo['acierto']} aciertos, {conteo['fallo']} fallos")
+    procesos = max(1, min(args.procesos, n_secciones))
+    print(f"{escena.nombre}: {n_secciones} secciones en {procesos} procesos")
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        resultados = list(pool.map(
+            renderizar_seccion,
+            [escena.archivo] * n_secciones,
+            [escena.clase] * n_secciones,
+            range(n_secciones),
+            [args.calidad] * n_secciones,
+            [None if args.sin_cache else CACHE] * n_secciones,
+        ))
+    partes = [video for video, _ in resultados if video]
+    aciertos = sum(estado == "acierto" for _, estado in resultados)
+    unir_videos(partes, salida)
+    print(f"{len(partes)} partes unidas ({aciertos} de {n_secciones} secciones desde la caché) "
+          f"en {time.perf_counter() - inicio:.1f} s -> {salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Pruebas del lector del medidor E/B contra la placa simulada
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+LectorMedidor lee del lado esclavo de un pseudo-terminal mientras
+simular_placa escribe en el maestro, como con la placa real. Lo que se
+escribió se reconstruye con salida_placa (misma semilla), así que se sabe
+exactamente qué líneas debían llegar y cuáles debían descartarse.
+
+Para ejecutar:
+  python -m pytest test_medidor.py
+"""
+
+import asyncio
+import itertools
+import os
+
+import numpy as np
+
+from medidor import (ENCABEZADO, MUESTRA, MUESTRA_TRAMA, AnilloMuestras, DecodificadorTramas,
+                     abrir, configurar_puerto, parsear_bloque, salida_placa, simular_placa)
+from reproduccion import reproducir_tramas
+
+FRECUENCIA = 400.0
+DURACION = 0.75
+
+
+async def _leer_simulada(binario=False, **kwargs):
+    maestro, esclavo = os.openpty()
+    configurar_puerto(esclavo)
+    anillo = AnilloMuestras(1 << 12, MUESTRA_TRAMA if binario else MUESTRA)
+    lector = await abrir(os.ttyname(esclavo), anillo=anillo, binario=binario)
+    try:
+        # En binario la placa simulada espera la 'B' que manda el lector
+        loops = await simular_placa(maestro, FRECUENCIA, DURACION, ventana=1.0 if binario else 0,
+                                    **kwargs)
+        # Lo último que se escribió todavía puede estar en el pty
+        await asyncio.sleep(0.2)
+    finally:
+        lector.transporte.close()
+        os.close(maestro)
+        os.close(esclavo)
+    return lector, loops
+
+
+def test_linea_sin_terminar():
+    valores, malas, encabezados = parsear_bloque(
+        ENCABEZADO + b"\n1,0.1,0.5,BAJO,NO\npartial")
+    assert valores.tolist() == [[1.0, 0.1, 0.5, 0.0, 0.0]]
+    assert (malas, encabezados) == (0, 1)
+
+
+def test_lector_csv_con_corrupcion():
+    lector, loops = asyncio.run(_leer_simulada(corrupcion=0.05, semilla=3))
+    enviado = ENCABEZADO + b"\r\n" + b"".join(
+        itertools.islice(salida_placa(FRECUENCIA, 0.05, 3), loops))
+    valores, malas, encabezados = parsear_bloque(enviado)
+    assert malas > 0
+
+    conteos = lector.conteos()
+    assert conteos["muestras"] == len(valores)
+    assert conteos["lineas_descartadas"] == malas
+    assert conteos["encabezados"] == encabezados == 1
+    assert conteos["bytes_descartados"] == 0
+
+    muestras = lector.anillo.ultimas(lector.anillo.escritas)
+    assert len(muestras) == len(valores)
+    for i, nombre in enumerate(("gauss", "mtesla", "e_v", "nivel", "barra")):
+        esperado = valores[:, i].astype(muestras[nombre].dtype)
+        np.testing.assert_array_equal(muestras[nombre], esperado)
+    assert np.all(np.diff(muestras["t"]) >= 0)
+
+
+def test_lector_binario_con_corrupcion():
+    lector, loops = asyncio.run(_leer_simulada(binario=True, corrupcion=0.05, semilla=4))
+    enviado = b"".join(itertools.islice(salida_placa(FRECUENCIA, 0.05, 4, binario=True), loops))
+    decodificador = DecodificadorTramas()
+    tramas = decodificador.decodificar(enviado)
+    assert decodificador.perdidas > 0 and decodificador.crc_malos > 0
+
+    conteos = lector.conteos()
+    assert conteos["muestras"] == len(tramas)
+    assert conteos["tramas_perdidas"] == decodificador.perdidas
+    assert conteos["crc_malos"] == decodificador.crc_malos
+
+    muestras = lector.anillo.ultimas(lector.anillo.escritas)
+    for campo in ("seq", "ain0", "ain1", "offset_mv", "flags"):
+        np.testing.assert_array_equal(muestras[campo], tramas[campo])
+    # Suavizadas como en la placa, igual que reproducir todas las tramas juntas
+    placa = reproducir_tramas(tramas)
+    for campo in ("gauss", "mtesla", "e_v"):
+        np.testing.assert_array_equal(muestras[campo], placa[campo])
+    np.testing.assert_array_equal(muestras["nivel"], tramas["flags"] & 0x03)
+    np.testing.assert_array_equal(muestras["barra"], (tramas["flags"] >> 2) & 1)
@@ -0,0 +1,149 @@
+"""
+Pruebas de la reproducción vectorizada contra el firmware muestra por muestra
+Campos y Ondas Electromagnéticos | Equipo 1 | 3EM24
+
+PlacaEscalar traduce loop(), suavizar() y mostrar() de medidorEB.ino
+línea por línea, en float32 y en el mismo orden. reproduccion.reproducir()
+tiene que dar exactamente lo mismo (bit a bit) con todas las tramas, y
+con tramas perdidas sólo puede diferir justo después de los huecos.
+
+Para ejecutar:
+  python -m pytest test_reproduccion.py
+"""
+
+import numpy as np
+
+from reproduccion import PERSIST_CICLOS, VENTANA, Reproductor, reproducir
+
+F = np.float32
+
+
+class PlacaEscalar:
+    """El estado y el loop() del firmware, una muestra a la vez."""
+
+    def __init__(self, offset_mv):
+        self.calibrar(offset_mv)
+
+    def calibrar(self, offset_mv):
+        self.offset_hall_mv = F(offset_mv)
+        self.buf_hall = [F(0)] * VENTANA
+        self.buf_e = [F(0)] * VENTANA
+        self.buf_idx = 0
+        self.e_anterior = F(0)
+        self.ciclos_sin_cambio = 0
+        self.barra_e_llena = False
+
+    def _suavizar(self, buf, nuevo):
+        buf[self.buf_idx] = nuevo
+        s = F(0)
+        for valor in buf:
+            s = F(s + valor)
+        return F(s / F(VENTANA))
+
+    def loop(self, ain0, ain1):
+        # computeVolts con GAIN_ONE: cuentas * (4.096f / 32768)
+        hall_rel = F(F(F(ain0) * F(F(4.096) / F(32768))) * F(1000)) - self.offset_hall_mv
+        e_absoluto = F(F(ain1) * F(F(4.096) / F(32768)))
+        hall_suav = self._suavizar(self.buf_hall, F(hall_rel))
+        e_suav = self._suavizar(self.buf_e, e_absoluto)
+        self.buf_idx = (self.buf_idx + 1) % VENTANA
+        gauss = F(hall_suav / F(5.0))
+        tesla = F(gauss * F(1e-4))
+        return self._mostrar(gauss, tesla, e_suav)
+
+    def _mostrar(self, gauss, tesla, e_v):
+        if e_v < F(1.1):
+            nivel = 0
+        elif e_v < F(1.7):
+            nivel = 1
+        elif e_v < F(2.5):
+            nivel = 2
+        else:
+            nivel = 3
+        delta = abs(F(e_v - self.e_anterior))
+        if delta >= F(0.03):
+            self.ciclos_sin_cambio = 0
+            self.barra_e_llena = True
+        else:
+            self.ciclos_sin_cambio += 1
+            if self.ciclos_sin_cambio >= PERSIST_CICLOS:
+                self.barra_e_llena = False
+        self.e_anterior = e_v
+        return gauss, F(tesla * F(1000.0)), e_v, nivel, self.barra_e_llena
+
+
+def _sesion(n=5000, semilla=7):
+    """Tramas sintéticas con dos recalibraciones y un reset de la placa."""
+    rng = np.random.default_rng(semilla)
+    # Tramos quietos (la barra se vacía) y con cambios, alrededor de los umbrales
+    ruido = np.where((np.arange(n) // 300) % 2 == 0, 0.002, 0.08)
+    e_v = np.clip(1.9 + 1.4 * np.sin(np.arange(n) / 240) + rng.normal(0, ruido), 0.0, 3.9)
+    gauss = 15 * np.sin(np.arange(n) / 90) + rng.normal(0, 0.5, n)
+    offsets = np.full(n, F(2501.734))
+    offsets[1800:] = F(2497.0625)
+    offsets[3100:] = F(2512.3389)
+    seq = np.arange(n) % 65536
+    seq[4200:] = np.arange(n - 4200)  # reset: la secuencia vuelve a 0
+    offsets[4200:] = F(2499.875)
+    ain0 = np.round((gauss * 5.0 + offsets) / 0.125).astype(np.int16)
+    ain1 = np.round(e_v * 1000 / 0.125).astype(np.int16)
+    return ain0, ain1, offsets, seq
+
+
+def _placa(ain0, ain1, offsets, seq):
+    placa = PlacaEscalar(offsets[0])
+    salida = []
+    for i in range(len(ain0)):
+        if i and (offsets[i] != offsets[i - 1] or seq[i] < seq[i - 1]):
+            placa.calibrar(offsets[i])
+        salida.append(placa.loop(ain0[i], ain1[i]))
+    gauss, mtesla, e_v, nivel, barra = zip(*salida)
+    return {"gauss": np.array(gauss, dtype=F), "mtesla": np.array(mtesla, dtype=F),
+            "e_v": np.array(e_v, dtype=F), "nivel": np.array(nivel), "barra": np.array(barra)}
+
+
+def _comparar(muestras, esperado, filas=slice(None)):
+    for nombre, valores in esperado.items():
+        np.testing.assert_array_equal(muestras[nombre][filas], valores[filas], err_msg=nombre)
+
+
+def test_identico_al_firmware():
+    tramas = _sesion()
+    esperado = _placa(*tramas)
+    assert 0 < esperado["barra"].mean() < 1
+    assert len(np.unique(esperado["nivel"])) == 4
+    _comparar(reproducir(*tramas), esperado)
+
+
+def test_por_bloques_igual_que_junto():
+    tramas = _sesion()
+    completo = reproducir(*tramas)
+    rng = np.random.default_rng(1)
+    bordes = np.concatenate([[0], np.sort(rng.choice(len(tramas[0]), 60, replace=False)),
+                             [len(tramas[0])]])
+    reproductor = Reproductor()
+    partes = [reproductor.agregar(*(x[a:b] for x in tramas))
+              for a, b in zip(bordes[:-1], bordes[1:])]
+    np.testing.assert_array_equal(np.concatenate(partes), completo)
+
+
+def test_tramas_perdidas():
+    tramas = _sesion()
+    esperado = _placa(*tramas)
+    n = len(tramas[0])
+    rng = np.random.default_rng(2)
+    perdida = rng.random(n) < 0.01
+    perdida[[0, 1800, 3100, 4200]] = False  # las primeras de cada tramo llegan
+    llegan = ~perdida
+    muestras = reproducir(*(x[llegan] for x in tramas))
+
+    def lejos(loops):
+        # Sin tramas perdidas en los loops anteriores
+        cerca = np.convolve(perdida, np.ones(loops, dtype=int))[:n]
+        return (np.concatenate([[0], cerca[:-1]]) == 0)[llegan]
+
+    esperado = {nombre: valores[llegan] for nombre, valores in esperado.items()}
+    senales = {c: esperado[c] for c in ("gauss", "mtesla", "e_v", "nivel")}
+    _comparar(muestras, senales, lejos(VENTANA - 1))
+    _comparar(muestras, {"barra": esperado["barra"]}, lejos(VENTANA + PERSIST_CICLOS - 1))
+    assert lejos(VENTANA + PERSIST_CICLOS - 1).mean() > 0.3